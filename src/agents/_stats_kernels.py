@@ -0,0 +1,291 @@
+"""
+Numeric kernels shared by the analysis agents (Numba-compiled when available)
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+# Trend codes returned by trend_code
+TREND_DECREASING = 0
+TREND_STABLE = 1
+TREND_INCREASING = 2
+
+TREND_LABELS = ("decreasing", "stable", "increasing")
+
+# Guard used by scipy.stats.linregress against r = +/-1
+_TINY = 1.0e-20
+
+
+def _trend_code_loop(values: np.ndarray) -> int:
+    """Compare the mean of the second half against the first half in one scan (NaNs skipped)"""
+    n = values.size
+    if n < 2:
+        return TREND_STABLE
+
+    half = n // 2
+    older_sum = 0.0
+    older_count = 0
+    recent_sum = 0.0
+    recent_count = 0
+    for i in range(half):
+        value = values[i]
+        if not np.isnan(value):
+            older_sum += value
+            older_count += 1
+    for i in range(n - half, n):
+        value = values[i]
+        if not np.isnan(value):
+            recent_sum += value
+            recent_count += 1
+
+    if older_count == 0 or recent_count == 0:
+        return TREND_STABLE
+
+    older = older_sum / older_count
+    recent = recent_sum / recent_count
+    if recent > older * 1.1:
+        return TREND_INCREASING
+    elif recent < older * 0.9:
+        return TREND_DECREASING
+    return TREND_STABLE
+
+
+def _trend_code_numpy(values: np.ndarray) -> int:
+    """Vectorized fallback for _trend_code_loop when Numba is not installed"""
+    n = values.size
+    if n < 2:
+        return TREND_STABLE
+
+    half = n // 2
+    older, recent = values[:half], values[n - half:]
+    older_valid, recent_valid = ~np.isnan(older), ~np.isnan(recent)
+    if not older_valid.any() or not recent_valid.any():
+        return TREND_STABLE
+
+    older_mean = older[older_valid].mean()
+    recent_mean = recent[recent_valid].mean()
+    if recent_mean > older_mean * 1.1:
+        return TREND_INCREASING
+    elif recent_mean < older_mean * 0.9:
+        return TREND_DECREASING
+    return TREND_STABLE
+
+
+def _grouped_sums_loop(values: np.ndarray, codes: np.ndarray, n_groups: int):
+    """
+    Per-group compensated (Kahan) sums and non-NaN counts for each column of values
+    
+    Matches pandas' groupby sum/mean accumulation order, so results are bit-identical.
+    Rows with a negative code (missing key) are skipped.
+    """
+    n_rows, n_cols = values.shape
+    sums = np.zeros((n_groups, n_cols), dtype=np.float64)
+    compensation = np.zeros((n_groups, n_cols), dtype=np.float64)
+    counts = np.zeros((n_groups, n_cols), dtype=np.int64)
+    rows = np.zeros(n_groups, dtype=np.int64)
+
+    for i in range(n_rows):
+        group = codes[i]
+        if group < 0:
+            continue
+        rows[group] += 1
+        for j in range(n_cols):
+            value = values[i, j]
+            if not np.isnan(value):
+                counts[group, j] += 1
+                y = value - compensation[group, j]
+                t = sums[group, j] + y
+                compensation[group, j] = t - sums[group, j] - y
+                sums[group, j] = t
+
+    return sums, counts, rows
+
+
+def bincount_sums(values: np.ndarray, codes: np.ndarray, n_groups: int):
+    """
+    Vectorized (uncompensated) variant of grouped_sums built on np.bincount
+    
+    Same return layout as grouped_sums; sums may differ from pandas in the last ulp,
+    so use it only where results are rounded before being reported.
+    """
+    in_group = codes >= 0
+    codes, values = codes[in_group], values[in_group]
+    present = ~np.isnan(values)
+    n_cols = values.shape[1]
+
+    sums = np.empty((n_groups, n_cols), dtype=np.float64)
+    counts = np.empty((n_groups, n_cols), dtype=np.int64)
+    for j in range(n_cols):
+        sums[:, j] = np.bincount(codes, weights=np.where(present[:, j], values[:, j], 0.0), minlength=n_groups)
+        counts[:, j] = np.bincount(codes[present[:, j]], minlength=n_groups)
+    rows = np.bincount(codes, minlength=n_groups)
+
+    return sums, counts, rows
+
+
+def _pooled_ttest_loop(a: np.ndarray, b: np.ndarray):
+    """
+    Student's two-sample t-test (pooled variance) with Cohen's d, one Welford pass per sample
+    
+    Returns (t statistic, degrees of freedom, Cohen's d); the two-sided p-value is
+    2 * stdtr(dof, -|t|).
+    """
+    n1 = a.size
+    mean1 = 0.0
+    m2_1 = 0.0
+    for i in range(n1):
+        delta = a[i] - mean1
+        mean1 += delta / (i + 1)
+        m2_1 += delta * (a[i] - mean1)
+
+    n2 = b.size
+    mean2 = 0.0
+    m2_2 = 0.0
+    for i in range(n2):
+        delta = b[i] - mean2
+        mean2 += delta / (i + 1)
+        m2_2 += delta * (b[i] - mean2)
+
+    dof = n1 + n2 - 2.0
+    if n1 == 0 or n2 == 0 or dof <= 0.0:
+        # No variance estimate (e.g. two one-row groups); scipy reports NaN here
+        return np.nan, dof, np.nan
+
+    pooled_var = (m2_1 + m2_2) / dof
+    pooled_std = np.sqrt(pooled_var)
+    denom = np.sqrt(pooled_var * (1.0 / n1 + 1.0 / n2))
+    diff = mean1 - mean2
+
+    if denom == 0.0:
+        t = np.nan if diff == 0.0 else np.copysign(np.inf, diff)
+    else:
+        t = diff / denom
+    # A one-row group has no sample variance, so _calculate_cohens_d yields NaN
+    if n1 < 2 or n2 < 2:
+        d = np.nan
+    else:
+        d = 0.0 if pooled_std == 0.0 else abs(diff) / pooled_std
+
+    return t, dof, d
+
+
+def _roas_trend_loop(y: np.ndarray):
+    """
+    Early/late t-test and linear trend of a daily series in one fused pass
+    
+    The first n // 2 values form the early period. Returns (early mean, late mean,
+    t, dof, Cohen's d, slope, r, trend t, trend dof); two-sided p-values are
+    2 * stdtr(dof, -|t|) as for pooled_ttest.
+    """
+    n = y.size
+    half = n // 2
+    mean1 = 0.0
+    m2_1 = 0.0
+    mean2 = 0.0
+    m2_2 = 0.0
+    mean_x = 0.0
+    mean_y = 0.0
+    sxx = 0.0
+    syy = 0.0
+    sxy = 0.0
+    for i in range(n):
+        value = y[i]
+        if i < half:
+            delta = value - mean1
+            mean1 += delta / (i + 1)
+            m2_1 += delta * (value - mean1)
+        else:
+            delta = value - mean2
+            mean2 += delta / (i - half + 1)
+            m2_2 += delta * (value - mean2)
+        
+        # Running co-moments of (x, y) with x = i
+        dx = i - mean_x
+        dy = value - mean_y
+        mean_x += dx / (i + 1)
+        mean_y += dy / (i + 1)
+        sxx += dx * (i - mean_x)
+        syy += dy * (value - mean_y)
+        sxy += dx * (value - mean_y)
+
+    n1 = half
+    n2 = n - half
+    if n1 == 0:
+        mean1 = np.nan
+    if n2 == 0:
+        mean2 = np.nan
+
+    # Guard every denominator so tiny or degenerate series give NaN, as the numpy path does
+    dof = n1 + n2 - 2.0
+    if n1 == 0 or n2 == 0 or dof <= 0.0:
+        t = np.nan
+        d = np.nan
+    else:
+        pooled_var = (m2_1 + m2_2) / dof
+        pooled_std = np.sqrt(pooled_var)
+        denom = np.sqrt(pooled_var * (1.0 / n1 + 1.0 / n2))
+        diff = mean1 - mean2
+        if denom == 0.0:
+            t = np.nan if diff == 0.0 else np.copysign(np.inf, diff)
+        else:
+            t = diff / denom
+        if n1 < 2 or n2 < 2:
+            d = np.nan
+        else:
+            d = 0.0 if pooled_std == 0.0 else abs(diff) / pooled_std
+
+    # Same conventions as scipy.stats.linregress (r = 0 when either variance is zero)
+    slope = np.nan if sxx == 0.0 else sxy / sxx
+    if sxx == 0.0 or syy == 0.0:
+        r = 0.0
+    else:
+        r = min(max(sxy / np.sqrt(sxx * syy), -1.0), 1.0)
+    trend_dof = n - 2.0
+    trend_t = r * np.sqrt(trend_dof / ((1.0 - r + _TINY) * (1.0 + r + _TINY)))
+
+    return mean1, mean2, t, dof, d, slope, r, trend_t, trend_dof
+
+
+def linregress_index(y: np.ndarray):
+    """
+    Least-squares fit of y against x = 0..n-1, bit-identical to scipy.stats.linregress for n > 2
+    
+    Skips linregress's input validation and result wrapping; the moments come from the
+    same centred 2 x n product np.cov uses. Returns (slope, r, t, dof) with the
+    two-sided p-value 2 * stdtr(dof, -|t|). As in linregress, r is 0 when either
+    variance is zero, so a flat series has p = 1.
+    """
+    n = y.size
+    centred = np.vstack((np.arange(n) - (n - 1) / 2.0, y - np.mean(y)))
+    ssxm, ssxym, _, ssym = (np.dot(centred, centred.T) * (1.0 / n)).flat
+
+    if ssxm == 0.0 or ssym == 0.0:
+        r = 0.0
+    else:
+        r = min(max(ssxym / np.sqrt(ssxm * ssym), -1.0), 1.0)
+    slope = ssxym / ssxm
+    dof = n - 2.0
+    t = r * np.sqrt(dof / ((1.0 - r + _TINY) * (1.0 + r + _TINY)))
+
+    return slope, r, t, dof
+
+
+# Compiled on first call (not at import or agent start-up); cache=True keeps the
+# machine code on disk so later runs skip compilation
+if njit is not None:
+    trend_code = njit(cache=True)(_trend_code_loop)
+    grouped_sums = njit(cache=True)(_grouped_sums_loop)
+    pooled_ttest = njit(cache=True)(_pooled_ttest_loop)
+    roas_trend = njit(cache=True)(_roas_trend_loop)
+else:
+    trend_code = _trend_code_numpy
+    # Pure-Python loops are slower than the pandas/scipy paths; callers fall back to those
+    grouped_sums = None
+    pooled_ttest = None
+    roas_trend = None
+
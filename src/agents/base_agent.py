@@ -2,89 +2,492 @@
 Base Agent class with shared functionality
 """
 
+import asyncio
+import atexit
+import functools
+import hashlib
+import importlib.util
 import json
+import logging
 import os
+import re
+import string
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import IO, Dict, Any, Iterable, Iterator, List, Optional, Tuple
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # optional: fall back to stdlib json
+    orjson = None
+
+
+# First fenced code block in an LLM response (optionally tagged as json)
+_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)```", re.S)
+
+_JSON_DECODER = json.JSONDecoder()
+
+
+# C-accelerated JSON string encoder (same escaping as json.dumps defaults)
+_encode_str = json.encoder.encode_basestring_ascii
+
+
+def _dump_log_entry(entry: Dict[str, Any]) -> str:
+    """
+    Serialize a log_execution entry as one JSONL line
+    Specialized for the fixed entry schema; output is identical to json.dumps(entry, default=str) + newline
+    """
+    summary = entry['result_summary']
+    return (
+        f'{{"timestamp": {_encode_str(entry["timestamp"])}, '
+        f'"agent": {_encode_str(entry["agent"])}, '
+        f'"task": {_encode_str(entry["task"])}, '
+        f'"result_summary": {"null" if summary is None else _encode_str(summary)}, '
+        f'"metadata": {json.dumps(entry["metadata"], default=str)}, '
+        f'"call_count": {entry["call_count"]:d}}}\n'
+    )
+
+
+def _serialize_log_entry(entry: Dict[str, Any]) -> bytes:
+    """Encode a log entry as one UTF-8 JSONL line, using orjson when available"""
+    if orjson is not None:
+        # Non-str metadata keys are stringified, as the stdlib encoder does
+        return orjson.dumps(entry, default=str, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS)
+    return _dump_log_entry(entry).encode('utf-8')
+
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+
+@functools.lru_cache(maxsize=64)
+def _read_prompt(path: str, mtime: float) -> str:
+    """Read a prompt file; keyed on mtime so edits invalidate the cache"""
+    return Path(path).read_text(encoding='utf-8')
+
+
+@functools.lru_cache(maxsize=64)
+def _compile_prompt(template: str) -> Optional[Tuple[Tuple[str, Optional[str]], ...]]:
+    """
+    Split a str.format template into (literal, field name) pairs once
+    
+    Returns None when the template uses anything beyond plain {name} fields
+    (format specs, conversions, indexing, stray braces); those go through str.format.
+    """
+    try:
+        parsed = list(string.Formatter().parse(template))
+    except ValueError:
+        return None
+    
+    parts = []
+    for literal, field_name, format_spec, conversion in parsed:
+        if field_name is not None and (not field_name.isidentifier() or format_spec or conversion):
+            return None
+        parts.append((literal, field_name))
+    return tuple(parts)
+
+
+@functools.lru_cache(maxsize=1)
+def _openai_installed() -> bool:
+    """Whether the optional openai package can be imported"""
+    return importlib.util.find_spec('openai') is not None
+
 
 class BaseAgent:
     """Base class for all agents with common functionality"""
     
+    # Append handles for structured log files, shared across agents.
+    # Each entry is flushed as it is written, so it is on disk even if the process dies.
+    _LOG_HANDLES: Dict[Path, IO] = {}
+    _LOG_LOCK = threading.Lock()
+    
+    # LLM response cache: in-process LRU in front of a per-key JSON file store
+    _LLM_CACHE_DIR = Path(__file__).parent.parent.parent / ".llm_cache"
+    _LLM_CACHE_TTL = 86400  # seconds
+    _LLM_MEMORY_CACHE: "OrderedDict[str, str]" = OrderedDict()
+    _LLM_MEMORY_CACHE_SIZE = 512
+    _LLM_CACHE_LOCK = threading.Lock()
+    
     def __init__(self, name: str, config: Dict[str, Any], logger: Any):
         self.name = name
         self.config = config
         self.logger = logger
         self.call_count = 0
+        self.call_count_cached = 0
         self.total_tokens = 0
+        self._client = None
+        self._save_log = config.get('logging', {}).get('agent_jsonl', True)
         
     def load_prompt(self, prompt_name: str) -> str:
         """Load prompt template from prompts directory"""
         prompt_path = Path(__file__).parent.parent.parent / "prompts" / f"{prompt_name}.md"
         
-        if not prompt_path.exists():
+        try:
+            mtime = prompt_path.stat().st_mtime
+        except FileNotFoundError:
             self.logger.warning(f"Prompt file not found: {prompt_path}")
             return ""
-            
-        with open(prompt_path, 'r', encoding='utf-8') as f:
-            return f.read()
+        
+        return _read_prompt(str(prompt_path), mtime)
     
     def format_prompt(self, template: str, variables: Dict[str, Any]) -> str:
         """Format prompt template with variables"""
+        parts = _compile_prompt(template)
         try:
-            return template.format(**variables)
+            if parts is None:
+                return template.format(**variables)
+            rendered = []
+            for literal, field_name in parts:
+                rendered.append(literal)
+                if field_name is not None:
+                    rendered.append(format(variables[field_name], ''))
+            return ''.join(rendered)
         except KeyError as e:
             self.logger.error(f"Missing prompt variable: {e}")
             # Return template with placeholders for missing variables
             return template
     
-    def parse_json_response(self, response: str) -> Optional[Dict[str, Any]]:
-        """Parse JSON from LLM response, handling markdown code blocks"""
+    @staticmethod
+    def truncate_json(
+        obj: Any,
+        limit: int,
+        indent: Optional[int] = None,
+        suffix: str = "",
+        separators: Optional[Tuple[str, str]] = None
+    ) -> str:
+        """
+        Serialize obj to JSON, stopping once limit characters have been produced
+        
+        Args:
+            obj: Object to serialize (non-JSON values are rendered with str)
+            limit: Maximum number of characters of JSON to keep
+            indent: Indentation as in json.dumps
+            suffix: Marker appended when the output was cut short
+            separators: (item, key) separators as in json.dumps, e.g. (',', ':') for compact output
+            
+        Returns:
+            Equivalent of json.dumps(obj, indent=indent, separators=separators, default=str)[:limit]
+            (+ suffix if truncated)
+        """
+        encoder = json.JSONEncoder(indent=indent, separators=separators, default=str)
+        chunks = []
+        size = 0
+        for chunk in encoder.iterencode(obj):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size > limit:
+                return ''.join(chunks)[:limit] + suffix
+        return ''.join(chunks)
+    
+    def parse_json_response(self, response: str) -> Optional[Any]:
+        """Parse JSON from LLM response, handling markdown code blocks and surrounding text"""
         try:
             # Try direct parsing first
-            return json.loads(response)
+            return _json_loads(response)
         except json.JSONDecodeError:
-            # Try to extract JSON from markdown code blocks
-            if "```json" in response:
-                start = response.find("```json") + 7
-                end = response.find("```", start)
-                json_str = response[start:end].strip()
-                try:
-                    return json.loads(json_str)
-                except json.JSONDecodeError:
-                    pass
-            elif "```" in response:
-                start = response.find("```") + 3
-                end = response.find("```", start)
-                json_str = response[start:end].strip()
-                try:
-                    return json.loads(json_str)
-                except json.JSONDecodeError:
-                    pass
-                    
-            self.logger.error(f"Failed to parse JSON response from {self.name}")
-            return None
+            pass
+        
+        # Narrow to the fenced block if present; its whole body is usually the JSON value
+        match = _FENCE_RE.search(response)
+        body = match.group(1) if match else response
+        if match:
+            try:
+                return _json_loads(body)
+            except json.JSONDecodeError:
+                pass
+        
+        # Otherwise decode the first object or array embedded in surrounding text
+        starts = sorted(start for start in (body.find('{'), body.find('[')) if start != -1)
+        for start in starts:
+            try:
+                obj, _ = _JSON_DECODER.raw_decode(body, start)
+                return obj
+            except json.JSONDecodeError:
+                pass
+        
+        self.logger.error(f"Failed to parse JSON response from {self.name}")
+        return None
     
     def call_llm(self, prompt: str, temperature: float = 0.3, model: str = "gpt-4") -> str:
         """
-        Call LLM (mock implementation - replace with actual API call)
-        In production, this would call OpenAI, Anthropic, or other LLM APIs
+        Call LLM via the OpenAI client, serving repeated prompts from the response cache
+        Falls back to a mock response unless use_llm_api is set and an OpenAI client is available
         """
+        cache_key = self._llm_cache_key(prompt, temperature, model)
+        cached = self._llm_cache_get(cache_key)
+        if cached is not None:
+            self.call_count_cached += 1
+            return cached
+        
         self.call_count += 1
+        client = self._get_openai_client()
+        
+        if client is None:
+            self.logger.info(f"{self.name} would call LLM here with model={model}, temp={temperature}")
+            return self._mock_response()
+        
+        response = client.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=temperature
+        )
+        content = response.choices[0].message.content
+        self._llm_cache_set(cache_key, content)
+        return content
+    
+    async def acall_llm(
+        self,
+        prompt: str,
+        temperature: float = 0.3,
+        model: str = "gpt-4",
+        semaphore: Optional[asyncio.Semaphore] = None,
+        client: Any = None
+    ) -> str:
+        """
+        Async variant of call_llm so independent prompts can run concurrently
+        Falls back to the mock response when no OpenAI client is available
+        
+        client is an AsyncOpenAI client owned by the caller; without one a client is
+        opened for this call and closed before returning, since async clients are bound
+        to the event loop they first ran on.
+        """
+        cache_key = self._llm_cache_key(prompt, temperature, model)
+        cached = self._llm_cache_get(cache_key)
+        if cached is not None:
+            self.call_count_cached += 1
+            return cached
+        
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(1)
+        
+        async with semaphore:
+            self.call_count += 1
+            owned_client = None
+            if client is None:
+                client = owned_client = self._create_async_client()
+            
+            if client is None:
+                self.logger.info(f"{self.name} would call LLM here with model={model}, temp={temperature}")
+                return self._mock_response()
+            
+            try:
+                response = await client.chat.completions.create(
+                    model=model,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=temperature
+                )
+            finally:
+                if owned_client is not None:
+                    await owned_client.close()
+            content = response.choices[0].message.content
+            self._llm_cache_set(cache_key, content)
+            return content
+    
+    def batch_call_llm(self, prompts: List[str], temperature: float = 0.3, model: str = "gpt-4") -> List[str]:
+        """
+        Call LLM for several independent prompts concurrently
         
-        # Mock implementation - in production, replace with:
-        # import openai
-        # response = openai.ChatCompletion.create(
-        #     model=model,
-        #     messages=[{"role": "user", "content": prompt}],
-        #     temperature=temperature
-        # )
-        # return response.choices[0].message.content
+        Runs its own event loop with an async client opened and closed for this batch;
+        when called from a thread that already has a running loop (e.g. inside async code
+        or a notebook) the batch runs on a worker thread.
+        
+        Args:
+            prompts: Prompts to send
+            temperature: Sampling temperature
+            model: Model name
+            
+        Returns:
+            Responses in the same order as prompts
+        """
+        if not prompts:
+            return []
+        
+        async def _gather() -> List[str]:
+            semaphore = asyncio.Semaphore(self.config.get('max_concurrency', 8))
+            client = self._create_async_client()
+            try:
+                return await asyncio.gather(*[
+                    self.acall_llm(prompt, temperature=temperature, model=model, semaphore=semaphore, client=client)
+                    for prompt in prompts
+                ])
+            finally:
+                if client is not None:
+                    await client.close()
+        
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return list(asyncio.run(_gather()))
         
-        # For now, return a structured response template
-        self.logger.info(f"{self.name} would call LLM here with model={model}, temp={temperature}")
-        return self._mock_response()
+        # asyncio.run cannot nest inside a running loop; give the batch a thread of its own
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return list(executor.submit(asyncio.run, _gather()).result())
+    
+    def call_llm_stream(self, prompt: str, temperature: float = 0.3, model: str = "gpt-4") -> Iterator[str]:
+        """
+        Stream LLM completion tokens as they arrive
+        Yields the mock response as a single chunk when no OpenAI client is available
+        """
+        cache_key = self._llm_cache_key(prompt, temperature, model)
+        cached = self._llm_cache_get(cache_key)
+        if cached is not None:
+            self.call_count_cached += 1
+            yield cached
+            return
+        
+        self.call_count += 1
+        client = self._get_openai_client()
+        
+        if client is None:
+            self.logger.info(f"{self.name} would stream LLM here with model={model}, temp={temperature}")
+            yield self._mock_response()
+            return
+        
+        stream = client.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=temperature,
+            stream=True
+        )
+        parts = []
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+                yield parts[-1]
+        
+        # Only a fully consumed stream is cached
+        self._llm_cache_set(cache_key, "".join(parts))
+    
+    def assemble_json_stream(self, chunks: Iterable[str]) -> Optional[Dict[str, Any]]:
+        """
+        Assemble streamed chunks into JSON, returning as soon as the first object is complete
+        Falls back to parse_json_response on the full text if no object decodes early
+        """
+        decoder = json.JSONDecoder()
+        parts = []
+        
+        for chunk in chunks:
+            parts.append(chunk)
+            
+            # Only attempt a decode when a closing brace may have completed an object
+            if '}' not in chunk:
+                continue
+            
+            text = "".join(parts)
+            start = text.find('{')
+            if start == -1:
+                continue
+            if '[' in text[:start]:
+                # Top-level array (or prose before it): leave it to the full parse at the end
+                continue
+            
+            try:
+                obj, _ = decoder.raw_decode(text, start)
+                if isinstance(obj, dict):
+                    return obj
+            except json.JSONDecodeError:
+                continue
+        
+        return self.parse_json_response("".join(parts))
+    
+    def _llm_cache_key(self, prompt: str, temperature: float, model: str) -> Optional[str]:
+        """Cache key for an LLM request, or None when caching is off or responses are mocked"""
+        if not self.config.get('cache_enabled', True) or not self._llm_available():
+            return None
+        return hashlib.blake2b(f"{model}|{temperature}|{prompt}".encode('utf-8'), digest_size=16).hexdigest()
+    
+    def _llm_cache_get(self, key: Optional[str]) -> Optional[str]:
+        """Look up a cached LLM response (memory first, then disk)"""
+        if key is None:
+            return None
+        
+        cls = BaseAgent
+        with cls._LLM_CACHE_LOCK:
+            if key in cls._LLM_MEMORY_CACHE:
+                cls._LLM_MEMORY_CACHE.move_to_end(key)
+                return cls._LLM_MEMORY_CACHE[key]
+        
+        cache_file = cls._LLM_CACHE_DIR / f"{key}.json"
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        
+        if entry.get('expires', 0) < time.time():
+            return None
+        
+        self._remember_llm_response(key, entry['response'])
+        return entry['response']
+    
+    def _llm_cache_set(self, key: Optional[str], response: str):
+        """Store an LLM response in the memory and disk caches"""
+        if key is None:
+            return
+        
+        self._remember_llm_response(key, response)
+        
+        cls = BaseAgent
+        try:
+            cls._LLM_CACHE_DIR.mkdir(exist_ok=True)
+            with open(cls._LLM_CACHE_DIR / f"{key}.json", 'w', encoding='utf-8') as f:
+                json.dump({"response": response, "expires": time.time() + cls._LLM_CACHE_TTL}, f)
+        except OSError as e:
+            self.logger.warning(f"Failed to write LLM cache entry: {e}")
+    
+    def _remember_llm_response(self, key: str, response: str):
+        """Insert into the bounded in-process LRU"""
+        cls = BaseAgent
+        with cls._LLM_CACHE_LOCK:
+            cls._LLM_MEMORY_CACHE[key] = response
+            cls._LLM_MEMORY_CACHE.move_to_end(key)
+            if len(cls._LLM_MEMORY_CACHE) > cls._LLM_MEMORY_CACHE_SIZE:
+                cls._LLM_MEMORY_CACHE.popitem(last=False)
+    
+    def _llm_available(self) -> bool:
+        """Whether LLM calls reach a real provider (enabled, key configured, package installed)"""
+        return self._openai_api_key() is not None and _openai_installed()
+    
+    def _openai_api_key(self) -> Optional[str]:
+        """OpenAI API key when real LLM calls are enabled (use_llm_api), else None for mock responses"""
+        if not self.config.get('use_llm_api', False):
+            return None
+        return self.config.get('api_keys', {}).get('openai') or None
+    
+    def _get_openai_client(self):
+        """Lazily create the OpenAI client if an API key is configured"""
+        if self._client is not None:
+            return self._client
+        
+        api_key = self._openai_api_key()
+        if api_key is None:
+            return None
+        
+        try:
+            from openai import OpenAI
+        except ImportError:
+            self.logger.warning("openai package not installed, using mock LLM responses")
+            return None
+        
+        self._client = OpenAI(api_key=api_key)
+        return self._client
+    
+    def _create_async_client(self):
+        """Create a new AsyncOpenAI client (caller closes it), or None without an API key"""
+        api_key = self._openai_api_key()
+        if api_key is None:
+            return None
+        
+        try:
+            from openai import AsyncOpenAI
+        except ImportError:
+            self.logger.warning("openai package not installed, using mock LLM responses")
+            return None
+        
+        return AsyncOpenAI(api_key=api_key)
     
     def _mock_response(self) -> str:
         """Mock response for testing without API calls"""
@@ -92,6 +495,12 @@ class BaseAgent:
     
     def log_execution(self, task: str, result: Any, metadata: Optional[Dict] = None):
         """Log agent execution details"""
+        log_enabled = self.logger.isEnabledFor(logging.INFO)
+        
+        # Skip building the entry (and stringifying result) when nothing consumes it
+        if not log_enabled and not self._save_log:
+            return
+        
         log_entry = {
             "timestamp": datetime.now().isoformat(),
             "agent": self.name,
@@ -101,20 +510,44 @@ class BaseAgent:
             "call_count": self.call_count
         }
         
-        self.logger.info(f"{self.name} executed: {task}", extra=log_entry)
+        if log_enabled:
+            self.logger.info("%s executed: %s", self.name, task, extra=log_entry)
         
         # Save to structured log file
-        self._save_log_entry(log_entry)
+        if self._save_log:
+            self._save_log_entry(log_entry)
     
     def _save_log_entry(self, entry: Dict):
         """Save log entry to JSON file"""
         log_dir = Path(__file__).parent.parent.parent / "logs"
-        log_dir.mkdir(exist_ok=True)
-        
         log_file = log_dir / f"{self.name.lower().replace(' ', '_')}.jsonl"
         
-        with open(log_file, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(entry) + '\n')
+        line = _serialize_log_entry(entry)
+        
+        with BaseAgent._LOG_LOCK:
+            handle = self._get_log_handle(log_file)
+            handle.write(line)
+            handle.flush()
+    
+    @classmethod
+    def _get_log_handle(cls, log_file: Path) -> IO:
+        """Return a cached binary append handle for log_file (caller holds _LOG_LOCK)"""
+        handle = cls._LOG_HANDLES.get(log_file)
+        
+        if handle is None or handle.closed:
+            log_file.parent.mkdir(exist_ok=True)
+            handle = open(log_file, 'ab')
+            cls._LOG_HANDLES[log_file] = handle
+        
+        return handle
+    
+    @classmethod
+    def close_log_handles(cls):
+        """Close all cached structured log handles"""
+        with cls._LOG_LOCK:
+            for handle in cls._LOG_HANDLES.values():
+                handle.close()
+            cls._LOG_HANDLES.clear()
     
     def validate_output(self, output: Dict[str, Any], required_fields: list) -> bool:
         """Validate that output contains required fields"""
@@ -152,3 +585,6 @@ class BaseAgent:
                     raise
         
         return None
+
+
+atexit.register(BaseAgent.close_log_handles)
@@ -2,12 +2,156 @@
 Creative Generator Agent - Generates new creative recommendations
 """
 
+import functools
 import json
 import random
-from typing import Dict, Any, List, Optional
+import re
+import pandas as pd
+from collections import Counter
+from heapq import nlargest, nsmallest
+from typing import Dict, Any, FrozenSet, List, Optional, Tuple
 from .base_agent import BaseAgent
 
 
+# Punctuation stripped from the ends of whitespace-separated words
+_WORD_STRIP = '.,!?—'
+
+_STOPWORDS = frozenset({'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'})
+
+
+# Message token -> pattern tag, all matched in a single regex pass
+_PATTERN_TOKENS = {
+    'guarantee': "Guarantee/warranty messaging",
+    '—': "Problem-solution structure",
+    ':': "Problem-solution structure",
+    'limited': "Scarcity/urgency",
+    'stock': "Scarcity/urgency",
+    'cooling': "Performance/comfort benefits",
+    'breathable': "Performance/comfort benefits"
+}
+_PATTERN_RE = re.compile("|".join(re.escape(t) for t in _PATTERN_TOKENS))
+
+# Theme tags in the order they are reported per creative
+_THEME_ORDER = (
+    "Guarantee/warranty messaging",
+    "Problem-solution structure",
+    "Scarcity/urgency",
+    "Performance/comfort benefits"
+)
+
+# Hook keyword -> (precedence, hook type); lowest precedence wins when several match
+_HOOK_RULES = (
+    ("social_proof", ('join', 'customers')),
+    ("problem_solution", ('tired', '?')),
+    ("value_proposition", ('premium', 'quality')),
+    ("scarcity", ('limited', 'now'))
+)
+_HOOK_TYPE_BY_KEYWORD = {
+    keyword: (rank, hook_type)
+    for rank, (hook_type, keywords) in enumerate(_HOOK_RULES)
+    for keyword in keywords
+}
+_HOOK_RE = re.compile("|".join(re.escape(k) for k in _HOOK_TYPE_BY_KEYWORD))
+
+
+# Testing priority by concept position; later concepts are "low"
+_TESTING_PRIORITIES = ("high", "high", "medium", "medium")
+
+# Relative test budget weight per priority
+_BUDGET_WEIGHTS = {"high": 2, "medium": 1}
+
+
+def _roas_key(creative: Dict[str, Any]) -> float:
+    """Sort key for ranking creatives by ROAS"""
+    return creative.get('roas', 0)
+
+
+@functools.lru_cache(maxsize=1024)
+def _message_features(message: str) -> Tuple[FrozenSet[str], Tuple[str, ...]]:
+    """
+    Theme tags and meaningful words of a creative message
+    Memoized so reused messages are lowercased and tokenized only once
+    """
+    message_lower = message.lower()
+    
+    tags = frozenset(_PATTERN_TOKENS[m.group(0)] for m in _PATTERN_RE.finditer(message_lower))
+    stripped = (token.strip(_WORD_STRIP) for token in message_lower.split())
+    words = tuple(w for w in stripped if len(w) > 3 and w not in _STOPWORDS)
+    
+    return tags, words
+
+
+# Recommendation helpers are pure functions of small hashable inputs, so they are
+# memoized across concepts, retries and repeated generation passes.
+
+@functools.lru_cache(maxsize=256)
+def _infer_hook_type(hook: str) -> str:
+    """Infer hook type from the headline"""
+    matches = [_HOOK_TYPE_BY_KEYWORD[m.group(0)] for m in _HOOK_RE.finditer(hook.lower())]
+    
+    if not matches:
+        return "benefit_focused"
+    
+    return min(matches)[1]
+
+
+@functools.lru_cache(maxsize=256)
+def _generate_rationale(
+    hook: str,
+    angle: str,
+    ctype: str,
+    issues: FrozenSet[str],
+    first_insight: Optional[str]
+) -> str:
+    """Generate rationale for a creative recommendation"""
+    rationale_parts = []
+    
+    # Address specific issues
+    if 'low_ctr' in issues:
+        rationale_parts.append(f"Strong hook '{hook}' designed to improve CTR")
+    
+    if 'creative_underperformance' in issues:
+        rationale_parts.append(f"{ctype} format with {angle} messaging angle to refresh creative approach")
+    
+    # Reference analysis insights
+    if first_insight:
+        rationale_parts.append(f"Builds on insight: {first_insight[:60]}")
+    
+    if not rationale_parts:
+        rationale_parts.append(f"Tests {angle} messaging angle with {ctype} format to optimize engagement")
+    
+    return ". ".join(rationale_parts) + "."
+
+
+@functools.lru_cache(maxsize=256)
+def _estimate_improvement(issues: FrozenSet[str]) -> str:
+    """Estimate expected improvement"""
+    if 'low_ctr' in issues:
+        return "Expected CTR improvement of 15-25% through stronger hooks and benefit-focused messaging"
+    elif 'creative_underperformance' in issues:
+        return "Expected ROAS improvement of 10-20% by testing fresh creative approach"
+    elif 'audience_fatigue' in issues:
+        return "Expected engagement recovery of 20-30% with new creative in fatigued segments"
+    
+    return "Expected incremental performance improvement through creative testing and optimization"
+
+
+@functools.lru_cache(maxsize=256)
+def _estimate_confidence(angle: str, ctype: str, top_patterns: Tuple[str, ...]) -> float:
+    """Estimate confidence in a recommendation"""
+    confidence = 0.65  # Base confidence
+    
+    # Increase if aligns with top patterns
+    if any(ctype in p for p in top_patterns):
+        confidence += 0.15
+    
+    # Increase for proven messaging angles
+    if angle in ['performance', 'comfort', 'social_proof']:
+        confidence += 0.10
+    
+    return min(round(confidence, 2), 0.95)
+
+
 class CreativeGeneratorAgent(BaseAgent):
     """
     Creative Generator Agent responsible for:
@@ -20,6 +164,8 @@ class CreativeGeneratorAgent(BaseAgent):
     def __init__(self, config: Dict[str, Any], logger: Any):
         super().__init__("CreativeGenerator", config, logger)
         self.prompt_template = self.load_prompt("creative_generator_prompt")
+        # Per-concept refinement; its output schema is the hook/body/cta merged back
+        self.concept_prompt_template = self.load_prompt("creative_concept_prompt")
         
         # Creative frameworks
         self.hook_frameworks = [
@@ -59,8 +205,11 @@ class CreativeGeneratorAgent(BaseAgent):
         """
         self.logger.info("Generating creative recommendations")
         
+        # Rank top creatives once; shared by pattern analysis and concept generation
+        top_creatives = nlargest(5, creative_performance_data, key=_roas_key)
+        
         # Analyze existing creative patterns
-        analysis = self._analyze_creative_patterns(creative_performance_data)
+        analysis = self._analyze_creative_patterns(creative_performance_data, top_creatives)
         
         # Identify performance issues to address
         issues = self._identify_performance_issues(validated_hypotheses)
@@ -69,7 +218,7 @@ class CreativeGeneratorAgent(BaseAgent):
         recommendations = self._generate_creative_concepts(
             analysis,
             issues,
-            creative_performance_data,
+            top_creatives[:3],
             campaign_context or {}
         )
         
@@ -91,8 +240,12 @@ class CreativeGeneratorAgent(BaseAgent):
         
         return result
     
-    def _analyze_creative_patterns(self, creative_data: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Analyze patterns in existing creative performance"""
+    def _analyze_creative_patterns(
+        self,
+        creative_data: List[Dict[str, Any]],
+        top_performers: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """Analyze patterns in existing creative performance (top_performers: top 5 by ROAS, if already ranked)"""
         if not creative_data:
             return {
                 "top_performing_patterns": [],
@@ -101,11 +254,10 @@ class CreativeGeneratorAgent(BaseAgent):
                 "recommendation_strategy": "Generate diverse creative approaches based on best practices"
             }
         
-        # Sort by ROAS
-        sorted_by_roas = sorted(creative_data, key=lambda x: x.get('roas', 0), reverse=True)
-        
-        top_performers = sorted_by_roas[:5]
-        bottom_performers = sorted_by_roas[-5:]
+        # Top/bottom 5 by ROAS (partial selection, no full sort)
+        if top_performers is None:
+            top_performers = nlargest(5, creative_data, key=_roas_key)
+        bottom_performers = nsmallest(5, reversed(creative_data), key=_roas_key)[::-1]
         
         # Extract patterns
         top_patterns = self._extract_patterns(top_performers)
@@ -116,17 +268,13 @@ class CreativeGeneratorAgent(BaseAgent):
         
         key_insights = []
         
-        # Check creative type performance
-        creative_types = {}
-        for c in creative_data:
-            ctype = c.get('creative_type', 'Unknown')
-            if ctype not in creative_types:
-                creative_types[ctype] = []
-            creative_types[ctype].append(c.get('roas', 0))
-        
-        avg_by_type = {k: sum(v)/len(v) for k, v in creative_types.items() if v}
-        if avg_by_type:
-            best_type = max(avg_by_type, key=avg_by_type.get)
+        # Check creative type performance (one vectorized groupby)
+        creative_df = pd.DataFrame(creative_data).reindex(columns=['creative_type', 'roas'])
+        creative_df = creative_df.fillna({'creative_type': 'Unknown', 'roas': 0})
+        avg_by_type = creative_df.groupby('creative_type', sort=False)['roas'].mean()
+        
+        if not avg_by_type.empty:
+            best_type = avg_by_type.idxmax()
             key_insights.append(f"'{best_type}' creative type performs best (avg ROAS: {avg_by_type[best_type]:.2f})")
         
         # Check for common words/themes in top performers
@@ -153,37 +301,24 @@ class CreativeGeneratorAgent(BaseAgent):
             patterns.append(f"{ctype} format")
             
             # Pattern: Message themes
-            if 'guarantee' in message.lower() or 'guaranteed' in message.lower():
-                patterns.append("Guarantee/warranty messaging")
-            if '—' in message or ':' in message:
-                patterns.append("Problem-solution structure")
-            if 'limited' in message.lower() or 'stock' in message.lower():
-                patterns.append("Scarcity/urgency")
-            if 'cooling' in message.lower() or 'breathable' in message.lower():
-                patterns.append("Performance/comfort benefits")
-        
-        # Return unique patterns
-        return list(set(patterns))[:5]
+            tags, _ = _message_features(message)
+            patterns.extend(tag for tag in _THEME_ORDER if tag in tags)
+        
+        # Return unique patterns in first-seen order (deterministic across runs)
+        return list(dict.fromkeys(patterns))[:5]
     
     def _find_common_words(self, messages: List[str]) -> List[str]:
         """Find common words in messages"""
         if not messages:
             return []
         
-        # Common meaningful words (excluding stopwords)
-        word_freq = {}
-        stopwords = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'}
-        
+        # Count meaningful words (excluding stopwords)
+        word_freq = Counter()
         for message in messages:
-            words = message.lower().split()
-            for word in words:
-                word = word.strip('.,!?—')
-                if len(word) > 3 and word not in stopwords:
-                    word_freq[word] = word_freq.get(word, 0) + 1
+            word_freq.update(_message_features(message)[1])
         
         # Get top words
-        sorted_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)
-        return [word for word, freq in sorted_words if freq >= 2][:5]
+        return [word for word, freq in word_freq.most_common(5) if freq >= 2]
     
     def _identify_performance_issues(self, hypotheses: List[Dict[str, Any]]) -> List[str]:
         """Identify key performance issues from validated hypotheses"""
@@ -208,19 +343,14 @@ class CreativeGeneratorAgent(BaseAgent):
         self,
         analysis: Dict[str, Any],
         issues: List[str],
-        creative_data: List[Dict[str, Any]],
+        top_performers: List[Dict[str, Any]],
         context: Dict[str, Any]
     ) -> List[Dict[str, Any]]:
-        """Generate diverse creative concepts"""
-        recommendations = []
-        
-        # Get top performers for inspiration
-        top_performers = sorted(creative_data, key=lambda x: x.get('roas', 0), reverse=True)[:3] if creative_data else []
-        
+        """Generate diverse creative concepts (top_performers: best creatives by ROAS, for inspiration)"""
         # Generate concepts for each messaging angle
         max_suggestions = self.config.get('agents', {}).get('creative_generator', {}).get('max_suggestions', 5)
         
-        # Template-based generation (in production, would use LLM)
+        # Template concepts (refined by the LLM below when available)
         concepts = [
             {
                 "angle": "comfort",
@@ -259,129 +389,134 @@ class CreativeGeneratorAgent(BaseAgent):
             }
         ]
         
+        selected = concepts[:max_suggestions]
+        
+        # Refine all concepts with one concurrent batch of LLM calls; mock responses
+        # carry no copy, so without a real client the templates are used as-is
+        if self._llm_available():
+            creative_config = self.config.get('agents', {}).get('creative_generator', {})
+            prompts = [
+                self._build_concept_prompt(concept, issues, top_performers, context)
+                for concept in selected
+            ]
+            responses = self.batch_call_llm(
+                prompts,
+                temperature=creative_config.get('temperature', 0.8),
+                model=creative_config.get('model', 'gpt-4')
+            )
+            selected = [
+                self._merge_llm_concept(concept, response)
+                for concept, response in zip(selected, responses)
+            ]
+        
+        # Hashable once for the memoized helpers
+        issue_set = frozenset(issues)
+        
+        # Targeting and inspiration do not depend on the concept
+        target_campaign = "Men_ComfortMax_Launch"  # Default
+        target_audience = "Lookalike" if 'audience_fatigue' in issue_set else "Broad"
+        inspiration = top_performers[0].get('creative_message', '') if top_performers else None
+        
+        recommendations = [None] * len(selected)
+        
         # Select and customize concepts
-        for i, concept in enumerate(concepts[:max_suggestions]):
-            # Determine target based on issues
-            target_campaign = "Men_ComfortMax_Launch"  # Default
-            target_audience = "Broad"
+        for i, concept in enumerate(selected):
+            hook, body, cta = concept['hook'], concept['body'], concept['cta']
+            angle, ctype = concept['angle'], concept['creative_type']
             
-            if 'audience_fatigue' in issues:
-                target_audience = "Lookalike"
-            
-            # Build creative message
-            message = f"{concept['hook']} {concept['body']} {concept['cta']}"
-            
-            # Add inspired by reference if available
-            inspired_by = []
-            if top_performers:
-                inspired_by = [top_performers[0].get('creative_message', '')]
-            
-            # Determine priority
-            priority = "high" if i < 2 else "medium" if i < 4 else "low"
-            
-            recommendation = {
+            recommendations[i] = {
                 "recommendation_id": f"rec_{i+1}",
-                "creative_type": concept['creative_type'],
+                "creative_type": ctype,
                 "target_campaign": target_campaign,
                 "target_audience": target_audience,
-                "creative_message": message,
-                "headline": concept['hook'],
-                "body": concept['body'],
-                "cta": concept['cta'],
-                "messaging_angle": concept['angle'],
-                "hook_type": self._infer_hook_type(concept['hook']),
-                "rationale": self._generate_rationale(concept, analysis, issues),
-                "inspired_by": inspired_by,
-                "expected_improvement": self._estimate_improvement(concept, issues),
-                "testing_priority": priority,
+                "creative_message": f"{hook} {body} {cta}",
+                "headline": hook,
+                "body": body,
+                "cta": cta,
+                "messaging_angle": angle,
+                "hook_type": self._infer_hook_type(hook),
+                "rationale": self._generate_rationale(concept, analysis, issue_set),
+                "inspired_by": [inspiration] if inspiration is not None else [],
+                "expected_improvement": self._estimate_improvement(concept, issue_set),
+                "testing_priority": _TESTING_PRIORITIES[i] if i < len(_TESTING_PRIORITIES) else "low",
                 "confidence": self._estimate_confidence(concept, analysis)
             }
-            
-            recommendations.append(recommendation)
         
         return recommendations
     
+    def _build_concept_prompt(
+        self,
+        concept: Dict[str, Any],
+        issues: List[str],
+        top_performers: List[Dict[str, Any]],
+        context: Dict[str, Any]
+    ) -> str:
+        """Build the LLM prompt used to refine a single creative concept"""
+        prompt_vars = {
+            "campaign_context": json.dumps(context, default=str),
+            "performance_issues": ", ".join(issues) or "none identified",
+            "concept": json.dumps({field: concept[field] for field in ('hook', 'body', 'cta')}),
+            "angle": concept['angle'],
+            "creative_type": concept['creative_type'],
+            "top_performers": json.dumps([c.get('creative_message', '') for c in top_performers]),
+            "target_audience": context.get('target_audience', 'Broad'),
+            "product_category": context.get('product_category', 'Undergarments')
+        }
+        
+        return self.format_prompt(self.concept_prompt_template, prompt_vars)
+    
+    def _merge_llm_concept(self, concept: Dict[str, Any], response: str) -> Dict[str, Any]:
+        """Overlay LLM-refined copy on a template concept, keeping the template on failure"""
+        refined = self.parse_json_response(response)
+        
+        # Responses may parse to a list or scalar, or miss/mistype fields
+        if not isinstance(refined, dict):
+            return concept
+        if not all(isinstance(refined.get(field), str) and refined[field] for field in ('hook', 'body', 'cta')):
+            return concept
+        
+        return {**concept, "hook": refined['hook'], "body": refined['body'], "cta": refined['cta']}
+    
     def _infer_hook_type(self, hook: str) -> str:
         """Infer hook type from the headline"""
-        hook_lower = hook.lower()
-        
-        if 'join' in hook_lower or 'customers' in hook_lower:
-            return "social_proof"
-        elif 'tired' in hook_lower or '?' in hook:
-            return "problem_solution"
-        elif 'premium' in hook_lower or 'quality' in hook_lower:
-            return "value_proposition"
-        elif 'limited' in hook_lower or 'now' in hook_lower:
-            return "scarcity"
-        else:
-            return "benefit_focused"
+        return _infer_hook_type(hook)
     
     def _generate_rationale(self, concept: Dict[str, Any], analysis: Dict[str, Any], issues: List[str]) -> str:
         """Generate rationale for the creative recommendation"""
-        angle = concept['angle']
-        ctype = concept['creative_type']
-        
-        rationale_parts = []
-        
-        # Address specific issues
-        if 'low_ctr' in issues:
-            rationale_parts.append(f"Strong hook '{concept['hook']}' designed to improve CTR")
-        
-        if 'creative_underperformance' in issues:
-            rationale_parts.append(f"{ctype} format with {angle} messaging angle to refresh creative approach")
-        
-        # Reference analysis insights
         insights = analysis.get('key_insights', [])
-        if insights:
-            rationale_parts.append(f"Builds on insight: {insights[0][:60]}")
-        
-        if not rationale_parts:
-            rationale_parts.append(f"Tests {angle} messaging angle with {ctype} format to optimize engagement")
-        
-        return ". ".join(rationale_parts) + "."
+        return _generate_rationale(
+            concept['hook'],
+            concept['angle'],
+            concept['creative_type'],
+            frozenset(issues),
+            insights[0] if insights else None
+        )
     
     def _estimate_improvement(self, concept: Dict[str, Any], issues: List[str]) -> str:
         """Estimate expected improvement"""
-        if 'low_ctr' in issues:
-            return "Expected CTR improvement of 15-25% through stronger hooks and benefit-focused messaging"
-        elif 'creative_underperformance' in issues:
-            return "Expected ROAS improvement of 10-20% by testing fresh creative approach"
-        elif 'audience_fatigue' in issues:
-            return "Expected engagement recovery of 20-30% with new creative in fatigued segments"
-        
-        return "Expected incremental performance improvement through creative testing and optimization"
+        return _estimate_improvement(frozenset(issues))
     
     def _estimate_confidence(self, concept: Dict[str, Any], analysis: Dict[str, Any]) -> float:
         """Estimate confidence in recommendation"""
-        confidence = 0.65  # Base confidence
-        
-        # Increase if aligns with top patterns
-        top_patterns = analysis.get('top_performing_patterns', [])
-        if any(concept['creative_type'] in p for p in top_patterns):
-            confidence += 0.15
-        
-        # Increase for proven messaging angles
-        if concept['angle'] in ['performance', 'comfort', 'social_proof']:
-            confidence += 0.10
-        
-        return min(round(confidence, 2), 0.95)
+        return _estimate_confidence(
+            concept['angle'],
+            concept['creative_type'],
+            tuple(analysis.get('top_performing_patterns', []))
+        )
     
     def _create_testing_strategy(self, recommendations: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Create testing strategy for recommendations"""
         
-        # Order by priority
-        high_priority = [r for r in recommendations if r['testing_priority'] == 'high']
-        medium_priority = [r for r in recommendations if r['testing_priority'] == 'medium']
-        
-        # Budget allocation (weighted by priority)
-        budget_allocation = {}
-        total_weight = len(high_priority) * 2 + len(medium_priority)
-        
-        for rec in high_priority:
-            budget_allocation[rec['recommendation_id']] = f"{(2 / total_weight * 100):.0f}%"
-        
-        for rec in medium_priority:
-            budget_allocation[rec['recommendation_id']] = f"{(1 / total_weight * 100):.0f}%"
+        # Budget allocation weighted by priority (low priority gets no budget)
+        weights = [
+            (r['recommendation_id'], _BUDGET_WEIGHTS.get(r['testing_priority'], 0))
+            for r in recommendations
+        ]
+        total_weight = sum(w for _, w in weights) or 1
+        budget_allocation = {
+            rec_id: f"{(w / total_weight * 100):.0f}%"
+            for rec_id, w in weights if w
+        }
         
         return {
             "recommended_test_order": [r['recommendation_id'] for r in recommendations],
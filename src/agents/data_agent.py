@@ -2,12 +2,148 @@
 Data Agent - Loads, analyzes, and summarizes Facebook Ads data
 """
 
-import json
+import copy
+import importlib.util
+import os
+import re
+import threading
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, Iterable, Optional, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from .base_agent import BaseAgent
+from ._stats_kernels import TREND_LABELS, bincount_sums, grouped_sums, trend_code
+
+# Multithreaded Arrow CSV parser when pyarrow is installed (probed without importing it)
+_CSV_ENGINE = 'pyarrow' if importlib.util.find_spec('pyarrow') is not None else 'c'
+
+# Explicit numeric schema for Facebook Ads exports (skips per-column type inference)
+_CSV_DTYPES = {
+    'spend': 'float64',
+    'revenue': 'float64',
+    'clicks': 'float64',
+    'ctr': 'float64',
+    'roas': 'float64'
+}
+
+# Relative period spec, e.g. "last 7 days" / "last 2 weeks" (count defaults to 1)
+_PERIOD_RE = re.compile(r'(\d*)\s*(day|week)', re.IGNORECASE)
+
+# Count columns downcast to the smallest integer dtype; monetary/ratio columns stay float64
+_COUNT_COLUMNS = ('impressions', 'clicks', 'purchases')
+
+# String key columns stored as category (int-coded groupby keys)
+_CATEGORY_COLUMNS = ('campaign_name', 'creative_type', 'audience_type', 'creative_message')
+
+
+# Anomaly checks as (column, sign, threshold, message): flagged when sign * value > threshold
+_ANOMALY_CHECKS = (
+    ('spend', -1.0, 0.0, "Negative spend values detected"),
+    ('revenue', -1.0, 0.0, "Negative revenue values detected"),
+    ('roas', 1.0, 50.0, "{count} rows with unusually high ROAS (>50)"),
+    ('ctr', 1.0, 0.1, "{count} rows with unusually high CTR (>10%)")  # 10% CTR is very high
+)
+
+
+# Numeric metric columns cached as arrays for threshold checks
+_METRIC_COLUMNS = tuple(col for col, _, _, _ in _ANOMALY_CHECKS)
+
+
+def _safe_ratio(numerator: pd.Series, denominator: pd.Series) -> np.ndarray:
+    """Divide in one pass, yielding 0 where the denominator is 0 or either side is missing"""
+    num = numerator.to_numpy(dtype=np.float64, na_value=np.nan)
+    den = denominator.to_numpy(dtype=np.float64, na_value=np.nan)
+    out = np.zeros(len(num), dtype=np.float64)
+    np.divide(num, den, out=out, where=(den != 0) & ~np.isnan(num) & ~np.isnan(den))
+    return out
+
+
+def _float_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    """Return frame with float64 columns, copying only if some column is not already float64"""
+    if all(dtype == np.float64 for dtype in frame.dtypes):
+        return frame
+    return frame.astype(np.float64)
+
+
+def _topk(frame: pd.DataFrame, column: str, k: int, largest: bool = True) -> pd.DataFrame:
+    """Linear-time equivalent of DataFrame.nlargest/nsmallest (ties keep first)"""
+    values = frame[column].to_numpy(dtype=np.float64)
+    positions = np.flatnonzero(~np.isnan(values))
+    keys = -values[positions] if largest else values[positions]
+    
+    if len(positions) > k:
+        # Partition to find the k-th key, then keep every row up to it so ties resolve by position
+        kth = np.partition(keys, k - 1)[k - 1]
+        within = keys <= kth
+        positions, keys = positions[within], keys[within]
+    
+    order = np.argsort(keys, kind='stable')[:k]
+    selected = positions[order]
+    if len(selected) < k:
+        # Like pandas, pad with NaN rows when there are fewer than k valid values
+        selected = np.concatenate([selected, np.flatnonzero(np.isnan(values))[:k - len(selected)]])
+    return frame.iloc[selected]
+
+
+# Sections produced by DataAgent.analyze_data, in output order, mapped to
+# (builder method, whether it takes the shared campaign aggregate)
+_SECTION_BUILDERS = {
+    "data_quality": ("_analyze_data_quality", False),
+    "summary_statistics": ("_compute_summary_statistics", True),
+    "trends": ("_analyze_trends", False),
+    "key_observations": ("_identify_key_observations", True),
+    "top_performers": ("_identify_top_performers", True),
+    "bottom_performers": ("_identify_bottom_performers", True),
+    "segment_analysis": ("_analyze_segments", False)
+}
+
+ANALYSIS_SECTIONS = tuple(_SECTION_BUILDERS)
+
+
+class _PeriodAnalysis:
+    """
+    Analyses for one period slice, each section computed on first access
+    
+    Safe to share between threads; section() returns a copy, so callers may edit it
+    without affecting later analyses of the same period.
+    """
+    
+    def __init__(self, agent: 'DataAgent', df: pd.DataFrame):
+        self.agent = agent
+        self.df = df
+        self._campaign_agg: Optional[pd.DataFrame] = None
+        self._campaign_agg_ready = False
+        self._sections: Dict[str, Any] = {}
+        # Reentrant: building a section may compute the shared campaign aggregate
+        self._lock = threading.RLock()
+    
+    def section(self, name: str) -> Any:
+        """Return a copy of an analysis section, computing it if needed"""
+        with self._lock:
+            return copy.deepcopy(self.compute(name))
+    
+    def compute(self, name: str) -> Any:
+        """Compute an analysis section once; the result is shared, so it must not be modified"""
+        with self._lock:
+            if name not in self._sections:
+                if name not in _SECTION_BUILDERS:
+                    raise ValueError(f"Unknown analysis section: {name}")
+                method_name, uses_campaign_agg = _SECTION_BUILDERS[name]
+                builder = getattr(self.agent, method_name)
+                if uses_campaign_agg:
+                    self._sections[name] = builder(self.df, self.campaign_agg())
+                else:
+                    self._sections[name] = builder(self.df)
+            return self._sections[name]
+    
+    def campaign_agg(self) -> Optional[pd.DataFrame]:
+        """Campaign-level aggregate shared by the campaign analyses (computed once)"""
+        with self._lock:
+            if not self._campaign_agg_ready:
+                self._campaign_agg = self.agent._campaign_agg(self.df)
+                self._campaign_agg_ready = True
+            return self._campaign_agg
 
 
 class DataAgent(BaseAgent):
@@ -24,15 +160,51 @@ class DataAgent(BaseAgent):
         self.prompt_template = self.load_prompt("data_agent_prompt")
         self.df: Optional[pd.DataFrame] = None
         self.data_loaded = False
+        
+        # Computed analyses keyed on (analysis_period, data version); bumped on every load
+        self._data_version = 0
+        self._max_date: Optional[pd.Timestamp] = None
+        self._date_values: Optional[np.ndarray] = None
+        self._date_order: Optional[np.ndarray] = None
+        self._column_arrays: Dict[str, np.ndarray] = {}
+        self._null_columns: List[str] = []
+        self._dataset_info: Optional[Dict[str, Any]] = None
+        self._creative_performance: Optional[List[Dict[str, Any]]] = None
+        self._analysis_cache: Dict[Tuple[Optional[str], int], _PeriodAnalysis] = {}
+        # Plan tasks (and the speculative prefetch) may analyze concurrently
+        self._analysis_lock = threading.Lock()
     
     def load_data(self, data_path: str) -> bool:
         """Load data from CSV file"""
         try:
             self.logger.info(f"Loading data from: {data_path}")
-            self.df = pd.read_csv(data_path)
+            self._load_frames([data_path])
+            
+            self.data_loaded = True
+            self.logger.info(f"Data loaded successfully: {len(self.df)} rows")
+            return True
             
-            # Clean and prepare data
-            self._clean_data()
+        except Exception as e:
+            self.logger.error(f"Failed to load data: {e}")
+            return False
+    
+    def load_data_many(self, data_paths: List[str]) -> bool:
+        """
+        Load several CSV files (same schema) in parallel and analyze them as one dataset
+        
+        Args:
+            data_paths: Paths of the CSV files to concatenate, in order
+            
+        Returns:
+            True if the data was loaded
+        """
+        if not data_paths:
+            self.logger.error("Failed to load data: no files given")
+            return False
+        
+        try:
+            self.logger.info(f"Loading data from {len(data_paths)} files")
+            self._load_frames(list(data_paths))
             
             self.data_loaded = True
             self.logger.info(f"Data loaded successfully: {len(self.df)} rows")
@@ -42,6 +214,79 @@ class DataAgent(BaseAgent):
             self.logger.error(f"Failed to load data: {e}")
             return False
     
+    def _load_frames(self, data_paths: List[str]):
+        """Read, concatenate and clean the given CSV files into self.df"""
+        df = self._load_with_polars(data_paths) if self.config.get('fast_io', False) else None
+        if df is not None:
+            # Already cleaned by the Polars pipeline
+            self.df = df
+            self._index_dates()
+            self._cache_column_arrays()
+            self._invalidate_analysis_cache()
+            return
+        
+        if len(data_paths) == 1:
+            self.df = self._read_csv(data_paths[0])
+        else:
+            # Parsing releases the GIL, so files are read concurrently
+            with ThreadPoolExecutor(max_workers=min(len(data_paths), os.cpu_count() or 1)) as executor:
+                frames = list(executor.map(self._read_csv, data_paths))
+            self.df = pd.concat(frames, ignore_index=True)
+        
+        # Clean and prepare data
+        self._clean_data()
+    
+    def _read_csv(self, data_path: str) -> pd.DataFrame:
+        """Read CSV with the explicit schema, using the multithreaded Arrow parser when available"""
+        header = pd.read_csv(data_path, nrows=0).columns
+        dtype = {col: dt for col, dt in _CSV_DTYPES.items() if col in header}
+        return pd.read_csv(data_path, engine=_CSV_ENGINE, dtype=dtype)
+    
+    def _load_with_polars(self, data_paths: List[str]) -> Optional[pd.DataFrame]:
+        """Load and clean data with a multithreaded Polars pipeline (None if Polars/PyArrow is unavailable)"""
+        try:
+            import polars as pl
+            import pyarrow as pa
+            import pyarrow.csv as pa_csv
+        except ImportError:
+            self.logger.warning("fast_io enabled but polars/pyarrow is not installed; using pandas")
+            return None
+        
+        # Parse with Arrow: Polars' own reader strips leading whitespace from unquoted fields,
+        # which would merge distinct campaign names; nulls follow pd.read_csv
+        convert_options = pa_csv.ConvertOptions(
+            strings_can_be_null=True,
+            column_types={'date': pa.string(), **{col: pa.float64() for col in _CSV_DTYPES}}
+        )
+        frames = [pl.from_arrow(pa_csv.read_csv(path, convert_options=convert_options)) for path in data_paths]
+        df = frames[0] if len(frames) == 1 else pl.concat(frames, how='vertical_relaxed')
+        columns = set(df.columns)
+        lf = df.lazy()
+        
+        if 'date' in columns and df.schema['date'] == pl.Utf8:
+            lf = lf.with_columns(pl.col('date').str.to_datetime())
+        if 'spend' in columns:
+            lf = lf.with_columns(pl.col('spend').fill_null(0))
+        lf = lf.drop_nulls([col for col in ('campaign_name', 'date') if col in columns])
+        
+        def safe_ratio(numerator: str, denominator: str):
+            """Polars counterpart of _safe_ratio: 0 where the denominator is 0 or either side is missing"""
+            ratio = pl.col(numerator) / pl.col(denominator)
+            return pl.when(pl.col(denominator) != 0).then(ratio).otherwise(0.0).fill_nan(0.0).fill_null(0.0)
+        
+        # Derived metrics if not present (same semantics as _clean_data)
+        derived = []
+        if 'ctr' not in columns and {'clicks', 'impressions'} <= columns:
+            derived.append(safe_ratio('clicks', 'impressions').alias('ctr'))
+        if 'roas' not in columns and {'revenue', 'spend'} <= columns:
+            derived.append(safe_ratio('revenue', 'spend').alias('roas'))
+        if derived:
+            lf = lf.with_columns(derived)
+        
+        result = self._optimize_dtypes(lf.collect().to_pandas())
+        self.logger.info(f"Data cleaned: {len(result)} rows, {len(result.columns)} columns")
+        return result
+    
     def _clean_data(self):
         """Clean and prepare data"""
         if self.df is None:
@@ -61,22 +306,43 @@ class DataAgent(BaseAgent):
         
         # Calculate derived metrics if not present
         if 'ctr' not in self.df.columns and 'clicks' in self.df.columns and 'impressions' in self.df.columns:
-            self.df['ctr'] = self.df['clicks'] / self.df['impressions']
-            self.df['ctr'] = self.df['ctr'].fillna(0)
+            self.df['ctr'] = _safe_ratio(self.df['clicks'], self.df['impressions'])
         
         if 'roas' not in self.df.columns and 'revenue' in self.df.columns and 'spend' in self.df.columns:
-            self.df['roas'] = self.df['revenue'] / self.df['spend']
-            self.df['roas'] = self.df['roas'].replace([np.inf, -np.inf], 0).fillna(0)
+            self.df['roas'] = _safe_ratio(self.df['revenue'], self.df['spend'])
+        
+        self.df = self._optimize_dtypes(self.df)
+        self._index_dates()
+        self._cache_column_arrays()
+        self._invalidate_analysis_cache()
         
         self.logger.info(f"Data cleaned: {len(self.df)} rows, {len(self.df.columns)} columns")
     
-    def analyze_data(self, task_description: str, analysis_period: Optional[str] = None) -> Dict[str, Any]:
+    def _optimize_dtypes(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Downcast integer counts and cast string keys to category for cheaper groupbys"""
+        for col in _COUNT_COLUMNS:
+            if col in df.columns:
+                df[col] = pd.to_numeric(df[col], downcast='integer')
+        
+        for col in _CATEGORY_COLUMNS:
+            if col in df.columns:
+                df[col] = df[col].astype('category')
+        
+        return df
+    
+    def analyze_data(
+        self,
+        task_description: str,
+        analysis_period: Optional[str] = None,
+        sections: Optional[Iterable[str]] = None
+    ) -> Dict[str, Any]:
         """
         Analyze data and generate comprehensive summary
         
         Args:
             task_description: Description of what analysis is needed
             analysis_period: Time period to focus on (e.g., 'last 7 days')
+            sections: Analysis sections to compute (default: all of ANALYSIS_SECTIONS)
             
         Returns:
             Comprehensive data analysis results
@@ -87,20 +353,14 @@ class DataAgent(BaseAgent):
         
         self.logger.info(f"Analyzing data for: {task_description}")
         
-        # Filter by period if specified
-        df_analysis = self._filter_by_period(analysis_period) if analysis_period else self.df
+        period_analysis = self._period_analysis(analysis_period)
         
-        # Compute all analyses
+        # Sections are computed on first request and reused afterwards
         analysis_results = {
-            "data_quality": self._analyze_data_quality(df_analysis),
-            "summary_statistics": self._compute_summary_statistics(df_analysis),
-            "trends": self._analyze_trends(df_analysis),
-            "key_observations": self._identify_key_observations(df_analysis),
-            "top_performers": self._identify_top_performers(df_analysis),
-            "bottom_performers": self._identify_bottom_performers(df_analysis),
-            "segment_analysis": self._analyze_segments(df_analysis),
-            "data_ready_for_analysis": True
+            name: period_analysis.section(name)
+            for name in (ANALYSIS_SECTIONS if sections is None else sections)
         }
+        analysis_results["data_ready_for_analysis"] = True
         
         # Generate LLM-powered insights
         llm_analysis = self._generate_llm_analysis(task_description, analysis_results, analysis_period)
@@ -111,33 +371,134 @@ class DataAgent(BaseAgent):
         self.log_execution("analyze_data", analysis_results, {
             "task": task_description,
             "period": analysis_period,
-            "rows_analyzed": len(df_analysis)
+            "rows_analyzed": len(period_analysis.df)
         })
         
         return analysis_results
     
+    def prefetch_analysis(self, analysis_period: Optional[str] = None):
+        """
+        Compute and cache every analysis section for a period ahead of analyze_data
+        
+        No LLM call or execution log entry is made; a later analyze_data for the same
+        period only assembles the cached sections.
+        
+        Args:
+            analysis_period: Time period to prepare (default: full dataset)
+        """
+        if not self.data_loaded or self.df is None:
+            return
+        
+        period_analysis = self._period_analysis(analysis_period)
+        for name in ANALYSIS_SECTIONS:
+            period_analysis.compute(name)
+    
+    def _period_analysis(self, analysis_period: Optional[str]) -> _PeriodAnalysis:
+        """Cached section store for a period of the current data version"""
+        with self._analysis_lock:
+            cache_key = (analysis_period, self._data_version)
+            period_analysis = self._analysis_cache.get(cache_key)
+            if period_analysis is None:
+                # Filter by period if specified
+                df_analysis = self._filter_by_period(analysis_period) if analysis_period else self.df
+                period_analysis = self._analysis_cache[cache_key] = _PeriodAnalysis(self, df_analysis)
+            return period_analysis
+    
+    def _invalidate_analysis_cache(self):
+        """Bump the data version so cached analyses are recomputed"""
+        with self._analysis_lock:
+            self._data_version += 1
+            self._analysis_cache.clear()
+        self._dataset_info = None
+        self._creative_performance = None
+    
     def _filter_by_period(self, period: str) -> pd.DataFrame:
         """Filter dataframe by time period"""
-        if 'date' not in self.df.columns:
+        if self._date_values is None:
             return self.df
         
-        max_date = self.df['date'].max()
-        
         # Parse period
-        if 'last' in period.lower() and 'day' in period.lower():
-            days = int(''.join(filter(str.isdigit, period)))
-            start_date = max_date - timedelta(days=days)
-            return self.df[self.df['date'] >= start_date]
-        elif 'last' in period.lower() and 'week' in period.lower():
-            weeks = int(''.join(filter(str.isdigit, period)) or '1')
-            start_date = max_date - timedelta(weeks=weeks)
-            return self.df[self.df['date'] >= start_date]
+        match = _PERIOD_RE.search(period) if 'last' in period.lower() else None
+        if match is None:
+            return self.df
+        
+        count = int(match.group(1) or '1')
+        delta = timedelta(days=count) if match.group(2).lower() == 'day' else timedelta(weeks=count)
+        start_date = (self._max_date - delta).to_datetime64()
         
-        return self.df
+        start = np.searchsorted(self._date_values, start_date)
+        if self._date_order is None:
+            return self.df.iloc[start:]
+        # Map the sorted range back to row positions, keeping original row order
+        return self.df.iloc[np.sort(self._date_order[start:])]
+    
+    def _index_dates(self):
+        """Cache date-sorted numpy values (and the sorting permutation) for period filtering"""
+        if 'date' not in self.df.columns:
+            self._max_date, self._date_values, self._date_order = None, None, None
+            return
+        
+        dates = self.df['date']
+        self._max_date = dates.max()
+        if dates.is_monotonic_increasing:
+            self._date_values, self._date_order = dates.to_numpy(), None
+        else:
+            # Stable sort permutation; rows stay in file order so 'first' aggregations are unchanged
+            self._date_order = np.argsort(dates.to_numpy(), kind='stable')
+            self._date_values = dates.to_numpy()[self._date_order]
+    
+    def _campaign_agg(self, df: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """Aggregate spend/revenue sums and ROAS/CTR means per campaign"""
+        if 'campaign_name' not in df.columns:
+            return None
+        
+        agg_spec = {
+            name: (col, func)
+            for name, col, func in (
+                ('spend', 'spend', 'sum'),
+                ('revenue', 'revenue', 'sum'),
+                ('roas', 'roas', 'mean'),
+                ('ctr', 'ctr', 'mean')
+            )
+            if col in df.columns
+        }
+        
+        campaigns = df['campaign_name']
+        if grouped_sums is not None and isinstance(campaigns.dtype, pd.CategoricalDtype):
+            return self._campaign_agg_codes(df, campaigns, agg_spec)
+        return df.groupby('campaign_name', observed=True).agg(**agg_spec)
+    
+    def _campaign_agg_codes(
+        self,
+        df: pd.DataFrame,
+        campaigns: pd.Series,
+        agg_spec: Dict[str, Tuple[str, str]]
+    ) -> pd.DataFrame:
+        """Per-campaign sums/means in one compiled pass over the precomputed category codes"""
+        columns = list(agg_spec)
+        values = df[columns].to_numpy(dtype=np.float64)
+        codes = campaigns.cat.codes.to_numpy().astype(np.int64)
+        sums, counts, rows = grouped_sums(values, codes, len(campaigns.cat.categories))
+        
+        observed = rows > 0
+        result = {}
+        for j, name in enumerate(columns):
+            if agg_spec[name][1] == 'mean':
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    result[name] = np.where(counts[observed, j] > 0, sums[observed, j] / counts[observed, j], np.nan)
+            else:
+                result[name] = sums[observed, j]
+        
+        index = pd.CategoricalIndex(
+            pd.Categorical.from_codes(np.flatnonzero(observed), dtype=campaigns.dtype),
+            name='campaign_name'
+        )
+        return pd.DataFrame(result, index=index)
     
     def _analyze_data_quality(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Analyze data quality"""
-        missing_values = df.isnull().sum().to_dict()
+        # Only columns that had nulls at load time can have nulls in any slice of the frame
+        missing_values = df[self._null_columns].isnull().sum().to_dict()
         missing_values = {k: int(v) for k, v in missing_values.items() if v > 0}
         
         return {
@@ -152,30 +513,37 @@ class DataAgent(BaseAgent):
     
     def _detect_anomalies(self, df: pd.DataFrame) -> List[str]:
         """Detect data anomalies"""
-        anomalies = []
-        
-        # Check for negative values in metrics that should be positive
-        if 'spend' in df.columns and (df['spend'] < 0).any():
-            anomalies.append("Negative spend values detected")
+        # Full-frame analyses reuse the cached column arrays
+        if df is self.df:
+            arrays = self._column_arrays
+        else:
+            arrays = {col: df[col].to_numpy(dtype=np.float64) for col in _METRIC_COLUMNS if col in df.columns}
         
-        if 'revenue' in df.columns and (df['revenue'] < 0).any():
-            anomalies.append("Negative revenue values detected")
-        
-        # Check for unrealistic ROAS values
-        if 'roas' in df.columns:
-            high_roas = df[df['roas'] > 50]
-            if len(high_roas) > 0:
-                anomalies.append(f"{len(high_roas)} rows with unusually high ROAS (>50)")
-        
-        # Check for unrealistic CTR values
-        if 'ctr' in df.columns:
-            high_ctr = df[df['ctr'] > 0.1]  # 10% CTR is very high
-            if len(high_ctr) > 0:
-                anomalies.append(f"{len(high_ctr)} rows with unusually high CTR (>10%)")
+        anomalies = []
+        for col, sign, threshold, message in _ANOMALY_CHECKS:
+            values = arrays.get(col)
+            if values is None:
+                continue
+            count = np.count_nonzero(values * sign > threshold)
+            if count > 0:
+                anomalies.append(message.format(count=count))
         
         return anomalies
     
-    def _compute_summary_statistics(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _cache_column_arrays(self):
+        """Cache float64 numpy arrays of the metric columns (SoA view of self.df) and nullable columns"""
+        self._column_arrays = {
+            col: self.df[col].to_numpy(dtype=np.float64)
+            for col in _METRIC_COLUMNS
+            if col in self.df.columns
+        }
+        self._null_columns = [col for col in self.df.columns if self.df[col].hasnans]
+    
+    def _compute_summary_statistics(
+        self,
+        df: pd.DataFrame,
+        campaign_agg: Optional[pd.DataFrame] = None
+    ) -> Dict[str, Any]:
         """Compute summary statistics"""
         overall_stats = {
             "total_spend": float(df['spend'].sum()) if 'spend' in df.columns else 0,
@@ -190,59 +558,33 @@ class DataAgent(BaseAgent):
         # By campaign
         by_campaign = []
         if 'campaign_name' in df.columns:
-            campaign_groups = df.groupby('campaign_name').agg({
-                'spend': 'sum',
-                'revenue': 'sum',
-                'roas': 'mean',
-                'ctr': 'mean'
-            }).round(2)
-            
-            for campaign, row in campaign_groups.iterrows():
-                by_campaign.append({
-                    "campaign_name": campaign,
-                    "spend": float(row['spend']),
-                    "revenue": float(row['revenue']),
-                    "roas": float(row['roas']),
-                    "ctr": float(row['ctr'])
-                })
-        
-        # By creative type
-        by_creative = {}
-        if 'creative_type' in df.columns:
-            creative_groups = df.groupby('creative_type').agg({
-                'roas': 'mean',
-                'ctr': 'mean',
-                'spend': 'sum'
-            }).round(3)
-            # Convert to serializable dict
-            for ctype, row in creative_groups.iterrows():
-                by_creative[str(ctype)] = {
-                    'roas': float(row['roas']),
-                    'ctr': float(row['ctr']),
-                    'spend': float(row['spend'])
-                }
-        
-        # By audience type
-        by_audience = {}
-        if 'audience_type' in df.columns:
-            audience_groups = df.groupby('audience_type').agg({
-                'roas': 'mean',
-                'ctr': 'mean',
-                'spend': 'sum'
-            }).round(3)
-            # Convert to serializable dict
-            for atype, row in audience_groups.iterrows():
-                by_audience[str(atype)] = {
-                    'roas': float(row['roas']),
-                    'ctr': float(row['ctr']),
-                    'spend': float(row['spend'])
+            if campaign_agg is None:
+                campaign_agg = self._campaign_agg(df)
+            campaign_groups = campaign_agg[['spend', 'revenue', 'roas', 'ctr']].head(10).round(2)
+            by_campaign = _float_frame(campaign_groups).reset_index().to_dict(orient='records')
+        
+        # By creative type and audience type (one pass over a shared metric projection)
+        by_type = {'creative_type': {}, 'audience_type': {}}
+        keys = [key for key in by_type if key in df.columns]
+        if keys:
+            metrics = df[['roas', 'ctr', 'spend']]
+            for key in keys:
+                groups = metrics.groupby(df[key], observed=True).agg({
+                    'roas': 'mean',
+                    'ctr': 'mean',
+                    'spend': 'sum'
+                }).round(3)
+                # Convert to serializable dict
+                by_type[key] = {
+                    str(value): metrics_row
+                    for value, metrics_row in _float_frame(groups).to_dict(orient='index').items()
                 }
         
         return {
             "overall": overall_stats,
             "by_campaign": by_campaign[:10],  # Top 10 campaigns
-            "by_creative_type": by_creative,
-            "by_audience_type": by_audience
+            "by_creative_type": by_type['creative_type'],
+            "by_audience_type": by_type['audience_type']
         }
     
     def _analyze_trends(self, df: pd.DataFrame) -> Dict[str, Any]:
@@ -250,25 +592,17 @@ class DataAgent(BaseAgent):
         if 'date' not in df.columns:
             return {"error": "No date column available"}
         
-        # Group by date
+        # Group by date (groupby returns dates already sorted)
         daily_stats = df.groupby('date').agg({
             'spend': 'sum',
             'revenue': 'sum',
             'roas': 'mean',
             'ctr': 'mean'
-        }).sort_index()
+        })
         
-        # Calculate trends
+        # Calculate trends (single-scan kernel over the raw column values)
         def get_trend(series):
-            if len(series) < 2:
-                return "stable"
-            recent = series.tail(len(series)//2).mean()
-            older = series.head(len(series)//2).mean()
-            if recent > older * 1.1:
-                return "increasing"
-            elif recent < older * 0.9:
-                return "decreasing"
-            return "stable"
+            return TREND_LABELS[trend_code(series.to_numpy(dtype=np.float64))]
         
         return {
             "roas_trend": get_trend(daily_stats['roas']),
@@ -277,13 +611,19 @@ class DataAgent(BaseAgent):
             "time_series_summary": f"Analysis of {len(daily_stats)} days from {daily_stats.index.min().strftime('%Y-%m-%d')} to {daily_stats.index.max().strftime('%Y-%m-%d')}"
         }
     
-    def _identify_key_observations(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+    def _identify_key_observations(
+        self,
+        df: pd.DataFrame,
+        campaign_agg: Optional[pd.DataFrame] = None
+    ) -> List[Dict[str, Any]]:
         """Identify key observations"""
         observations = []
+        if campaign_agg is None:
+            campaign_agg = self._campaign_agg(df)
         
         # Check for significant ROAS variations
         if 'roas' in df.columns and 'campaign_name' in df.columns:
-            campaign_roas = df.groupby('campaign_name')['roas'].mean()
+            campaign_roas = campaign_agg['roas']
             if campaign_roas.std() > 1.0:
                 observations.append({
                     "observation": f"High ROAS variation across campaigns (std={campaign_roas.std():.2f})",
@@ -294,7 +634,7 @@ class DataAgent(BaseAgent):
         # Check for low CTR campaigns
         if 'ctr' in df.columns and 'campaign_name' in df.columns:
             low_ctr_threshold = self.config.get('thresholds', {}).get('ctr_low_threshold', 0.015)
-            campaign_ctr = df.groupby('campaign_name')['ctr'].mean()
+            campaign_ctr = campaign_agg['ctr']
             low_ctr_campaigns = campaign_ctr[campaign_ctr < low_ctr_threshold]
             if len(low_ctr_campaigns) > 0:
                 observations.append({
@@ -305,72 +645,63 @@ class DataAgent(BaseAgent):
         
         return observations
     
-    def _identify_top_performers(self, df: pd.DataFrame) -> Dict[str, List]:
+    def _identify_top_performers(
+        self,
+        df: pd.DataFrame,
+        campaign_agg: Optional[pd.DataFrame] = None
+    ) -> Dict[str, List]:
         """Identify top performing campaigns/adsets"""
         top_performers = {}
         
         if 'campaign_name' in df.columns:
-            # By ROAS
-            campaign_roas = df.groupby('campaign_name').agg({
-                'roas': 'mean',
-                'spend': 'sum'
-            })
+            if campaign_agg is None:
+                campaign_agg = self._campaign_agg(df)
             # Filter by minimum spend
             min_spend = self.config.get('thresholds', {}).get('spend_significance', 100)
-            campaign_roas = campaign_roas[campaign_roas['spend'] >= min_spend]
+            significant = campaign_agg[campaign_agg['spend'] >= min_spend]
             
-            top_roas = campaign_roas.nlargest(5, 'roas')
+            # By ROAS
+            top_roas = _topk(significant, 'roas', 5)
             top_performers['by_roas'] = [
-                {"name": name, "value": float(row['roas'])}
-                for name, row in top_roas.iterrows()
+                {"name": name, "value": float(value)}
+                for name, value in top_roas['roas'].items()
             ]
             
             # By CTR
-            campaign_ctr = df.groupby('campaign_name').agg({
-                'ctr': 'mean',
-                'spend': 'sum'
-            })
-            campaign_ctr = campaign_ctr[campaign_ctr['spend'] >= min_spend]
-            
-            top_ctr = campaign_ctr.nlargest(5, 'ctr')
+            top_ctr = _topk(significant, 'ctr', 5)
             top_performers['by_ctr'] = [
-                {"name": name, "value": float(row['ctr'])}
-                for name, row in top_ctr.iterrows()
+                {"name": name, "value": float(value)}
+                for name, value in top_ctr['ctr'].items()
             ]
         
         return top_performers
     
-    def _identify_bottom_performers(self, df: pd.DataFrame) -> Dict[str, List]:
+    def _identify_bottom_performers(
+        self,
+        df: pd.DataFrame,
+        campaign_agg: Optional[pd.DataFrame] = None
+    ) -> Dict[str, List]:
         """Identify bottom performing campaigns/adsets"""
         bottom_performers = {}
         
         if 'campaign_name' in df.columns:
+            if campaign_agg is None:
+                campaign_agg = self._campaign_agg(df)
             min_spend = self.config.get('thresholds', {}).get('spend_significance', 100)
+            significant = campaign_agg[campaign_agg['spend'] >= min_spend]
             
             # By ROAS
-            campaign_roas = df.groupby('campaign_name').agg({
-                'roas': 'mean',
-                'spend': 'sum'
-            })
-            campaign_roas = campaign_roas[campaign_roas['spend'] >= min_spend]
-            
-            bottom_roas = campaign_roas.nsmallest(5, 'roas')
+            bottom_roas = _topk(significant, 'roas', 5, largest=False)
             bottom_performers['by_roas'] = [
-                {"name": name, "value": float(row['roas'])}
-                for name, row in bottom_roas.iterrows()
+                {"name": name, "value": float(value)}
+                for name, value in bottom_roas['roas'].items()
             ]
             
             # By CTR
-            campaign_ctr = df.groupby('campaign_name').agg({
-                'ctr': 'mean',
-                'spend': 'sum'
-            })
-            campaign_ctr = campaign_ctr[campaign_ctr['spend'] >= min_spend]
-            
-            bottom_ctr = campaign_ctr.nsmallest(5, 'ctr')
+            bottom_ctr = _topk(significant, 'ctr', 5, largest=False)
             bottom_performers['by_ctr'] = [
-                {"name": name, "value": float(row['ctr'])}
-                for name, row in bottom_ctr.iterrows()
+                {"name": name, "value": float(value)}
+                for name, value in bottom_ctr['ctr'].items()
             ]
         
         return bottom_performers
@@ -381,32 +712,73 @@ class DataAgent(BaseAgent):
         
         # By creative type and audience type
         if 'creative_type' in df.columns and 'audience_type' in df.columns:
-            segment_analysis = df.groupby(['creative_type', 'audience_type']).agg({
+            creative_types, audience_types = df['creative_type'], df['audience_type']
+            if (isinstance(creative_types.dtype, pd.CategoricalDtype)
+                    and isinstance(audience_types.dtype, pd.CategoricalDtype)):
+                segments['creative_x_audience'] = self._segment_stats_codes(df, creative_types, audience_types)
+                return segments
+            
+            segment_analysis = df.groupby(['creative_type', 'audience_type'], observed=True).agg({
                 'roas': 'mean',
                 'ctr': 'mean',
                 'spend': 'sum'
             }).round(3)
             
             # Convert to serializable dict
-            segments['creative_x_audience'] = {}
-            for (ctype, atype), row in segment_analysis.iterrows():
-                key = f"{ctype}_{atype}"
-                segments['creative_x_audience'][key] = {
-                    'roas': float(row['roas']),
-                    'ctr': float(row['ctr']),
-                    'spend': float(row['spend'])
-                }
+            segments['creative_x_audience'] = {
+                f"{ctype}_{atype}": metrics_row
+                for (ctype, atype), metrics_row in _float_frame(segment_analysis).to_dict(orient='index').items()
+            }
         
         return segments
     
+    def _segment_stats_codes(
+        self,
+        df: pd.DataFrame,
+        creative_types: pd.Series,
+        audience_types: pd.Series
+    ) -> Dict[str, Dict[str, float]]:
+        """creative_type x audience_type stats via one composite integer key (no tuple hashing)"""
+        creative_names = creative_types.cat.categories
+        audience_names = audience_types.cat.categories
+        n_audiences = len(audience_names)
+        
+        creative_codes = creative_types.cat.codes.to_numpy().astype(np.int64)
+        audience_codes = audience_types.cat.codes.to_numpy().astype(np.int64)
+        keys = np.where(
+            (creative_codes >= 0) & (audience_codes >= 0),
+            creative_codes * n_audiences + audience_codes,
+            -1
+        )
+        
+        values = df[['roas', 'ctr', 'spend']].to_numpy(dtype=np.float64)
+        reduce_sums = grouped_sums if grouped_sums is not None else bincount_sums
+        sums, counts, rows = reduce_sums(values, keys, len(creative_names) * n_audiences)
+        
+        # Observed combinations in (creative, audience) order, as the 2-key groupby returns them
+        observed = np.flatnonzero(rows)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            stats = np.column_stack([
+                sums[observed, 0] / counts[observed, 0],
+                sums[observed, 1] / counts[observed, 1],
+                sums[observed, 2]
+            ]).round(3)
+        
+        return {
+            f"{creative_names[key // n_audiences]}_{audience_names[key % n_audiences]}": {
+                'roas': roas,
+                'ctr': ctr,
+                'spend': spend
+            }
+            for key, (roas, ctr, spend) in zip(observed.tolist(), stats.tolist())
+        }
+    
     def _generate_llm_analysis(self, task: str, analysis: Dict[str, Any], period: Optional[str]) -> Optional[Dict]:
         """Generate LLM-powered insights from analysis"""
-        # Format analysis summary for LLM
-        summary_text = json.dumps(analysis, indent=2, default=str)
-        
+        # Format analysis summary for LLM (encoding stops once the truncation limit is reached)
         prompt_vars = {
             "task_description": task,
-            "data_summary": summary_text[:2000],  # Truncate if too long
+            "data_summary": self.truncate_json(analysis, 2000, indent=2),
             "analysis_period": period or "full dataset",
             "metrics_requested": "roas, ctr, spend, revenue"
         }
@@ -424,39 +796,61 @@ class DataAgent(BaseAgent):
         if not self.data_loaded or self.df is None:
             return []
         
+        # The frame does not change between loads; rows are copied so callers may edit them
+        if self._creative_performance is not None:
+            return [dict(row) for row in self._creative_performance]
+        
         creative_perf = []
         
         if 'creative_message' in self.df.columns:
-            creative_groups = self.df.groupby('creative_message').agg({
+            metrics = self.df.groupby('creative_message', observed=True).agg({
                 'roas': 'mean',
                 'ctr': 'mean',
                 'spend': 'sum',
-                'revenue': 'sum',
-                'creative_type': 'first',
-                'campaign_name': 'first'
+                'revenue': 'sum'
             }).round(3)
+            # First non-null value per message supplies each descriptive column, as 'first' does
+            # (no per-group reduction)
+            first_values = {
+                col: self.df[['creative_message', col]].dropna(subset=[col])
+                .drop_duplicates('creative_message').set_index('creative_message')[col]
+                for col in ('creative_type', 'campaign_name')
+            }
+            creative_groups = metrics.join(pd.DataFrame(first_values))
             
-            for message, row in creative_groups.iterrows():
-                creative_perf.append({
-                    "creative_message": message,
-                    "creative_type": row['creative_type'],
-                    "campaign_name": row['campaign_name'],
-                    "roas": float(row['roas']),
-                    "ctr": float(row['ctr']),
-                    "spend": float(row['spend']),
-                    "revenue": float(row['revenue'])
-                })
+            creative_perf = creative_groups.reset_index()[[
+                'creative_message', 'creative_type', 'campaign_name', 'roas', 'ctr', 'spend', 'revenue'
+            ]].to_dict(orient='records')
         
-        return creative_perf
+        self._creative_performance = creative_perf
+        return [dict(row) for row in creative_perf]
     
     def get_dataset_info(self) -> Dict[str, Any]:
         """Get basic dataset information"""
         if not self.data_loaded or self.df is None:
             return {}
         
-        return {
-            "schema": {col: str(dtype) for col, dtype in self.df.dtypes.items()},
-            "date_range": f"{self.df['date'].min()} to {self.df['date'].max()}" if 'date' in self.df.columns else "Unknown",
-            "total_rows": len(self.df),
-            "campaigns": self.df['campaign_name'].nunique() if 'campaign_name' in self.df.columns else 0
-        }
+        if self._dataset_info is None:
+            if self._date_values is None:
+                date_range = "Unknown"
+            else:
+                # An empty frame has no first date; report NaT like Series.min() does
+                min_date = pd.Timestamp(self._date_values[0]) if len(self._date_values) else pd.NaT
+                date_range = f"{min_date} to {self._max_date}"
+            self._dataset_info = {
+                "schema": {col: str(dtype) for col, dtype in self.df.dtypes.items()},
+                "date_range": date_range,
+                "total_rows": len(self.df),
+                "campaigns": self._count_campaigns()
+            }
+        return dict(self._dataset_info)
+    
+    def _count_campaigns(self) -> int:
+        """Distinct campaign count, read from the category dictionary when available"""
+        if 'campaign_name' not in self.df.columns:
+            return 0
+        campaigns = self.df['campaign_name']
+        if isinstance(campaigns.dtype, pd.CategoricalDtype):
+            # Categories are built from the cleaned column, so every category is observed
+            return len(campaigns.cat.categories)
+        return campaigns.nunique()
@@ -2,12 +2,40 @@
 Evaluator Agent - Validates hypotheses with statistical analysis
 """
 
+import os
+import re
+import copy
 import json
+from bisect import bisect_right
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, List, Optional
-from scipy import stats
+from typing import Dict, Any, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from scipy import special, stats
 from .base_agent import BaseAgent
+from ._stats_kernels import grouped_sums, linregress_index, pooled_ttest, roas_trend
+
+# Cohen's d cut-offs and the magnitude label for each band between them
+_EFFECT_THRESHOLDS = (0.2, 0.5, 0.8)
+_EFFECT_MAGNITUDES = (
+    "negligible effect size",
+    "small effect size",
+    "medium effect size",
+    "large effect size"
+)
+
+# Statistical test routine per hypothesis kind, in dispatch priority order
+_TEST_HANDLERS = {
+    "creative": "_test_creative_hypothesis",
+    "audience": "_test_audience_hypothesis",
+    "roas": "_test_roas_hypothesis",
+    "ctr": "_test_ctr_hypothesis"
+}
+
+# Kinds matched anywhere in the hypothesis id (lookahead, so overlapping kinds are all found);
+# only the category kinds below also match on the category
+_TEST_KIND_RE = re.compile("(?=(%s))" % "|".join(_TEST_HANDLERS))
+_CATEGORY_TEST_KINDS = ("creative", "audience")
 
 
 class EvaluatorAgent(BaseAgent):
@@ -23,6 +51,15 @@ class EvaluatorAgent(BaseAgent):
         super().__init__("Evaluator", config, logger)
         self.prompt_template = self.load_prompt("evaluator_prompt")
         self.data_agent = data_agent
+        self._log_full_results = config.get('logging', {}).get('full_results', False)
+        
+        # Numpy views of data_agent.df, rebuilt only when the frame object changes
+        self._views_df: Optional[pd.DataFrame] = None
+        self._column_views: Dict[str, np.ndarray] = {}
+        self._key_views: Dict[str, pd.Series] = {}
+        self._valid_masks: Dict[str, np.ndarray] = {}
+        self._partitions: Dict[str, Tuple[Any, np.ndarray, np.ndarray]] = {}
+        self._stat_cache: Dict[str, Dict[str, Any]] = {}
     
     def evaluate_hypothesis(
         self,
@@ -55,8 +92,12 @@ class EvaluatorAgent(BaseAgent):
         # Determine evaluation result
         evaluation['evaluation_result'] = self._determine_result(confidence)
         
-        # Log execution
-        self.log_execution("evaluate_hypothesis", evaluation, {
+        # Log execution; the full evaluation (with every test) only when opted in
+        if self._log_full_results:
+            log_payload = evaluation
+        else:
+            log_payload = {"result": evaluation['evaluation_result'], "confidence": confidence}
+        self.log_execution("evaluate_hypothesis", log_payload, {
             "hypothesis_id": hypothesis.get('hypothesis_id'),
             "confidence": confidence
         })
@@ -69,19 +110,59 @@ class EvaluatorAgent(BaseAgent):
         data_summary: Dict[str, Any]
     ) -> List[Dict[str, Any]]:
         """Evaluate all hypotheses"""
-        results = []
-        
-        for hypothesis in hypotheses.get('hypotheses', []):
-            evaluation = self.evaluate_hypothesis(hypothesis, data_summary)
-            results.append(evaluation)
+        # Build the shared column views once, before any worker reads them
+        self._refresh_views()
+        hypothesis_list = hypotheses.get('hypotheses', [])
+        
+        if len(hypothesis_list) <= 1:
+            return [self.evaluate_hypothesis(hypothesis, data_summary) for hypothesis in hypothesis_list]
+        
+        # Test plan: each distinct test kind runs once, on the first hypothesis that needs it
+        test_kinds = [self._test_kind(hypothesis) for hypothesis in hypothesis_list]
+        plan = {}
+        for test_kind, hypothesis in zip(test_kinds, hypothesis_list):
+            if test_kind is not None and test_kind not in self._stat_cache:
+                plan.setdefault(test_kind, hypothesis)
+        
+        # Hypotheses are independent and the scipy/numpy tests release the GIL;
+        # map() keeps results in hypothesis order
+        with ThreadPoolExecutor(max_workers=min(len(hypothesis_list), os.cpu_count() or 1)) as executor:
+            # Tests are queued ahead of the evaluations, so a worker waiting below only
+            # ever waits on a test that is already running or done
+            test_runs = {}
+            if self.data_agent.df is not None:
+                test_runs = {kind: executor.submit(self._cached_tests, kind, hypothesis) for kind, hypothesis in plan.items()}
+            
+            def evaluate(test_kind: Optional[str], hypothesis: Dict[str, Any]) -> Dict[str, Any]:
+                # Pipelined: evidence for a hypothesis starts as soon as its own test kind is done
+                if test_kind in test_runs:
+                    test_runs[test_kind].result()
+                return self.evaluate_hypothesis(hypothesis, data_summary)
+            
+            return list(executor.map(evaluate, test_kinds, hypothesis_list))
+    
+    def _test_kind(self, hypothesis: Dict[str, Any]) -> Optional[str]:
+        """Test kind for a hypothesis: one regex scan of the id, highest-priority kind wins"""
+        found = {match.group(1) for match in _TEST_KIND_RE.finditer(hypothesis.get('hypothesis_id', ''))}
+        category = hypothesis.get('category', 'general')
+        if category in _CATEGORY_TEST_KINDS:
+            found.add(category)
+        return next((kind for kind in _TEST_HANDLERS if kind in found), None)
+    
+    def _cached_tests(self, test_kind: str, hypothesis: Dict[str, Any]) -> Dict[str, Any]:
+        """Results of one test kind on data_agent.df, shared by all hypotheses of that kind"""
+        df = self.data_agent.df
         
-        return results
+        # The tests depend only on the frame, so hypotheses of the same kind share them
+        cached = self._stat_cache.get(test_kind) if df is self._views_df else None
+        if cached is None:
+            cached = getattr(self, _TEST_HANDLERS[test_kind])(df, hypothesis)
+            if df is self._views_df:
+                self._stat_cache[test_kind] = cached
+        return cached
     
     def _perform_statistical_tests(self, hypothesis: Dict[str, Any]) -> Dict[str, Any]:
         """Perform relevant statistical tests for the hypothesis"""
-        category = hypothesis.get('category', 'general')
-        hypothesis_id = hypothesis.get('hypothesis_id', '')
-        
         results = {
             "tests_performed": [],
             "summary": {}
@@ -90,19 +171,15 @@ class EvaluatorAgent(BaseAgent):
         if self.data_agent.df is None:
             return results
         
-        df = self.data_agent.df
+        self._refresh_views()
         
         # Test based on category
-        if 'creative' in hypothesis_id or category == 'creative':
-            results = self._test_creative_hypothesis(df, hypothesis)
-        elif 'audience' in hypothesis_id or category == 'audience':
-            results = self._test_audience_hypothesis(df, hypothesis)
-        elif 'roas' in hypothesis_id:
-            results = self._test_roas_hypothesis(df, hypothesis)
-        elif 'ctr' in hypothesis_id:
-            results = self._test_ctr_hypothesis(df, hypothesis)
-        
-        return results
+        test_kind = self._test_kind(hypothesis)
+        if test_kind is None:
+            return results
+        
+        # Evaluations embed the tests, so each caller gets its own copy
+        return copy.deepcopy(self._cached_tests(test_kind, hypothesis))
     
     def _test_creative_hypothesis(self, df: pd.DataFrame, hypothesis: Dict[str, Any]) -> Dict[str, Any]:
         """Test creative-related hypotheses"""
@@ -112,26 +189,15 @@ class EvaluatorAgent(BaseAgent):
             return {"tests_performed": tests, "summary": {}}
         
         # Compare ROAS across creative types
-        creative_groups = []
-        for ctype in df['creative_type'].unique():
-            group_data = df[df['creative_type'] == ctype]['roas'].dropna()
-            if len(group_data) >= 3:  # Minimum sample size
-                creative_groups.append({
-                    'name': ctype,
-                    'data': group_data,
-                    'mean': group_data.mean(),
-                    'std': group_data.std(),
-                    'n': len(group_data)
-                })
+        group_names, group_values, group_offsets = self._roas_groups(df, 'creative_type')
         
-        if len(creative_groups) >= 2:
+        if len(group_names) >= 2:
             # Perform ANOVA or t-test
-            group_data_arrays = [g['data'] for g in creative_groups]
+            group_data_arrays = np.split(group_values, group_offsets[1:-1])
             
-            if len(creative_groups) == 2:
+            if len(group_names) == 2:
                 # T-test for two groups
-                t_stat, p_value = stats.ttest_ind(group_data_arrays[0], group_data_arrays[1])
-                effect_size = self._calculate_cohens_d(group_data_arrays[0], group_data_arrays[1])
+                t_stat, p_value, effect_size = self._ttest_ind(group_data_arrays[0], group_data_arrays[1])
                 
                 tests.append({
                     "test_name": "Independent t-test",
@@ -160,7 +226,7 @@ class EvaluatorAgent(BaseAgent):
         
         # CTR comparison
         if 'ctr' in df.columns:
-            creative_ctr_means = df.groupby('creative_type')['ctr'].mean().to_dict()
+            creative_ctr_means = self._group_means(df, 'creative_type', 'ctr')
             tests.append({
                 "test_name": "Descriptive comparison",
                 "metric": "ctr_by_creative_type",
@@ -173,10 +239,120 @@ class EvaluatorAgent(BaseAgent):
         return {
             "tests_performed": tests,
             "summary": {
-                "creative_groups": [{'name': g['name'], 'mean_roas': round(g['mean'], 3), 'n': g['n']} for g in creative_groups]
+                "creative_groups": self._group_summary(group_names, group_values, group_offsets)
             }
         }
     
+    def _refresh_views(self):
+        """Cache float64 metric arrays of data_agent.df; no-op while the frame object is unchanged"""
+        df = self.data_agent.df
+        if df is None or df is self._views_df:
+            return
+        
+        self._views_df = df
+        self._column_views = {
+            col: df[col].to_numpy(dtype=np.float64)
+            for col in ('roas', 'ctr')
+            if col in df.columns
+        }
+        # One NaN scan per metric, shared by every group split and test
+        self._valid_masks = {col: ~np.isnan(values) for col, values in self._column_views.items()}
+        # Dictionary-encode group keys so groupings work on integer codes (no-op for
+        # DataAgent frames, which already store them as category)
+        self._key_views = {
+            col: df[col] if isinstance(df[col].dtype, pd.CategoricalDtype) else df[col].astype('category')
+            for col in ('creative_type', 'audience_type')
+            if col in df.columns
+        }
+        self._partitions = {}
+        self._stat_cache = {}
+    
+    def _column_values(self, df: pd.DataFrame, column: str) -> np.ndarray:
+        """float64 values of a metric column, from the cached views when df is the viewed frame"""
+        if df is self._views_df and column in self._column_views:
+            return self._column_views[column]
+        return df[column].to_numpy(dtype=np.float64)
+    
+    def _valid_mask(self, df: pd.DataFrame, column: str) -> np.ndarray:
+        """Non-NaN mask of a metric column, from the cached views when df is the viewed frame"""
+        if df is self._views_df and column in self._valid_masks:
+            return self._valid_masks[column]
+        return ~np.isnan(self._column_values(df, column))
+    
+    def _key_values(self, df: pd.DataFrame, column: str) -> pd.Series:
+        """Categorical group-key column, from the cached views when df is the viewed frame"""
+        if df is self._views_df and column in self._key_views:
+            return self._key_views[column]
+        return df[column]
+    
+    def _partition(self, df: pd.DataFrame, column: str) -> Tuple[Any, np.ndarray, np.ndarray]:
+        """
+        Rows grouped by column values: (uniques in order of first appearance, stable row order, group bounds)
+        
+        Group i spans order[bounds[i]:bounds[i + 1]]; rows keep frame order within a group.
+        Rows with a missing value come first in order, before bounds[0].
+        """
+        cached = self._partitions.get(column) if df is self._views_df else None
+        if cached is not None:
+            return cached
+        
+        codes, uniques = pd.factorize(self._key_values(df, column))
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+        partition = (uniques, order, bounds)
+        
+        if df is self._views_df:
+            self._partitions[column] = partition
+        return partition
+    
+    def _group_means(self, df: pd.DataFrame, column: str, metric: str) -> Dict[Any, float]:
+        """Mean of metric per observed value of column, keyed in sorted (category) order like groupby"""
+        if grouped_sums is None:
+            return df.groupby(column, observed=True)[metric].mean().to_dict()
+        
+        keys = self._key_values(df, column)
+        if isinstance(keys.dtype, pd.CategoricalDtype):
+            codes, names = keys.cat.codes.to_numpy(dtype=np.intp), keys.cat.categories
+        else:
+            codes, names = pd.factorize(keys, sort=True)
+        
+        # Compensated sums in row order, so means are bit-identical to groupby().mean()
+        values = self._column_values(df, metric).reshape(-1, 1)
+        sums, counts, rows = grouped_sums(values, codes, len(names))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = sums[:, 0] / counts[:, 0]
+        return {names[i]: float(means[i]) for i in np.flatnonzero(rows)}
+    
+    def _roas_groups(self, df: pd.DataFrame, column: str, min_size: int = 3) -> Tuple[List[Any], np.ndarray, np.ndarray]:
+        """
+        Split ROAS (NaNs dropped) by column into a CSR layout; groups in order of first appearance
+        
+        Returns:
+            (group names, concatenated group values, offsets) where group i occupies
+            values[offsets[i]:offsets[i + 1]]; groups below min_size are left out
+        """
+        uniques, order, bounds = self._partition(df, column)
+        
+        # Keep only non-NaN rows of groups that meet the minimum sample size, in one gather
+        keep = self._valid_mask(df, 'roas')[order]
+        sizes = np.diff(np.concatenate(([0], np.cumsum(keep)))[bounds])
+        qualifying = sizes >= min_size
+        # Rows with a missing key (code -1) sort ahead of bounds[0] and belong to no group
+        keep[:bounds[0]] = False
+        keep[bounds[0]:] &= np.repeat(qualifying, np.diff(bounds))
+        
+        values = self._column_values(df, 'roas')[order[keep]]
+        offsets = np.concatenate(([0], np.cumsum(sizes[qualifying])))
+        names = [uniques[code] for code in np.flatnonzero(qualifying)]
+        return names, values, offsets
+    
+    def _group_summary(self, names: List[Any], values: np.ndarray, offsets: np.ndarray) -> List[Dict[str, Any]]:
+        """Name, mean ROAS and size of each group in a CSR split"""
+        return [
+            {'name': name, 'mean_roas': round(values[start:end].mean(), 3), 'n': int(end - start)}
+            for name, start, end in zip(names, offsets[:-1], offsets[1:])
+        ]
+    
     def _test_audience_hypothesis(self, df: pd.DataFrame, hypothesis: Dict[str, Any]) -> Dict[str, Any]:
         """Test audience-related hypotheses"""
         tests = []
@@ -185,24 +361,13 @@ class EvaluatorAgent(BaseAgent):
             return {"tests_performed": tests, "summary": {}}
         
         # Compare ROAS across audience types
-        audience_groups = []
-        for atype in df['audience_type'].unique():
-            group_data = df[df['audience_type'] == atype]['roas'].dropna()
-            if len(group_data) >= 3:
-                audience_groups.append({
-                    'name': atype,
-                    'data': group_data,
-                    'mean': group_data.mean(),
-                    'std': group_data.std(),
-                    'n': len(group_data)
-                })
+        group_names, group_values, group_offsets = self._roas_groups(df, 'audience_type')
         
-        if len(audience_groups) >= 2:
-            group_data_arrays = [g['data'] for g in audience_groups]
+        if len(group_names) >= 2:
+            group_data_arrays = np.split(group_values, group_offsets[1:-1])
             
-            if len(audience_groups) == 2:
-                t_stat, p_value = stats.ttest_ind(group_data_arrays[0], group_data_arrays[1])
-                effect_size = self._calculate_cohens_d(group_data_arrays[0], group_data_arrays[1])
+            if len(group_names) == 2:
+                t_stat, p_value, effect_size = self._ttest_ind(group_data_arrays[0], group_data_arrays[1])
                 
                 tests.append({
                     "test_name": "Independent t-test",
@@ -231,7 +396,7 @@ class EvaluatorAgent(BaseAgent):
         return {
             "tests_performed": tests,
             "summary": {
-                "audience_groups": [{'name': g['name'], 'mean_roas': round(g['mean'], 3), 'n': g['n']} for g in audience_groups]
+                "audience_groups": self._group_summary(group_names, group_values, group_offsets)
             }
         }
     
@@ -246,29 +411,20 @@ class EvaluatorAgent(BaseAgent):
         daily_roas = df.groupby('date')['roas'].mean().sort_index()
         
         if len(daily_roas) >= 7:
-            # Split into early vs late period
-            mid_point = len(daily_roas) // 2
-            early_period = daily_roas.iloc[:mid_point]
-            late_period = daily_roas.iloc[mid_point:]
-            
-            # T-test comparing periods
-            t_stat, p_value = stats.ttest_ind(early_period, late_period)
-            effect_size = self._calculate_cohens_d(early_period, late_period)
+            (early_mean, late_mean, t_stat, p_value, effect_size,
+             slope, r_value, p_value_trend) = self._roas_trend_stats(daily_roas.to_numpy())
             
+            # T-test comparing early vs late period
             tests.append({
                 "test_name": "Time period comparison (t-test)",
                 "metric": "roas_early_vs_late",
-                "result": f"Early: {early_period.mean():.3f}, Late: {late_period.mean():.3f}, t={t_stat:.3f}, p={p_value:.4f}",
+                "result": f"Early: {early_mean:.3f}, Late: {late_mean:.3f}, t={t_stat:.3f}, p={p_value:.4f}",
                 "p_value": float(p_value),
                 "effect_size": f"Cohen's d = {effect_size:.3f}",
                 "interpretation": self._interpret_test_result(p_value, effect_size)
             })
             
             # Trend analysis
-            x = np.arange(len(daily_roas))
-            y = daily_roas.values
-            slope, intercept, r_value, p_value_trend, std_err = stats.linregress(x, y)
-            
             tests.append({
                 "test_name": "Linear trend analysis",
                 "metric": "roas_over_time",
@@ -295,11 +451,12 @@ class EvaluatorAgent(BaseAgent):
             return {"tests_performed": tests, "summary": {}}
         
         # Overall CTR analysis
-        overall_ctr = df['ctr'].mean()
+        ctr = self._column_values(df, 'ctr')[self._valid_mask(df, 'ctr')]
+        overall_ctr = ctr.mean() if len(ctr) else np.nan
         benchmark_ctr = 0.015  # 1.5% benchmark
         
         # One-sample t-test against benchmark
-        t_stat, p_value = stats.ttest_1samp(df['ctr'].dropna(), benchmark_ctr)
+        t_stat, p_value = stats.ttest_1samp(ctr, benchmark_ctr)
         
         tests.append({
             "test_name": "One-sample t-test vs benchmark",
@@ -319,10 +476,47 @@ class EvaluatorAgent(BaseAgent):
             }
         }
     
+    def _ttest_ind(self, group1: np.ndarray, group2: np.ndarray) -> Tuple[float, float, float]:
+        """Student's two-sample t-test; returns (t statistic, two-sided p-value, Cohen's d)"""
+        if pooled_ttest is not None:
+            # Compiled single-pass kernel; only the p-value goes through scipy.special
+            t_stat, dof, effect_size = pooled_ttest(group1, group2)
+            return t_stat, 2.0 * special.stdtr(dof, -abs(t_stat)), effect_size
+        
+        t_stat, p_value = stats.ttest_ind(group1, group2)
+        return t_stat, p_value, self._calculate_cohens_d(group1, group2)
+    
+    def _roas_trend_stats(self, y: np.ndarray) -> Tuple[float, ...]:
+        """
+        Early-vs-late t-test and linear trend of a daily series
+        
+        Returns:
+            (early mean, late mean, t, p, Cohen's d, slope, r, trend p)
+        """
+        if roas_trend is not None:
+            # One fused compiled pass instead of the t-test and linregress scans
+            early_mean, late_mean, t_stat, dof, effect_size, slope, r_value, trend_t, trend_dof = roas_trend(y)
+            return (early_mean, late_mean, t_stat, 2.0 * special.stdtr(dof, -abs(t_stat)), effect_size,
+                    slope, r_value, 2.0 * special.stdtr(trend_dof, -abs(trend_t)))
+        
+        # Split into early vs late period
+        mid_point = len(y) // 2
+        early_period, late_period = y[:mid_point], y[mid_point:]
+        t_stat, p_value, effect_size = self._ttest_ind(early_period, late_period)
+        slope, r_value, trend_t, trend_dof = linregress_index(y)
+        p_value_trend = 2.0 * special.stdtr(trend_dof, -abs(trend_t))
+        return (early_period.mean(), late_period.mean(), t_stat, p_value, effect_size,
+                slope, r_value, p_value_trend)
+    
     def _calculate_cohens_d(self, group1, group2) -> float:
         """Calculate Cohen's d effect size"""
-        n1, n2 = len(group1), len(group2)
-        var1, var2 = group1.var(), group2.var()
+        group1, group2 = np.asarray(group1, dtype=np.float64), np.asarray(group2, dtype=np.float64)
+        n1, n2 = group1.size, group2.size
+        
+        # Each mean is computed once and reused for the variance (same arithmetic as np.var)
+        mean1, mean2 = group1.mean(), group2.mean()
+        dev1, dev2 = group1 - mean1, group2 - mean2
+        var1, var2 = (dev1 * dev1).sum() / (n1 - 1), (dev2 * dev2).sum() / (n2 - 1)
         
         # Pooled standard deviation
         pooled_std = np.sqrt(((n1 - 1) * var1 + (n2 - 1) * var2) / (n1 + n2 - 2))
@@ -330,7 +524,7 @@ class EvaluatorAgent(BaseAgent):
         if pooled_std == 0:
             return 0.0
         
-        return abs(group1.mean() - group2.mean()) / pooled_std
+        return abs(mean1 - mean2) / pooled_std
     
     def _interpret_test_result(self, p_value: float, effect_size: float) -> str:
         """Interpret statistical test results"""
@@ -341,14 +535,7 @@ class EvaluatorAgent(BaseAgent):
         significance = "Statistically significant" if p_value < 0.05 else "Not statistically significant"
         
         if isinstance(effect_size, float) and not np.isnan(effect_size):
-            if effect_size >= 0.8:
-                magnitude = "large effect size"
-            elif effect_size >= 0.5:
-                magnitude = "medium effect size"
-            elif effect_size >= 0.2:
-                magnitude = "small effect size"
-            else:
-                magnitude = "negligible effect size"
+            magnitude = _EFFECT_MAGNITUDES[bisect_right(_EFFECT_THRESHOLDS, effect_size)]
         else:
             magnitude = "effect size calculated"
         
@@ -364,25 +551,26 @@ class EvaluatorAgent(BaseAgent):
         
         tests = statistical_results.get('tests_performed', [])
         
-        # Extract key findings
+        # Extract key findings and count tests with a p-value in the same pass
         key_findings = []
         contradicting_evidence = []
+        significant_tests = 0
+        total_tests = 0
         
         for test in tests:
             p_value = test.get('p_value')
-            if p_value is not None:
-                if p_value < 0.05:
-                    key_findings.append({
-                        "finding": test['interpretation'],
-                        "support_level": "strong" if p_value < 0.01 else "moderate",
-                        "data_source": test['test_name']
-                    })
-                else:
-                    contradicting_evidence.append(test['interpretation'])
-        
-        # Quantitative support assessment - handle None p_values properly
-        significant_tests = sum(1 for t in tests if t.get('p_value') is not None and t.get('p_value') < 0.05)
-        total_tests = len([t for t in tests if t.get('p_value') is not None])
+            if p_value is None:
+                continue
+            total_tests += 1
+            if p_value < 0.05:
+                significant_tests += 1
+                key_findings.append({
+                    "finding": test['interpretation'],
+                    "support_level": "strong" if p_value < 0.01 else "moderate",
+                    "data_source": test['test_name']
+                })
+            else:
+                contradicting_evidence.append(test['interpretation'])
         
         return {
             "hypothesis_id": hypothesis.get('hypothesis_id'),
@@ -422,9 +610,18 @@ class EvaluatorAgent(BaseAgent):
         if not tests:
             return 0.5  # Neutral confidence if no tests
         
-        # Count significant tests
-        significant = sum(1 for t in tests if t.get('p_value') is not None and t.get('p_value') < 0.05)
-        total = len([t for t in tests if t.get('p_value') is not None])
+        # Count significant tests and large effects in one pass
+        significant = 0
+        total = 0
+        large_effects = 0
+        for t in tests:
+            p_value = t.get('p_value')
+            if p_value is not None:
+                total += 1
+                if p_value < 0.05:
+                    significant += 1
+            if 'large effect' in t.get('interpretation', ''):
+                large_effects += 1
         
         if total == 0:
             return 0.5
@@ -433,7 +630,6 @@ class EvaluatorAgent(BaseAgent):
         base_confidence = significant / total
         
         # Adjust for effect sizes
-        large_effects = sum(1 for t in tests if 'large effect' in t.get('interpretation', ''))
         if large_effects > 0:
             base_confidence = min(base_confidence + 0.1, 1.0)
         
@@ -2,10 +2,210 @@
 Insight Agent - Generates hypotheses explaining performance patterns
 """
 
-import json
-from typing import Dict, Any, List, Optional
+from operator import itemgetter
+from types import MappingProxyType
+from typing import Dict, Any, List, Optional, Tuple
 from .base_agent import BaseAgent
 
+try:
+    import orjson
+except ImportError:  # optional: fall back to the streaming stdlib encoder
+    orjson = None
+
+# Characters of each JSON context block embedded in the prompt
+_PROMPT_JSON_LIMIT = 3000
+_TRUNCATION_MARKER = "…(truncated)"
+
+# Ranking weight of a potential_impact / actionability level (anything else scores 0.2)
+_LEVEL_WEIGHTS = {"high": 1.0, "medium": 0.5}
+
+
+# Rule-based hypothesis templates. Static fields are shared across calls: only the top
+# level is frozen (read-only mappings, tuple sequences), while the evidence_required
+# entries stay plain dicts so they serialize as JSON objects, and every hypothesis
+# holds those same dicts, so callers must not edit them in place. Each hypothesis is a
+# shallow dict merge, with the *_HEAD strings and the leading solutions that name a
+# segment filled in per call.
+_HYP_ROAS_DECLINE_HEAD = "ROAS is declining (trend: {trend}), potentially due to audience fatigue or creative exhaustion after extended campaign runtime."
+_HYP_ROAS_DECLINE = MappingProxyType({
+    "hypothesis_id": "hyp_roas_decline",
+    "hypothesis": None,
+    "category": "audience",
+    "reasoning": "Declining ROAS often indicates that the target audience has seen the ads multiple times, leading to banner blindness and reduced engagement. This is especially common after 14+ days of continuous exposure.",
+    "likelihood": 0.75,
+    "potential_impact": "high",
+    "actionability": "high",
+    "evidence_required": (
+        {
+            "metric": "frequency",
+            "comparison": "week-over-week",
+            "expected_pattern": "increasing frequency correlates with decreasing CTR/ROAS"
+        },
+        {
+            "metric": "ctr",
+            "comparison": "time-series",
+            "expected_pattern": "CTR declines over time within same audience"
+        }
+    ),
+    "validation_approach": "Compare early campaign performance (days 1-7) vs recent performance (days 14+) for same audience segments. Check frequency metrics.",
+    "potential_solutions": (
+        "Refresh creative assets with new messaging",
+        "Expand to new audience segments",
+        "Implement ad rotation strategy",
+        "Add frequency caps"
+    )
+})
+
+_HYP_CREATIVE_DISPARITY_HEAD = "Significant creative type performance disparity detected. '{best}' creative type outperforms others by 50%+ in ROAS."
+_HYP_CREATIVE_DISPARITY = MappingProxyType({
+    "hypothesis_id": "hyp_creative_disparity",
+    "hypothesis": None,
+    "category": "creative",
+    "reasoning": "Different creative formats resonate differently with audiences. Video often allows for storytelling and emotional connection, while images require immediate impact. UGC builds authenticity and trust.",
+    "likelihood": 0.85,
+    "potential_impact": "high",
+    "actionability": "high",
+    "evidence_required": (
+        {
+            "metric": "roas_by_creative_type",
+            "comparison": "cross-sectional",
+            "expected_pattern": "One creative type significantly outperforms others"
+        },
+        {
+            "metric": "engagement_rate",
+            "comparison": "by_creative_type",
+            "expected_pattern": "Higher engagement for top performing creative type"
+        }
+    ),
+    "validation_approach": "Statistical test comparing ROAS across creative types controlling for audience and budget. Check if difference is significant (t-test or ANOVA).",
+    # Preceded by the budget shift toward the best creative type
+    "potential_solutions": (
+        "Create more assets in top-performing format",
+        "Test hybrid approaches combining elements of top performers",
+        "Discontinue underperforming creative types"
+    )
+})
+
+_HYP_LOW_CTR_HEAD = "Overall CTR is below industry benchmark ({ctr:.3f} vs 0.015+ expected), indicating weak ad creative or poor audience targeting."
+_HYP_LOW_CTR = MappingProxyType({
+    "hypothesis_id": "hyp_low_ctr",
+    "hypothesis": None,
+    "category": "creative",
+    "reasoning": "Low CTR suggests ads are not compelling enough to drive clicks. This could be due to weak headlines, unclear value propositions, or misalignment between ad content and audience interests.",
+    "likelihood": 0.70,
+    "potential_impact": "high",
+    "actionability": "high",
+    "evidence_required": (
+        {
+            "metric": "ctr",
+            "comparison": "overall_average",
+            "expected_pattern": "CTR significantly below 1.5%"
+        },
+        {
+            "metric": "creative_message_analysis",
+            "comparison": "qualitative",
+            "expected_pattern": "Weak hooks or generic messaging in low-CTR ads"
+        }
+    ),
+    "validation_approach": "Analyze creative messaging of low vs high CTR campaigns. Look for patterns in headline strength, value proposition clarity, and CTA effectiveness.",
+    "potential_solutions": (
+        "Rewrite ad copy with stronger hooks and value propositions",
+        "A/B test different headline formulations",
+        "Add social proof or urgency elements",
+        "Improve visual-message alignment"
+    )
+})
+
+_HYP_AUDIENCE_PERFORMANCE_HEAD = "'{best[0]}' audience type significantly outperforms '{worst[0]}' audience (ROAS: {best[1]:.2f} vs {worst[1]:.2f})."
+_HYP_AUDIENCE_PERFORMANCE = MappingProxyType({
+    "hypothesis_id": "hyp_audience_performance",
+    "hypothesis": None,
+    "category": "audience",
+    "reasoning": "Different audience types have different purchase intent and familiarity with the brand. Lookalike audiences may have higher intent than broad targeting, while retargeting typically performs best due to prior engagement.",
+    "likelihood": 0.80,
+    "potential_impact": "high",
+    "actionability": "high",
+    "evidence_required": (
+        {
+            "metric": "roas_by_audience_type",
+            "comparison": "cross-sectional",
+            "expected_pattern": "Significant ROAS difference across audience types"
+        },
+        {
+            "metric": "conversion_rate",
+            "comparison": "by_audience_type",
+            "expected_pattern": "Higher conversion for better performing audience"
+        }
+    ),
+    "validation_approach": "Compare full funnel metrics (CTR, conversion rate, ROAS) across audience types with statistical significance testing.",
+    # Preceded by the budget shift toward the best and away from the worst audience
+    "potential_solutions": (
+        "Create audience-specific creative messaging",
+        "Build more lookalike audiences from best converters"
+    )
+})
+
+_HYP_EXTERNAL_FACTORS = MappingProxyType({
+    "hypothesis_id": "hyp_external_factors",
+    "hypothesis": "Performance changes may be influenced by external factors such as seasonality, competitive pressure, or market conditions.",
+    "category": "external",
+    "reasoning": "Facebook ads performance doesn't occur in a vacuum. Seasonal shopping patterns, competitor campaigns, CPM inflation, and market saturation can all impact results independent of campaign execution.",
+    "likelihood": 0.50,
+    "potential_impact": "medium",
+    "actionability": "low",
+    "evidence_required": (
+        {
+            "metric": "cpm",
+            "comparison": "time-series",
+            "expected_pattern": "CPM increases during performance decline"
+        },
+        {
+            "metric": "market_conditions",
+            "comparison": "qualitative",
+            "expected_pattern": "Known seasonal events or competitor activities"
+        }
+    ),
+    "validation_approach": "Check for CPM inflation, review competitive landscape changes, consider calendar events (holidays, sales events).",
+    "potential_solutions": (
+        "Adjust bidding strategy for competitive periods",
+        "Plan campaigns around known seasonal patterns",
+        "Differentiate messaging from competitors",
+        "Increase creative quality to stand out"
+    )
+})
+
+
+def _mentions(obj: Any, term: str) -> bool:
+    """Whether lowercase term occurs in str(obj).lower(), walking containers and stopping at the first hit"""
+    if isinstance(obj, str):
+        return term in obj.lower()
+    if isinstance(obj, dict):
+        return any(_mentions(key, term) or _mentions(value, term) for key, value in obj.items())
+    if isinstance(obj, (list, tuple, set)):
+        return any(_mentions(item, term) for item in obj)
+    return term in repr(obj).lower()
+
+
+def _roas_extremes(segments: Dict[str, Any]) -> Optional[Tuple[str, Any, str, Any]]:
+    """
+    Best and worst segment by ROAS in one pass over the dict-valued entries
+    
+    Returns (best key, best ROAS, worst key, worst ROAS) with max()/min() tie-breaking
+    (first occurrence wins), or None when no entry is a dict.
+    """
+    extremes = None
+    for key, value in segments.items():
+        if not isinstance(value, dict):
+            continue
+        roas = value.get('roas', 0)
+        if extremes is None:
+            extremes = [key, roas, key, roas]
+        elif roas > extremes[1]:
+            extremes[0], extremes[1] = key, roas
+        elif roas < extremes[3]:
+            extremes[2], extremes[3] = key, roas
+    return tuple(extremes) if extremes is not None else None
+
 
 class InsightAgent(BaseAgent):
     """
@@ -19,6 +219,7 @@ class InsightAgent(BaseAgent):
     def __init__(self, config: Dict[str, Any], logger: Any):
         super().__init__("InsightAgent", config, logger)
         self.prompt_template = self.load_prompt("insight_agent_prompt")
+        self._pretty_prompts = config.get('logging', {}).get('pretty_prompts', False)
     
     def generate_hypotheses(
         self,
@@ -44,9 +245,9 @@ class InsightAgent(BaseAgent):
         # Format prompt variables
         prompt_vars = {
             "task_description": task_description,
-            "data_summary": json.dumps(data_summary, indent=2, default=str)[:3000],
-            "key_observations": json.dumps(key_observations, indent=2),
-            "historical_context": json.dumps(historical_context or {}, indent=2)
+            "data_summary": self._prompt_json(data_summary),
+            "key_observations": self._prompt_json(key_observations),
+            "historical_context": self._prompt_json(historical_context or {})
         }
         
         prompt = self.format_prompt(self.prompt_template, prompt_vars)
@@ -68,6 +269,26 @@ class InsightAgent(BaseAgent):
         
         return hypotheses
     
+    def _prompt_json(self, obj: Any) -> str:
+        """JSON for a prompt block, cut to the size limit (compact unless pretty_prompts)"""
+        if self._pretty_prompts:
+            return self.truncate_json(obj, _PROMPT_JSON_LIMIT, indent=2, suffix=_TRUNCATION_MARKER)
+        
+        if orjson is not None:
+            # The native encoder writes the whole block faster than the stdlib streams its prefix
+            try:
+                text = orjson.dumps(
+                    obj, default=str, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+                ).decode('utf-8')
+            except orjson.JSONEncodeError:
+                pass
+            else:
+                if len(text) <= _PROMPT_JSON_LIMIT:
+                    return text
+                return text[:_PROMPT_JSON_LIMIT] + _TRUNCATION_MARKER
+        
+        return self.truncate_json(obj, _PROMPT_JSON_LIMIT, suffix=_TRUNCATION_MARKER, separators=(',', ':'))
+    
     def _generate_rule_based_hypotheses(
         self,
         data_summary: Dict[str, Any],
@@ -78,10 +299,11 @@ class InsightAgent(BaseAgent):
         hypotheses_list = []
         
         # Extract key metrics
-        overall_stats = data_summary.get('summary_statistics', {}).get('overall', {})
-        trends = data_summary.get('trends', {})
-        by_creative = data_summary.get('summary_statistics', {}).get('by_creative_type', {})
-        by_audience = data_summary.get('summary_statistics', {}).get('by_audience_type', {})
+        summary_stats = data_summary.get('summary_statistics') or {}
+        overall_stats = summary_stats.get('overall') or {}
+        trends = data_summary.get('trends') or {}
+        by_creative = summary_stats.get('by_creative_type') or {}
+        by_audience = summary_stats.get('by_audience_type') or {}
         
         # Handle None values with proper fallbacks
         avg_roas = overall_stats.get('avg_roas') or 0
@@ -92,172 +314,58 @@ class InsightAgent(BaseAgent):
         # Hypothesis 1: ROAS Trend Analysis
         if roas_trend == 'decreasing':
             hypotheses_list.append({
-                "hypothesis_id": "hyp_roas_decline",
-                "hypothesis": f"ROAS is declining (trend: {roas_trend}), potentially due to audience fatigue or creative exhaustion after extended campaign runtime.",
-                "category": "audience",
-                "reasoning": "Declining ROAS often indicates that the target audience has seen the ads multiple times, leading to banner blindness and reduced engagement. This is especially common after 14+ days of continuous exposure.",
-                "likelihood": 0.75,
-                "potential_impact": "high",
-                "actionability": "high",
-                "evidence_required": [
-                    {
-                        "metric": "frequency",
-                        "comparison": "week-over-week",
-                        "expected_pattern": "increasing frequency correlates with decreasing CTR/ROAS"
-                    },
-                    {
-                        "metric": "ctr",
-                        "comparison": "time-series",
-                        "expected_pattern": "CTR declines over time within same audience"
-                    }
-                ],
-                "validation_approach": "Compare early campaign performance (days 1-7) vs recent performance (days 14+) for same audience segments. Check frequency metrics.",
-                "potential_solutions": [
-                    "Refresh creative assets with new messaging",
-                    "Expand to new audience segments",
-                    "Implement ad rotation strategy",
-                    "Add frequency caps"
-                ]
+                **_HYP_ROAS_DECLINE,
+                "hypothesis": _HYP_ROAS_DECLINE_HEAD.format(trend=roas_trend)
             })
         
         # Hypothesis 2: Creative Performance
-        if by_creative:
-            creative_roas_values = [v.get('roas', 0) for v in by_creative.values() if isinstance(v, dict)]
-            if creative_roas_values and max(creative_roas_values) > 1.5 * min(creative_roas_values):
-                best_creative = max(by_creative.items(), key=lambda x: x[1].get('roas', 0) if isinstance(x[1], dict) else 0)
+        creative_extremes = _roas_extremes(by_creative) if by_creative else None
+        if creative_extremes:
+            best_creative_type, best_creative_roas, _, worst_creative_roas = creative_extremes
+            if best_creative_roas > 1.5 * worst_creative_roas:
                 hypotheses_list.append({
-                    "hypothesis_id": "hyp_creative_disparity",
-                    "hypothesis": f"Significant creative type performance disparity detected. '{best_creative[0]}' creative type outperforms others by 50%+ in ROAS.",
-                    "category": "creative",
-                    "reasoning": "Different creative formats resonate differently with audiences. Video often allows for storytelling and emotional connection, while images require immediate impact. UGC builds authenticity and trust.",
-                    "likelihood": 0.85,
-                    "potential_impact": "high",
-                    "actionability": "high",
-                    "evidence_required": [
-                        {
-                            "metric": "roas_by_creative_type",
-                            "comparison": "cross-sectional",
-                            "expected_pattern": "One creative type significantly outperforms others"
-                        },
-                        {
-                            "metric": "engagement_rate",
-                            "comparison": "by_creative_type",
-                            "expected_pattern": "Higher engagement for top performing creative type"
-                        }
-                    ],
-                    "validation_approach": "Statistical test comparing ROAS across creative types controlling for audience and budget. Check if difference is significant (t-test or ANOVA).",
-                    "potential_solutions": [
-                        f"Shift budget allocation toward {best_creative[0]} creative type",
-                        "Create more assets in top-performing format",
-                        "Test hybrid approaches combining elements of top performers",
-                        "Discontinue underperforming creative types"
-                    ]
+                    **_HYP_CREATIVE_DISPARITY,
+                    "hypothesis": _HYP_CREATIVE_DISPARITY_HEAD.format(best=best_creative_type),
+                    "potential_solutions": (
+                        f"Shift budget allocation toward {best_creative_type} creative type",
+                        *_HYP_CREATIVE_DISPARITY["potential_solutions"]
+                    )
                 })
         
         # Hypothesis 3: Low CTR Issues
         if avg_ctr < 0.015:  # Below 1.5% CTR threshold
             hypotheses_list.append({
-                "hypothesis_id": "hyp_low_ctr",
-                "hypothesis": f"Overall CTR is below industry benchmark ({avg_ctr:.3f} vs 0.015+ expected), indicating weak ad creative or poor audience targeting.",
-                "category": "creative",
-                "reasoning": "Low CTR suggests ads are not compelling enough to drive clicks. This could be due to weak headlines, unclear value propositions, or misalignment between ad content and audience interests.",
-                "likelihood": 0.70,
-                "potential_impact": "high",
-                "actionability": "high",
-                "evidence_required": [
-                    {
-                        "metric": "ctr",
-                        "comparison": "overall_average",
-                        "expected_pattern": "CTR significantly below 1.5%"
-                    },
-                    {
-                        "metric": "creative_message_analysis",
-                        "comparison": "qualitative",
-                        "expected_pattern": "Weak hooks or generic messaging in low-CTR ads"
-                    }
-                ],
-                "validation_approach": "Analyze creative messaging of low vs high CTR campaigns. Look for patterns in headline strength, value proposition clarity, and CTA effectiveness.",
-                "potential_solutions": [
-                    "Rewrite ad copy with stronger hooks and value propositions",
-                    "A/B test different headline formulations",
-                    "Add social proof or urgency elements",
-                    "Improve visual-message alignment"
-                ]
+                **_HYP_LOW_CTR,
+                "hypothesis": _HYP_LOW_CTR_HEAD.format(ctr=avg_ctr)
             })
         
         # Hypothesis 4: Audience Type Performance
         if by_audience and len(by_audience) > 1:
-            audience_roas_values = [(k, v.get('roas', 0)) for k, v in by_audience.items() if isinstance(v, dict)]
-            if audience_roas_values:
-                best_audience = max(audience_roas_values, key=lambda x: x[1])
-                worst_audience = min(audience_roas_values, key=lambda x: x[1])
+            audience_extremes = _roas_extremes(by_audience)
+            if audience_extremes:
+                best_audience, worst_audience = audience_extremes[:2], audience_extremes[2:]
                 
                 if best_audience[1] > 1.3 * worst_audience[1]:
                     hypotheses_list.append({
-                        "hypothesis_id": "hyp_audience_performance",
-                        "hypothesis": f"'{best_audience[0]}' audience type significantly outperforms '{worst_audience[0]}' audience (ROAS: {best_audience[1]:.2f} vs {worst_audience[1]:.2f}).",
-                        "category": "audience",
-                        "reasoning": "Different audience types have different purchase intent and familiarity with the brand. Lookalike audiences may have higher intent than broad targeting, while retargeting typically performs best due to prior engagement.",
-                        "likelihood": 0.80,
-                        "potential_impact": "high",
-                        "actionability": "high",
-                        "evidence_required": [
-                            {
-                                "metric": "roas_by_audience_type",
-                                "comparison": "cross-sectional",
-                                "expected_pattern": "Significant ROAS difference across audience types"
-                            },
-                            {
-                                "metric": "conversion_rate",
-                                "comparison": "by_audience_type",
-                                "expected_pattern": "Higher conversion for better performing audience"
-                            }
-                        ],
-                        "validation_approach": "Compare full funnel metrics (CTR, conversion rate, ROAS) across audience types with statistical significance testing.",
-                        "potential_solutions": [
+                        **_HYP_AUDIENCE_PERFORMANCE,
+                        "hypothesis": _HYP_AUDIENCE_PERFORMANCE_HEAD.format(best=best_audience, worst=worst_audience),
+                        "potential_solutions": (
                             f"Increase budget allocation to {best_audience[0]} audience",
                             f"Reduce or pause {worst_audience[0]} audience campaigns",
-                            "Create audience-specific creative messaging",
-                            "Build more lookalike audiences from best converters"
-                        ]
+                            *_HYP_AUDIENCE_PERFORMANCE["potential_solutions"]
+                        )
                     })
         
         # Hypothesis 5: Seasonal or External Factors
-        hypotheses_list.append({
-            "hypothesis_id": "hyp_external_factors",
-            "hypothesis": "Performance changes may be influenced by external factors such as seasonality, competitive pressure, or market conditions.",
-            "category": "external",
-            "reasoning": "Facebook ads performance doesn't occur in a vacuum. Seasonal shopping patterns, competitor campaigns, CPM inflation, and market saturation can all impact results independent of campaign execution.",
-            "likelihood": 0.50,
-            "potential_impact": "medium",
-            "actionability": "low",
-            "evidence_required": [
-                {
-                    "metric": "cpm",
-                    "comparison": "time-series",
-                    "expected_pattern": "CPM increases during performance decline"
-                },
-                {
-                    "metric": "market_conditions",
-                    "comparison": "qualitative",
-                    "expected_pattern": "Known seasonal events or competitor activities"
-                }
-            ],
-            "validation_approach": "Check for CPM inflation, review competitive landscape changes, consider calendar events (holidays, sales events).",
-            "potential_solutions": [
-                "Adjust bidding strategy for competitive periods",
-                "Plan campaigns around known seasonal patterns",
-                "Differentiate messaging from competitors",
-                "Increase creative quality to stand out"
-            ]
-        })
+        hypotheses_list.append(dict(_HYP_EXTERNAL_FACTORS))
         
         # Create structured output
+        date_range = (data_summary.get('data_quality') or {}).get('date_range') or {}
         result = {
             "context_summary": {
-                "primary_metric": "roas" if 'roas' in str(observations).lower() else "multiple",
+                "primary_metric": "roas" if _mentions(observations, 'roas') else "multiple",
                 "change_magnitude": self._calculate_change_magnitude(data_summary),
-                "time_period": data_summary.get('data_quality', {}).get('date_range', {}).get('start', 'Unknown'),
+                "time_period": date_range.get('start', 'Unknown'),
                 "affected_segments": self._identify_affected_segments(data_summary)
             },
             "hypotheses": hypotheses_list,
@@ -276,20 +384,23 @@ class InsightAgent(BaseAgent):
         # Calculate composite score for each hypothesis
         ranking = []
         for hyp in hypotheses:
+            likelihood = hyp.get('likelihood', 0)
+            impact = hyp.get('potential_impact')
+            actionability = hyp.get('actionability')
             score = (
-                hyp.get('likelihood', 0) * 0.4 +
-                (1.0 if hyp.get('potential_impact') == 'high' else 0.5 if hyp.get('potential_impact') == 'medium' else 0.2) * 0.3 +
-                (1.0 if hyp.get('actionability') == 'high' else 0.5 if hyp.get('actionability') == 'medium' else 0.2) * 0.3
+                likelihood * 0.4 +
+                _LEVEL_WEIGHTS.get(impact, 0.2) * 0.3 +
+                _LEVEL_WEIGHTS.get(actionability, 0.2) * 0.3
             )
             
             ranking.append({
                 "hypothesis_id": hyp['hypothesis_id'],
                 "score": round(score, 3),
-                "reasoning": f"Likelihood: {hyp.get('likelihood', 0)}, Impact: {hyp.get('potential_impact')}, Actionability: {hyp.get('actionability')}"
+                "reasoning": f"Likelihood: {likelihood}, Impact: {impact}, Actionability: {actionability}"
             })
         
         # Sort by score
-        ranking.sort(key=lambda x: x['score'], reverse=True)
+        ranking.sort(key=itemgetter('score'), reverse=True)
         
         hypotheses_data['hypothesis_ranking'] = ranking
         hypotheses_data['recommended_validation_order'] = [r['hypothesis_id'] for r in ranking]
@@ -308,11 +419,9 @@ class InsightAgent(BaseAgent):
     
     def _identify_affected_segments(self, data_summary: Dict[str, Any]) -> List[str]:
         """Identify which segments are affected"""
-        segments = []
-        
-        # Check bottom performers
-        bottom_performers = data_summary.get('bottom_performers', {})
-        if bottom_performers.get('by_roas'):
-            segments.extend([p['name'] for p in bottom_performers['by_roas'][:3]])
+        # Check bottom performers (at most three, so no further capping is needed)
+        bottom_roas = data_summary.get('bottom_performers', {}).get('by_roas')
+        if bottom_roas:
+            return [p['name'] for p in bottom_roas[:3]]
         
-        return segments[:5] if segments else ["multiple campaigns"]
+        return ["multiple campaigns"]
@@ -2,10 +2,155 @@
 Planner Agent - Decomposes user queries into executable subtasks
 """
 
+import re
 import json
-from typing import Dict, Any, List
+import heapq
+import functools
+from typing import Dict, Any, List, Optional, Tuple
 from .base_agent import BaseAgent
 
+# Query keywords that select each metric, in the order metrics are listed
+_METRIC_KEYWORDS = (
+    ("roas", ("roas",)),
+    ("ctr", ("ctr", "click")),
+    ("spend", ("spend", "budget")),
+    ("revenue", ("revenue", "sales"))
+)
+
+# Query keyword -> analysis period; the first match wins
+_PERIOD_KEYWORDS = (
+    ("week", "last 7 days"),
+    ("month", "last 30 days")
+)
+
+# Substring matches at every position (lookahead), so overlapping keywords are all found
+_QUERY_KEYWORD_RE = re.compile(
+    "(?=(%s))" % "|".join(
+        [keyword for _, metric_keywords in _METRIC_KEYWORDS for keyword in metric_keywords]
+        + [keyword for keyword, _ in _PERIOD_KEYWORDS]
+    )
+)
+
+
+@functools.lru_cache(maxsize=64)
+def _default_plan_json(metrics: Tuple[str, ...], time_period: str) -> str:
+    """Default plan for a metric set and period, serialized once (main_objective is filled in per query)"""
+    metrics_mentioned = list(metrics)
+    
+    plan = {
+        "query_understanding": {
+            "main_objective": None,
+            "key_metrics": metrics_mentioned,
+            "time_period": time_period,
+            "complexity": "medium"
+        },
+        "execution_plan": [
+            {
+                "task_id": "task_1",
+                "task_name": "Load and analyze data",
+                "agent": "data_agent",
+                "description": f"Load dataset and calculate summary statistics for {', '.join(metrics_mentioned)}",
+                "inputs": ["full_dataset"],
+                "outputs": ["data_summary", "key_statistics"],
+                "dependencies": [],
+                "priority": "high"
+            },
+            {
+                "task_id": "task_2",
+                "task_name": "Generate hypotheses",
+                "agent": "insight_agent",
+                "description": f"Generate hypotheses explaining patterns in {', '.join(metrics_mentioned)}",
+                "inputs": ["data_summary", "key_statistics"],
+                "outputs": ["hypotheses"],
+                "dependencies": ["task_1"],
+                "priority": "high"
+            },
+            {
+                "task_id": "task_3",
+                "task_name": "Validate hypotheses",
+                "agent": "evaluator",
+                "description": "Test each hypothesis with statistical analysis",
+                "inputs": ["hypotheses", "full_dataset"],
+                "outputs": ["validated_hypotheses"],
+                "dependencies": ["task_2"],
+                "priority": "high"
+            },
+            {
+                "task_id": "task_4",
+                "task_name": "Generate creative recommendations",
+                "agent": "creative_generator",
+                "description": "Create new creative suggestions for underperforming campaigns",
+                "inputs": ["validated_hypotheses", "creative_performance_data"],
+                "outputs": ["creative_recommendations"],
+                "dependencies": ["task_3"],
+                "priority": "medium"
+            }
+        ],
+        "expected_insights": [
+            f"Root causes of {', '.join(metrics_mentioned)} changes",
+            "Performance drivers by segment",
+            "Actionable recommendations"
+        ],
+        "confidence": 0.75,
+        "reasoning": "Default plan covering standard performance analysis workflow"
+    }
+    
+    return json.dumps(plan)
+
+
+
+class _TaskSchedule:
+    """Dependency bookkeeping for one execution plan, updated as tasks complete"""
+    
+    def __init__(self, tasks: List[Dict[str, Any]], completed_tasks: List[str]):
+        self.tasks = tasks
+        self.n_tasks = len(tasks)
+        self.completed_tasks = completed_tasks
+        self.seen = 0
+        self.done = set()
+        self.unmet: List[int] = []
+        self.waiting: Dict[str, List[int]] = {}
+        # Plan indexes of tasks whose dependencies are all met; completed ones are skipped lazily
+        self.ready: List[int] = []
+        
+        for index, task in enumerate(tasks):
+            dependencies = set(task.get('dependencies', []))
+            self.unmet.append(len(dependencies))
+            for dep in dependencies:
+                self.waiting.setdefault(dep, []).append(index)
+            if not dependencies:
+                self.ready.append(index)
+    
+    def matches(self, tasks: List[Dict[str, Any]], completed_tasks: List[str]) -> bool:
+        """Whether this schedule still tracks the given plan and (append-only) completed list"""
+        return (
+            tasks is self.tasks and len(tasks) == self.n_tasks
+            and completed_tasks is self.completed_tasks and len(completed_tasks) >= self.seen
+        )
+    
+    def sync(self):
+        """Apply task IDs appended to the completed list since the last call"""
+        for task_id in self.completed_tasks[self.seen:]:
+            if task_id in self.done:
+                continue
+            self.done.add(task_id)
+            for index in self.waiting.pop(task_id, ()):
+                self.unmet[index] -= 1
+                if self.unmet[index] == 0:
+                    heapq.heappush(self.ready, index)
+        self.seen = len(self.completed_tasks)
+    
+    def next_task(self) -> Optional[Dict[str, Any]]:
+        """First task in plan order that is not completed and has all dependencies met"""
+        while self.ready and self.tasks[self.ready[0]]['task_id'] in self.done:
+            heapq.heappop(self.ready)
+        return self.tasks[self.ready[0]] if self.ready else None
+    
+    def ready_tasks(self) -> List[Dict[str, Any]]:
+        """Every task that is not completed and has all dependencies met, in plan order"""
+        ready = sorted(set(self.ready))
+        return [self.tasks[index] for index in ready if self.tasks[index]['task_id'] not in self.done]
+
 
 class PlannerAgent(BaseAgent):
     """
@@ -19,6 +164,7 @@ class PlannerAgent(BaseAgent):
     def __init__(self, config: Dict[str, Any], logger: Any):
         super().__init__("Planner", config, logger)
         self.prompt_template = self.load_prompt("planner_prompt")
+        self._schedule: Optional[_TaskSchedule] = None
     
     def create_plan(self, query: str, dataset_info: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -42,15 +188,13 @@ class PlannerAgent(BaseAgent):
         
         prompt = self.format_prompt(self.prompt_template, prompt_vars)
         
-        # Call LLM to generate plan
-        response = self.call_llm(
+        # Stream plan from LLM, parsing as soon as the JSON object is complete
+        stream = self.call_llm_stream(
             prompt,
             temperature=self.config.get('agents', {}).get('planner', {}).get('temperature', 0.3),
             model=self.config.get('agents', {}).get('planner', {}).get('model', 'gpt-4')
         )
-        
-        # Parse response
-        plan = self.parse_json_response(response)
+        plan = self.assemble_json_stream(stream)
         
         if not plan or 'execution_plan' not in plan:
             # Fallback to default plan structure
@@ -76,87 +220,27 @@ class PlannerAgent(BaseAgent):
         """Create default plan structure for common queries"""
         self.logger.warning("Using default plan structure")
         
-        # Analyze query for keywords
-        query_lower = query.lower()
+        # Analyze query for keywords (one scan collects every keyword occurring in it)
+        keywords = {match.group(1) for match in _QUERY_KEYWORD_RE.finditer(query.lower())}
         
         # Determine analysis focus
-        metrics_mentioned = []
-        if 'roas' in query_lower:
-            metrics_mentioned.append('roas')
-        if 'ctr' in query_lower or 'click' in query_lower:
-            metrics_mentioned.append('ctr')
-        if 'spend' in query_lower or 'budget' in query_lower:
-            metrics_mentioned.append('spend')
-        if 'revenue' in query_lower or 'sales' in query_lower:
-            metrics_mentioned.append('revenue')
+        metrics_mentioned = [
+            metric for metric, metric_keywords in _METRIC_KEYWORDS
+            if not keywords.isdisjoint(metric_keywords)
+        ]
         
         if not metrics_mentioned:
             metrics_mentioned = ['roas', 'ctr']  # Default metrics
         
         # Determine time period
-        time_period = "last 14 days"
-        if 'week' in query_lower:
-            time_period = "last 7 days"
-        elif 'month' in query_lower:
-            time_period = "last 30 days"
-        
-        plan = {
-            "query_understanding": {
-                "main_objective": query,
-                "key_metrics": metrics_mentioned,
-                "time_period": time_period,
-                "complexity": "medium"
-            },
-            "execution_plan": [
-                {
-                    "task_id": "task_1",
-                    "task_name": "Load and analyze data",
-                    "agent": "data_agent",
-                    "description": f"Load dataset and calculate summary statistics for {', '.join(metrics_mentioned)}",
-                    "inputs": ["full_dataset"],
-                    "outputs": ["data_summary", "key_statistics"],
-                    "dependencies": [],
-                    "priority": "high"
-                },
-                {
-                    "task_id": "task_2",
-                    "task_name": "Generate hypotheses",
-                    "agent": "insight_agent",
-                    "description": f"Generate hypotheses explaining patterns in {', '.join(metrics_mentioned)}",
-                    "inputs": ["data_summary", "key_statistics"],
-                    "outputs": ["hypotheses"],
-                    "dependencies": ["task_1"],
-                    "priority": "high"
-                },
-                {
-                    "task_id": "task_3",
-                    "task_name": "Validate hypotheses",
-                    "agent": "evaluator",
-                    "description": "Test each hypothesis with statistical analysis",
-                    "inputs": ["hypotheses", "full_dataset"],
-                    "outputs": ["validated_hypotheses"],
-                    "dependencies": ["task_2"],
-                    "priority": "high"
-                },
-                {
-                    "task_id": "task_4",
-                    "task_name": "Generate creative recommendations",
-                    "agent": "creative_generator",
-                    "description": "Create new creative suggestions for underperforming campaigns",
-                    "inputs": ["validated_hypotheses", "creative_performance_data"],
-                    "outputs": ["creative_recommendations"],
-                    "dependencies": ["task_3"],
-                    "priority": "medium"
-                }
-            ],
-            "expected_insights": [
-                f"Root causes of {', '.join(metrics_mentioned)} changes",
-                "Performance drivers by segment",
-                "Actionable recommendations"
-            ],
-            "confidence": 0.75,
-            "reasoning": "Default plan covering standard performance analysis workflow"
-        }
+        time_period = next(
+            (period for keyword, period in _PERIOD_KEYWORDS if keyword in keywords),
+            "last 14 days"
+        )
+        
+        # Built once per (metrics, period) combination; loads() returns a fresh mutable copy
+        plan = json.loads(_default_plan_json(tuple(metrics_mentioned), time_period))
+        plan["query_understanding"]["main_objective"] = query
         
         return plan
     
@@ -193,22 +277,43 @@ class PlannerAgent(BaseAgent):
         Returns:
             Next task to execute or None if all complete
         """
-        for task in plan['execution_plan']:
-            task_id = task['task_id']
-            
-            # Skip if already completed
-            if task_id in completed_tasks:
-                continue
-            
-            # Check if dependencies are met
-            dependencies = task.get('dependencies', [])
-            if all(dep in completed_tasks for dep in dependencies):
-                self.logger.info(f"Next task: {task_id} - {task['task_name']}")
-                return task
+        # Dependency counts are kept between calls and only updated with newly completed tasks
+        tasks = plan['execution_plan']
+        if self._schedule is None or not self._schedule.matches(tasks, completed_tasks):
+            self._schedule = _TaskSchedule(tasks, completed_tasks)
+        self._schedule.sync()
+        
+        task = self._schedule.next_task()
+        if task is not None:
+            self.logger.info(f"Next task: {task['task_id']} - {task['task_name']}")
+            return task
         
         self.logger.info("No more tasks to execute")
         return None
     
+    def get_ready_tasks(self, plan: Dict[str, Any], completed_tasks: List[str]) -> List[Dict[str, Any]]:
+        """
+        Get every task that can run now, i.e. whose dependencies are all completed
+        
+        Args:
+            plan: Execution plan
+            completed_tasks: List of completed task IDs
+            
+        Returns:
+            Runnable tasks in plan order (empty if all complete)
+        """
+        tasks = plan['execution_plan']
+        if self._schedule is None or not self._schedule.matches(tasks, completed_tasks):
+            self._schedule = _TaskSchedule(tasks, completed_tasks)
+        self._schedule.sync()
+        
+        ready = self._schedule.ready_tasks()
+        if ready:
+            self.logger.info(f"Ready tasks: {', '.join(task['task_id'] for task in ready)}")
+        else:
+            self.logger.info("No more tasks to execute")
+        return ready
+    
     def update_plan(self, plan: Dict[str, Any], new_insights: Dict[str, Any]) -> Dict[str, Any]:
         """
         Update plan based on intermediate insights (adaptive planning)
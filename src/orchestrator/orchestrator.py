@@ -2,19 +2,117 @@
 Main Orchestrator - Coordinates multi-agent workflow
 """
 
+import os
+import re
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, Any, List
 from datetime import datetime
 
-from ..agents import (
-    PlannerAgent,
-    DataAgent,
-    InsightAgent,
-    EvaluatorAgent,
-    CreativeGeneratorAgent
-)
+try:
+    import orjson
+except ImportError:  # optional: fall back to the stdlib encoder
+    orjson = None
+
 from ..utils import setup_logger
+from .workflow_cache import WorkflowCache
+
+
+# Data paths that do not exist as given are looked up relative to this directory
+_PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+# Task description keyword -> analysis period; earlier entries take precedence
+_TASK_PERIOD_KEYWORDS = (
+    ("last 7 days", "last 7 days"),
+    ("week", "last 7 days"),
+    ("last 14 days", "last 14 days"),
+    ("2 weeks", "last 14 days"),
+    ("last 30 days", "last 30 days"),
+    ("month", "last 30 days")
+)
+_TASK_PERIOD_RANK = {keyword: rank for rank, (keyword, _) in enumerate(_TASK_PERIOD_KEYWORDS)}
+
+# One scan finds every keyword occurrence (lookahead, so overlapping matches are kept)
+_TASK_PERIOD_RE = re.compile(
+    "(?=(%s))" % "|".join(re.escape(keyword) for keyword, _ in _TASK_PERIOD_KEYWORDS)
+)
+
+
+# Buffer size for streamed report files (few large writes instead of many small ones)
+_WRITE_BUFFER_SIZE = 1 << 20
+
+
+def _write_json(path: Path, data: Any) -> int:
+    """
+    Write data to path as 2-space indented JSON (orjson when available)
+    
+    A dict is written one top-level entry at a time, so only one section's encoded
+    bytes are held in memory; the file is byte-identical to encoding it in one go.
+    The output goes to a temporary file that replaces path once complete.
+    
+    Returns:
+        Size of the written file in bytes
+    """
+    tmp_path = path.with_name(path.name + ".tmp")
+    size = None
+    
+    if orjson is not None:
+        # Serializes numpy scalars/arrays natively; other unknown types go through str
+        option = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        try:
+            if isinstance(data, dict) and data and all(isinstance(key, str) for key in data):
+                with open(tmp_path, 'wb', buffering=_WRITE_BUFFER_SIZE) as f:
+                    size = 0
+                    separator = b"{\n  "
+                    for key, value in data.items():
+                        # Raw newlines only occur between tokens, so re-indenting is safe
+                        section = orjson.dumps(value, default=str, option=option).replace(b"\n", b"\n  ")
+                        size += f.write(separator + orjson.dumps(key) + b": " + section)
+                        separator = b",\n  "
+                    size += f.write(b"\n}")
+            else:
+                size = tmp_path.write_bytes(orjson.dumps(data, default=str, option=option))
+        except orjson.JSONEncodeError:
+            size = None
+    
+    if size is None:
+        with open(tmp_path, 'w', encoding='utf-8', buffering=_WRITE_BUFFER_SIZE) as f:
+            json.dump(data, f, indent=2, default=str)
+        size = tmp_path.stat().st_size
+    
+    os.replace(tmp_path, path)
+    return size
+
+
+def _write_text(path: Path, text: str) -> int:
+    """Write UTF-8 text to path via a temporary file; returns the size in bytes"""
+    tmp_path = path.with_name(path.name + ".tmp")
+    size = tmp_path.write_bytes(text.encode('utf-8'))
+    os.replace(tmp_path, path)
+    return size
+
+
+# (data_summary key, heading) of the ROAS performer lists in the report
+_REPORT_PERFORMER_SECTIONS = (
+    ("top_performers", "### Top Performing Campaigns (by ROAS)"),
+    ("bottom_performers", "### Underperforming Campaigns (by ROAS)")
+)
+
+# Closing report section; identical for every run
+_REPORT_NEXT_STEPS = "\n".join([
+    "## Recommended Next Steps",
+    "",
+    "1. Implement top priority creative tests",
+    "2. Monitor performance daily for first 3-5 days",
+    "3. Scale winning creatives after statistical significance",
+    "4. Continue testing secondary recommendations",
+    "",
+    "---",
+    "",
+    "*Report generated by Kasparro Agentic FB Analyst*"
+])
 
 
 class AgenticOrchestrator:
@@ -34,12 +132,26 @@ class AgenticOrchestrator:
         self.config = config
         self.logger = setup_logger("Orchestrator", config)
         
+        # Settings read on every run, resolved once from the nested config
+        self._reports_dir = Path(config.get('output', {}).get('reports_dir', 'reports'))
+        self._max_parallel_tasks = config.get('max_parallel_tasks', 4)
+        
+        # Imported here so importing the orchestrator (e.g. for --help) does not load pandas/scipy
+        from ..agents import (
+            PlannerAgent,
+            DataAgent,
+            InsightAgent,
+            EvaluatorAgent,
+            CreativeGeneratorAgent
+        )
+        
         # Initialize agents
         self.planner = PlannerAgent(config, setup_logger("Planner", config))
         self.data_agent = DataAgent(config, setup_logger("DataAgent", config))
         self.insight_agent = InsightAgent(config, setup_logger("InsightAgent", config))
         self.evaluator = EvaluatorAgent(config, setup_logger("Evaluator", config), self.data_agent)
         self.creative_generator = CreativeGeneratorAgent(config, setup_logger("CreativeGenerator", config))
+        self.workflow_cache = WorkflowCache(config, self.logger)
         
         # Execution state
         self.execution_state = {
@@ -49,6 +161,8 @@ class AgenticOrchestrator:
             "validated_hypotheses": None,
             "creative_recommendations": None
         }
+        # Guards execution_state writes from tasks running concurrently
+        self._state_lock = threading.Lock()
         
         self.logger.info("Orchestrator initialized with all agents")
     
@@ -67,12 +181,29 @@ class AgenticOrchestrator:
         self.logger.info(f"Query: {query}")
         
         try:
-            # Step 1: Load data
+            data_path = self._resolve_data_path(data_path)
+            
+            # Step 1: Load data (also on a cache hit, so the agents match a fresh run)
             if not self._load_data(data_path):
                 return {"error": "Failed to load data"}
             
-            # Step 2: Create execution plan
-            plan = self._create_plan(query)
+            # Repeated query on unchanged data and config: reuse the previous results
+            cache_key = self.workflow_cache.key(query, data_path)
+            cached = self.workflow_cache.get(cache_key)
+            if cached is not None:
+                self.logger.info("Workflow cache hit; skipping planning and analysis")
+                self._restore_state(cached)
+                self._generate_outputs(cached, query)
+                self.logger.info("=== Analysis Complete ===")
+                return cached
+            
+            # Step 2: Create execution plan; the full-dataset analysis the default data task
+            # needs is computed meanwhile and picked up from the data agent's cache
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                prefetch = executor.submit(self.data_agent.prefetch_analysis)
+                plan = self._create_plan(query)
+            if prefetch.exception() is not None:
+                self.logger.warning(f"Speculative data analysis failed: {prefetch.exception()}")
             
             # Step 3: Execute plan
             results = self._execute_plan(plan, query)
@@ -80,6 +211,10 @@ class AgenticOrchestrator:
             # Step 4: Generate outputs
             self._generate_outputs(results, query)
             
+            # Only fully successful runs are replayed
+            if all(entry['status'] == 'completed' for entry in results['execution_log']):
+                self.workflow_cache.set(cache_key, results)
+            
             self.logger.info("=== Analysis Complete ===")
             
             return results
@@ -88,10 +223,8 @@ class AgenticOrchestrator:
             self.logger.error(f"Orchestration failed: {e}", exc_info=True)
             return {"error": str(e)}
     
-    def _load_data(self, data_path: str = None) -> bool:
-        """Load data using Data Agent"""
-        self.logger.info("Step 1: Loading data")
-        
+    def _resolve_data_path(self, data_path: str = None) -> str:
+        """Data CSV path from the argument or config, tried relative to the project root"""
         if data_path is None:
             # Use config path
             if self.config.get('use_sample_data'):
@@ -100,11 +233,16 @@ class AgenticOrchestrator:
                 data_path = self.config.get('data_csv')
         
         # Try relative to project root
-        if not Path(data_path).exists():
-            project_root = Path(__file__).parent.parent.parent
-            data_path = project_root / data_path
+        if not os.path.exists(data_path):
+            data_path = _PROJECT_ROOT / data_path
+        
+        return os.fspath(data_path)
+    
+    def _load_data(self, data_path: str) -> bool:
+        """Load data using Data Agent"""
+        self.logger.info("Step 1: Loading data")
         
-        success = self.data_agent.load_data(str(data_path))
+        success = self.data_agent.load_data(data_path)
         
         if success:
             self.logger.info(f"Data loaded successfully from {data_path}")
@@ -135,27 +273,41 @@ class AgenticOrchestrator:
             "execution_log": []
         }
         
-        # Execute tasks in order
-        while True:
-            next_task = self.planner.get_next_task(
-                plan,
-                self.execution_state['completed_tasks']
-            )
-            
-            if next_task is None:
-                break
-            
-            self.logger.info(f"Executing: {next_task['task_name']}")
-            
-            task_result = self._execute_task(next_task)
-            
-            results['execution_log'].append({
-                "task": next_task['task_name'],
-                "status": "completed" if task_result else "failed",
-                "timestamp": datetime.now().isoformat()
-            })
-            
-            self.execution_state['completed_tasks'].append(next_task['task_id'])
+        # Execute tasks in dependency waves; independent tasks in a wave run concurrently
+        max_workers = self._max_parallel_tasks
+        executor = None
+        try:
+            while True:
+                ready = self.planner.get_ready_tasks(
+                    plan,
+                    self.execution_state['completed_tasks']
+                )
+                
+                if not ready:
+                    break
+                
+                for task in ready:
+                    self.logger.info(f"Executing: {task['task_name']}")
+                
+                if len(ready) == 1 or max_workers <= 1:
+                    task_results = [self._execute_task(task) for task in ready]
+                else:
+                    if executor is None:
+                        executor = ThreadPoolExecutor(max_workers=max_workers)
+                    task_results = list(executor.map(self._execute_task, ready))
+                
+                # Log and mark completion in plan order once the whole wave has finished
+                for task, task_result in zip(ready, task_results):
+                    results['execution_log'].append({
+                        "task": task['task_name'],
+                        "status": "completed" if task_result else "failed",
+                        "timestamp": datetime.now().isoformat()
+                    })
+                    
+                    self.execution_state['completed_tasks'].append(task['task_id'])
+        finally:
+            if executor is not None:
+                executor.shutdown()
         
         # Package final results
         results.update({
@@ -167,6 +319,16 @@ class AgenticOrchestrator:
         
         return results
     
+    def _restore_state(self, results: Dict[str, Any]):
+        """Populate execution_state from cached workflow results"""
+        self.execution_state.update({
+            "completed_tasks": [task['task_id'] for task in results['plan'].get('execution_plan', [])],
+            "data_summary": results.get('data_summary'),
+            "hypotheses": results.get('hypotheses'),
+            "validated_hypotheses": results.get('validated_hypotheses'),
+            "creative_recommendations": results.get('creative_recommendations')
+        })
+    
     def _execute_task(self, task: Dict[str, Any]) -> bool:
         """Execute a single task"""
         agent_name = task.get('agent')
@@ -197,7 +359,8 @@ class AgenticOrchestrator:
             analysis_period
         )
         
-        self.execution_state['data_summary'] = data_summary
+        with self._state_lock:
+            self.execution_state['data_summary'] = data_summary
         return True
     
     def _execute_insight_task(self, task: Dict[str, Any]) -> bool:
@@ -212,7 +375,8 @@ class AgenticOrchestrator:
             self.execution_state['data_summary'].get('key_observations', [])
         )
         
-        self.execution_state['hypotheses'] = hypotheses
+        with self._state_lock:
+            self.execution_state['hypotheses'] = hypotheses
         return True
     
     def _execute_evaluator_task(self, task: Dict[str, Any]) -> bool:
@@ -226,7 +390,8 @@ class AgenticOrchestrator:
             self.execution_state['data_summary']
         )
         
-        self.execution_state['validated_hypotheses'] = validated
+        with self._state_lock:
+            self.execution_state['validated_hypotheses'] = validated
         return True
     
     def _execute_creative_task(self, task: Dict[str, Any]) -> bool:
@@ -244,44 +409,28 @@ class AgenticOrchestrator:
             creative_performance
         )
         
-        self.execution_state['creative_recommendations'] = recommendations
+        with self._state_lock:
+            self.execution_state['creative_recommendations'] = recommendations
         return True
     
     def _extract_period_from_task(self, task: Dict[str, Any]) -> str:
         """Extract time period from task description"""
         description = task.get('description', '').lower()
         
-        if 'last 7 days' in description or 'week' in description:
-            return 'last 7 days'
-        elif 'last 14 days' in description or '2 weeks' in description:
-            return 'last 14 days'
-        elif 'last 30 days' in description or 'month' in description:
-            return 'last 30 days'
+        found = _TASK_PERIOD_RE.findall(description)
+        if not found:
+            return None
         
-        return None
+        return _TASK_PERIOD_KEYWORDS[min(_TASK_PERIOD_RANK[keyword] for keyword in found)][1]
     
     def _generate_outputs(self, results: Dict[str, Any], query: str):
         """Generate output files"""
         self.logger.info("Step 4: Generating outputs")
         
-        output_dir = Path(self.config.get('output', {}).get('reports_dir', 'reports'))
+        output_dir = self._reports_dir
         output_dir.mkdir(exist_ok=True)
         
-        # Generate insights.json
-        self._save_insights_json(output_dir, results)
-        
-        # Generate creatives.json
-        self._save_creatives_json(output_dir, results)
-        
-        # Generate report.md
-        self._save_report_md(output_dir, results, query)
-        
-        self.logger.info(f"Outputs saved to {output_dir}")
-    
-    def _save_insights_json(self, output_dir: Path, results: Dict[str, Any]):
-        """Save insights to JSON"""
-        insights_file = output_dir / "insights.json"
-        
+        # Build the payloads here; only serialization and file I/O run on the workers
         insights_data = {
             "query": results.get('query'),
             "analysis_date": datetime.now().isoformat(),
@@ -290,133 +439,136 @@ class AgenticOrchestrator:
             "validated_hypotheses": results.get('validated_hypotheses'),
             "execution_log": results.get('execution_log', [])
         }
+        creative_data = results.get('creative_recommendations', {})
+        report_content = self._build_markdown_report(results, query)
+        
+        # The three files are independent; write them concurrently
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [
+                # Generate insights.json
+                executor.submit(self._save_insights_json, output_dir, insights_data),
+                # Generate creatives.json
+                executor.submit(self._save_creatives_json, output_dir, creative_data),
+                # Generate report.md
+                executor.submit(self._save_report_md, output_dir, report_content)
+            ]
+            for future in futures:
+                future.result()
+        
+        self.logger.info(f"Outputs saved to {output_dir}")
+    
+    def _save_insights_json(self, output_dir: Path, insights_data: Dict[str, Any]):
+        """Save insights to JSON"""
+        insights_file = output_dir / "insights.json"
         
-        with open(insights_file, 'w', encoding='utf-8') as f:
-            json.dump(insights_data, f, indent=2, default=str)
+        size = _write_json(insights_file, insights_data)
         
-        self.logger.info(f"Saved insights.json ({insights_file.stat().st_size} bytes)")
+        self.logger.info(f"Saved insights.json ({size} bytes)")
     
-    def _save_creatives_json(self, output_dir: Path, results: Dict[str, Any]):
+    def _save_creatives_json(self, output_dir: Path, creative_data: Dict[str, Any]):
         """Save creative recommendations to JSON"""
         creatives_file = output_dir / "creatives.json"
         
-        creative_data = results.get('creative_recommendations', {})
-        
-        with open(creatives_file, 'w', encoding='utf-8') as f:
-            json.dump(creative_data, f, indent=2, default=str)
+        size = _write_json(creatives_file, creative_data)
         
-        self.logger.info(f"Saved creatives.json ({creatives_file.stat().st_size} bytes)")
+        self.logger.info(f"Saved creatives.json ({size} bytes)")
     
-    def _save_report_md(self, output_dir: Path, results: Dict[str, Any], query: str):
+    def _save_report_md(self, output_dir: Path, report_content: str):
         """Save human-readable report in Markdown"""
         report_file = output_dir / "report.md"
         
-        # Build report content
-        report_content = self._build_markdown_report(results, query)
-        
-        with open(report_file, 'w', encoding='utf-8') as f:
-            f.write(report_content)
+        size = _write_text(report_file, report_content)
         
-        self.logger.info(f"Saved report.md ({report_file.stat().st_size} bytes)")
+        self.logger.info(f"Saved report.md ({size} bytes)")
     
     def _build_markdown_report(self, results: Dict[str, Any], query: str) -> str:
         """Build comprehensive Markdown report"""
-        lines = []
-        
-        # Header
-        lines.append("# Facebook Ads Performance Analysis Report")
-        lines.append("")
-        lines.append(f"**Analysis Date:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        lines.append(f"**Query:** {query}")
-        lines.append("")
-        lines.append("---")
-        lines.append("")
-        
-        # Executive Summary
-        lines.append("## Executive Summary")
-        lines.append("")
         data_summary = results.get('data_summary', {})
-        if data_summary:
-            overall = data_summary.get('summary_statistics', {}).get('overall', {})
-            lines.append(f"- **Total Spend:** ${overall.get('total_spend', 0):,.2f}")
-            lines.append(f"- **Total Revenue:** ${overall.get('total_revenue', 0):,.2f}")
-            lines.append(f"- **Average ROAS:** {overall.get('avg_roas', 0):.2f}")
-            lines.append(f"- **Average CTR:** {overall.get('avg_ctr', 0):.3%}")
-        lines.append("")
-        
-        # Key Findings
-        lines.append("## Key Findings")
-        lines.append("")
-        
-        validated = results.get('validated_hypotheses', [])
-        if validated:
-            supported = [h for h in validated if h.get('evaluation_result') == 'SUPPORTED']
-            
-            if supported:
-                lines.append("### Validated Insights")
-                lines.append("")
-                for i, hyp in enumerate(supported, 1):
-                    lines.append(f"{i}. **{hyp.get('hypothesis_statement', 'N/A')}**")
-                    lines.append(f"   - Confidence: {hyp.get('confidence_score', 0):.0%}")
-                    lines.append(f"   - Recommendation: {hyp.get('recommendation', 'N/A')}")
-                    lines.append("")
-        
-        # Performance Analysis
-        lines.append("## Performance Analysis")
-        lines.append("")
-        
-        if data_summary:
-            # Top Performers
-            top_perf = data_summary.get('top_performers', {})
-            if top_perf.get('by_roas'):
-                lines.append("### Top Performing Campaigns (by ROAS)")
-                lines.append("")
-                for perf in top_perf['by_roas'][:3]:
-                    lines.append(f"- **{perf['name']}**: {perf['value']:.2f} ROAS")
-                lines.append("")
-            
-            # Bottom Performers
-            bottom_perf = data_summary.get('bottom_performers', {})
-            if bottom_perf.get('by_roas'):
-                lines.append("### Underperforming Campaigns (by ROAS)")
-                lines.append("")
-                for perf in bottom_perf['by_roas'][:3]:
-                    lines.append(f"- **{perf['name']}**: {perf['value']:.2f} ROAS")
-                lines.append("")
-        
-        # Creative Recommendations
-        lines.append("## Creative Recommendations")
-        lines.append("")
-        
-        creative_recs = results.get('creative_recommendations', {})
-        if creative_recs:
-            recommendations = creative_recs.get('creative_recommendations', [])
-            
-            if recommendations:
-                lines.append("### Priority Creative Tests")
-                lines.append("")
-                
-                high_priority = [r for r in recommendations if r.get('testing_priority') == 'high']
-                for i, rec in enumerate(high_priority, 1):
-                    lines.append(f"#### Test {i}: {rec.get('headline', 'N/A')}")
-                    lines.append("")
-                    lines.append(f"**Creative Type:** {rec.get('creative_type')}")
-                    lines.append(f"**Message:** {rec.get('creative_message')}")
-                    lines.append(f"**Rationale:** {rec.get('rationale')}")
-                    lines.append(f"**Expected Impact:** {rec.get('expected_improvement')}")
-                    lines.append("")
-        
-        # Next Steps
-        lines.append("## Recommended Next Steps")
-        lines.append("")
-        lines.append("1. Implement top priority creative tests")
-        lines.append("2. Monitor performance daily for first 3-5 days")
-        lines.append("3. Scale winning creatives after statistical significance")
-        lines.append("4. Continue testing secondary recommendations")
-        lines.append("")
-        
-        lines.append("---")
-        lines.append("")
-        lines.append("*Report generated by Kasparro Agentic FB Analyst*")
-        
-        return "\n".join(lines)
+        
+        # Every section is non-empty and ends with its own blank line
+        sections = [
+            self._report_header(query),
+            self._report_executive_summary(data_summary),
+            self._report_key_findings(results.get('validated_hypotheses', [])),
+            self._report_performance(data_summary),
+            self._report_creative_recommendations(results.get('creative_recommendations', {})),
+            _REPORT_NEXT_STEPS
+        ]
+        
+        return "\n".join(sections)
+    
+    def _report_header(self, query: str) -> str:
+        """Report title, analysis date and query"""
+        return (
+            "# Facebook Ads Performance Analysis Report\n"
+            "\n"
+            f"**Analysis Date:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+            f"**Query:** {query}\n"
+            "\n"
+            "---\n"
+        )
+    
+    def _report_executive_summary(self, data_summary: Dict[str, Any]) -> str:
+        """Headline spend, revenue, ROAS and CTR"""
+        if not data_summary:
+            return "## Executive Summary\n\n"
+        
+        overall = data_summary.get('summary_statistics', {}).get('overall', {})
+        return (
+            "## Executive Summary\n"
+            "\n"
+            f"- **Total Spend:** ${overall.get('total_spend', 0):,.2f}\n"
+            f"- **Total Revenue:** ${overall.get('total_revenue', 0):,.2f}\n"
+            f"- **Average ROAS:** {overall.get('avg_roas', 0):.2f}\n"
+            f"- **Average CTR:** {overall.get('avg_ctr', 0):.3%}\n"
+        )
+    
+    def _report_key_findings(self, validated: List[Dict[str, Any]]) -> str:
+        """Supported hypotheses with confidence and recommendation"""
+        supported = [h for h in validated or () if h.get('evaluation_result') == 'SUPPORTED']
+        if not supported:
+            return "## Key Findings\n"
+        
+        # One formatted block per insight, blank line between blocks
+        insights = "\n".join(
+            f"{i}. **{hyp.get('hypothesis_statement', 'N/A')}**\n"
+            f"   - Confidence: {hyp.get('confidence_score', 0):.0%}\n"
+            f"   - Recommendation: {hyp.get('recommendation', 'N/A')}\n"
+            for i, hyp in enumerate(supported, 1)
+        )
+        return f"## Key Findings\n\n### Validated Insights\n\n{insights}"
+    
+    def _report_performance(self, data_summary: Dict[str, Any]) -> str:
+        """Top and bottom campaigns by ROAS"""
+        if not data_summary:
+            return "## Performance Analysis\n"
+        
+        blocks = []
+        for key, title in _REPORT_PERFORMER_SECTIONS:
+            performers = data_summary.get(key, {}).get('by_roas')
+            if performers:
+                campaigns = "\n".join(f"- **{perf['name']}**: {perf['value']:.2f} ROAS" for perf in performers[:3])
+                blocks.append(f"\n{title}\n\n{campaigns}\n")
+        
+        return "## Performance Analysis\n" + "".join(blocks)
+    
+    def _report_creative_recommendations(self, creative_recs: Dict[str, Any]) -> str:
+        """High-priority creative tests"""
+        recommendations = creative_recs.get('creative_recommendations', []) if creative_recs else None
+        if not recommendations:
+            return "## Creative Recommendations\n"
+        
+        high_priority = [r for r in recommendations if r.get('testing_priority') == 'high']
+        if not high_priority:
+            return "## Creative Recommendations\n\n### Priority Creative Tests\n"
+        
+        tests = "\n".join(
+            f"#### Test {i}: {rec.get('headline', 'N/A')}\n"
+            "\n"
+            f"**Creative Type:** {rec.get('creative_type')}\n"
+            f"**Message:** {rec.get('creative_message')}\n"
+            f"**Rationale:** {rec.get('rationale')}\n"
+            f"**Expected Impact:** {rec.get('expected_improvement')}\n"
+            for i, rec in enumerate(high_priority, 1)
+        )
+        return f"## Creative Recommendations\n\n### Priority Creative Tests\n\n{tests}"
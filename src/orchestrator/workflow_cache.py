@@ -0,0 +1,131 @@
+"""
+Workflow Cache - Reuses complete analysis results for repeated queries on unchanged data
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+
+def _json_native(value: Any) -> Any:
+    """
+    Copy of value built only from JSON types, so a cache hit replays what a run returned
+    
+    Tuples become lists and numpy scalars their Python equivalents; any other type
+    (timestamps, arbitrary objects, non-string keys) raises TypeError.
+    """
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    if isinstance(value, dict):
+        for key in value:
+            if not isinstance(key, str):
+                raise TypeError(f"non-string key {key!r}")
+        return {key: _json_native(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_native(item) for item in value]
+    if type(value).__module__ == 'numpy' and hasattr(value, 'item'):
+        return _json_native(value.item())
+    raise TypeError(f"{type(value).__name__} is not a JSON type")
+
+
+class WorkflowCache:
+    """
+    JSON file store of finished workflow results
+    
+    Entries are keyed on the query, the data file (path and mtime), the configuration,
+    the prompt files and whether a real LLM client is available, so editing any of them
+    (or adding an API key after mock runs) invalidates them. A run is only replayable
+    when its LLM responses are, so the cache follows the LLM response cache setting
+    and its TTL. Off unless workflow_cache is set in the configuration.
+    """
+    
+    CACHE_DIR = Path(__file__).parent.parent.parent / ".cache" / "workflow"
+    PROMPTS_DIR = Path(__file__).parent.parent.parent / "prompts"
+    
+    def __init__(self, config: Dict[str, Any], logger: Any):
+        from ..agents.base_agent import BaseAgent
+        
+        self.config = config
+        self.logger = logger
+        self.enabled = config.get('cache_enabled', True) and config.get('workflow_cache', False)
+        self.ttl = BaseAgent._LLM_CACHE_TTL
+        
+        # Secrets do not change results; keep them out of the key material
+        settings = {key: value for key, value in config.items() if key != 'api_keys'}
+        self._config_version = hashlib.sha256(
+            json.dumps(settings, sort_keys=True, default=str).encode('utf-8')
+        ).hexdigest()
+    
+    def _llm_available(self) -> bool:
+        """Whether agents would call a real LLM rather than mock it (same rule as BaseAgent)"""
+        from ..agents.base_agent import _openai_installed
+        
+        enabled = self.config.get('use_llm_api', False) and self.config.get('api_keys', {}).get('openai')
+        return bool(enabled) and _openai_installed()
+    
+    def _prompts_version(self) -> str:
+        """Digest of every prompt template, so prompt edits invalidate cached runs"""
+        digest = hashlib.sha256()
+        for prompt_path in sorted(self.PROMPTS_DIR.glob("*.md")):
+            digest.update(prompt_path.name.encode('utf-8'))
+            digest.update(prompt_path.read_bytes())
+        return digest.hexdigest()
+    
+    def key(self, query: str, data_path: str) -> Optional[str]:
+        """
+        Cache key for a workflow run
+        
+        Args:
+            query: User's analytical query
+            data_path: Resolved path of the data CSV
+        
+        Returns:
+            Hex digest, or None if the data file cannot be stat'ed
+        """
+        try:
+            mtime = os.path.getmtime(data_path)
+        except OSError:
+            return None
+        
+        material = (
+            f"{query}|{os.path.abspath(data_path)}|{mtime}|{self._config_version}"
+            f"|{self._prompts_version()}|llm={self._llm_available()}"
+        )
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+    
+    def get(self, key: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Load cached results for key, or None on a miss"""
+        if not self.enabled or key is None:
+            return None
+        
+        try:
+            with open(self.CACHE_DIR / f"{key}.json", 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        
+        if not isinstance(entry, dict) or entry.get('expires', 0) < time.time():
+            return None
+        
+        return entry.get('results')
+    
+    def set(self, key: Optional[str], results: Dict[str, Any]):
+        """Store results for key; results holding values without a JSON type are not cached"""
+        if not self.enabled or key is None:
+            return
+        
+        try:
+            entry = {"results": _json_native(results), "expires": time.time() + self.ttl}
+        except TypeError as e:
+            self.logger.warning(f"Workflow results not cached: {e}")
+            return
+        
+        try:
+            self.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            with open(self.CACHE_DIR / f"{key}.json", 'w', encoding='utf-8') as f:
+                json.dump(entry, f)
+        except OSError as e:
+            self.logger.warning(f"Failed to write workflow cache entry: {e}")
@@ -15,7 +15,6 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.utils import load_config, setup_logger
-from src.orchestrator.orchestrator import AgenticOrchestrator
 
 
 def main():
@@ -77,7 +76,9 @@ Examples:
         print(f"Error loading configuration: {e}")
         sys.exit(1)
     
-    # Initialize orchestrator
+    # Initialize orchestrator (imported after argument parsing so --help stays fast)
+    from src.orchestrator.orchestrator import AgenticOrchestrator
+    
     try:
         orchestrator = AgenticOrchestrator(config)
     except Exception as e:
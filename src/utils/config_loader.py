@@ -7,6 +7,11 @@ import os
 from pathlib import Path
 from typing import Dict, Any
 
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:  # PyYAML built without LibYAML
+    from yaml import SafeLoader as _Loader
+
 
 def load_config(config_path: str = None) -> Dict[str, Any]:
     """
@@ -28,7 +33,7 @@ def load_config(config_path: str = None) -> Dict[str, Any]:
         raise FileNotFoundError(f"Config file not found: {config_path}")
     
     with open(config_path, 'r') as f:
-        config = yaml.safe_load(f)
+        config = yaml.load(f.read(), Loader=_Loader)
     
     # Override with environment variables if present
     config = _apply_env_overrides(config)
@@ -2,20 +2,40 @@
 Logging utility with JSON structured logging support
 """
 
+import atexit
+import copy
 import logging
 import json
+import queue
 import sys
+import time
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # optional: fall back to stdlib json
+    orjson = None
 
 
 class JSONFormatter(logging.Formatter):
     """Custom formatter for JSON structured logs"""
     
+    # Whole-second part of the last formatted timestamp, reused within the same second
+    _last_second: Tuple[int, str] = (-1, "")
+    
+    def _timestamp(self, created: float) -> str:
+        """UTC ISO-8601 timestamp of a record's creation time"""
+        second = int(created)
+        if self._last_second[0] != second:
+            self._last_second = (second, time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(second)))
+        return f"{self._last_second[1]}.{int((created - second) * 1e6):06d}Z"
+    
     def format(self, record: logging.LogRecord) -> str:
         log_data = {
-            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "timestamp": self._timestamp(record.created),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -28,7 +48,9 @@ class JSONFormatter(logging.Formatter):
         if hasattr(record, 'extra'):
             log_data.update(record.extra)
         
-        return json.dumps(log_data)
+        if orjson is not None:
+            return orjson.dumps(log_data, default=str).decode('utf-8')
+        return json.dumps(log_data, default=str)
 
 
 class ColoredFormatter(logging.Formatter):
@@ -56,10 +78,74 @@ class ColoredFormatter(logging.Formatter):
         return log_msg
 
 
+# Logger name -> (level, format, output_dir) it was last configured with
+_CONFIGURED: Dict[str, Tuple[str, str, str]] = {}
+
+# One colored stdout handler shared by every logger
+_console_handler: Optional[logging.Handler] = None
+
+
+def _get_console_handler() -> logging.Handler:
+    """Create the shared console handler on first use"""
+    global _console_handler
+    if _console_handler is None:
+        _console_handler = logging.StreamHandler(sys.stdout)
+        _console_handler.setLevel(logging.INFO)
+        _console_handler.setFormatter(ColoredFormatter())
+    return _console_handler
+
+
+# Records are formatted and written on one background thread; callers only enqueue
+_LOG_QUEUE: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+
+# Logger name -> console/file handlers its records are dispatched to
+_TARGET_HANDLERS: Dict[str, List[logging.Handler]] = {}
+
+_queue_handler: Optional[logging.Handler] = None
+_listener: Optional[QueueListener] = None
+
+
+class _RecordQueueHandler(QueueHandler):
+    """Queue handler that keeps exception info for the target formatters"""
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge args on the calling thread (they may be mutated later); skip QueueHandler's
+        # own formatting, which would fold tracebacks into the message
+        record = copy.copy(record)
+        record.message = record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class _RoutingQueueListener(QueueListener):
+    """Dispatches each queued record to the handlers of the logger that emitted it"""
+    
+    def handle(self, record: logging.LogRecord):
+        for handler in _TARGET_HANDLERS.get(record.name, ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+def _get_queue_handler() -> logging.Handler:
+    """Create the shared queue handler and start the listener thread on first use"""
+    global _queue_handler, _listener
+    if _queue_handler is None:
+        _queue_handler = _RecordQueueHandler(_LOG_QUEUE)
+        _listener = _RoutingQueueListener(_LOG_QUEUE)
+        _listener.start()
+        # Registered after logging's own shutdown hook, so queued records are written first
+        atexit.register(_listener.stop)
+    return _queue_handler
+
+
 def setup_logger(name: str, config: Dict[str, Any]) -> logging.Logger:
     """
     Setup logger with both console and file handlers
     
+    Records are handed to a background listener thread through a queue. Repeated
+    calls with the same name and logging settings return the already configured
+    logger; reconfiguring closes the previous file handler.
+    
     Args:
         name: Logger name
         config: Configuration dictionary
@@ -69,27 +155,34 @@ def setup_logger(name: str, config: Dict[str, Any]) -> logging.Logger:
     """
     logger = logging.getLogger(name)
     
+    logging_config = config.get('logging', {})
+    log_level = logging_config.get('level', 'INFO')
+    log_format = logging_config.get('format', 'json')
+    output_dir = Path(logging_config.get('output_dir', 'logs'))
+    
+    settings = (log_level, log_format, str(output_dir))
+    if _CONFIGURED.get(name) == settings and logger.handlers:
+        return logger
+    
     # Get log level from config
-    log_level = config.get('logging', {}).get('level', 'INFO')
     logger.setLevel(getattr(logging, log_level))
     
-    # Remove existing handlers
+    # Remove existing handlers, closing any file they hold open
+    console_handler = _get_console_handler()
+    for handler in _TARGET_HANDLERS.pop(name, ()):
+        if handler is not console_handler:
+            handler.close()
     logger.handlers = []
     
     # Console handler (colored)
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.INFO)
-    console_handler.setFormatter(ColoredFormatter())
-    logger.addHandler(console_handler)
-    
-    # File handler (JSON)
-    log_format = config.get('logging', {}).get('format', 'json')
-    output_dir = Path(config.get('logging', {}).get('output_dir', 'logs'))
+    handlers = [console_handler]
+    
+    # File handler (JSON); the file is opened on the first record written
     output_dir.mkdir(exist_ok=True)
     
     log_file = output_dir / f"{name.lower().replace(' ', '_')}.log"
     
-    file_handler = logging.FileHandler(log_file, mode='a')
+    file_handler = logging.FileHandler(log_file, mode='a', delay=True)
     file_handler.setLevel(logging.DEBUG)
     
     if log_format == 'json':
@@ -99,9 +192,14 @@ def setup_logger(name: str, config: Dict[str, Any]) -> logging.Logger:
             '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
         ))
     
-    logger.addHandler(file_handler)
+    handlers.append(file_handler)
+    
+    # The logger itself only enqueues; the listener thread formats and writes
+    _TARGET_HANDLERS[name] = handlers
+    logger.addHandler(_get_queue_handler())
     
     # Prevent propagation to root logger
     logger.propagate = False
     
+    _CONFIGURED[name] = settings
     return logger
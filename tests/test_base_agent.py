@@ -0,0 +1,259 @@
+"""
+Tests for Base Agent
+"""
+
+import asyncio
+import json
+import unittest
+import sys
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.agents.base_agent import BaseAgent, _dump_log_entry, _serialize_log_entry
+from src.utils import load_config, setup_logger
+
+
+class _FakeAsyncClient:
+    """Stand-in for AsyncOpenAI that, like httpx, only works on the loop it first ran on"""
+    
+    def __init__(self):
+        self.closed = False
+        self.loop = None
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+    
+    async def _create(self, model, messages, temperature):
+        loop = asyncio.get_running_loop()
+        if self.closed or (self.loop is not None and self.loop is not loop):
+            raise RuntimeError("Event loop is closed")
+        self.loop = loop
+        
+        content = messages[0]['content'].upper()
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+    
+    async def close(self):
+        self.closed = True
+
+
+class _FakeClient:
+    """Stand-in for the synchronous OpenAI client that counts requests"""
+    
+    def __init__(self, stream_chunks=None):
+        self.requests = 0
+        self.stream_chunks = stream_chunks or []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+    
+    def _create(self, model, messages, temperature, stream=False):
+        self.requests += 1
+        if stream:
+            return iter([SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=chunk))])
+                         for chunk in self.stream_chunks])
+        content = f"response {self.requests}"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class TestBaseAgent(unittest.TestCase):
+    """Test cases for Base Agent"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures"""
+        cls.config = load_config()
+        cls.config.pop('api_keys', None)
+        cls.config['cache_enabled'] = False
+        cls.logger = setup_logger("TestBaseAgent", cls.config)
+    
+    def test_batch_call_llm_uses_a_client_per_batch(self):
+        """Each batch opens and closes its own async client, so repeated batches work"""
+        agent = BaseAgent("TestAgent", self.config, self.logger)
+        clients = []
+        
+        def create_client():
+            clients.append(_FakeAsyncClient())
+            return clients[-1]
+        
+        agent._create_async_client = create_client
+        
+        self.assertEqual(agent.batch_call_llm(["a", "b"]), ["A", "B"])
+        self.assertEqual(agent.batch_call_llm(["c"]), ["C"])
+        
+        self.assertEqual(len(clients), 2)
+        self.assertTrue(all(client.closed for client in clients))
+        self.assertEqual(agent.call_count, 3)
+    
+    def test_batch_call_llm_inside_running_loop(self):
+        """A batch started from async code runs on a worker thread instead of raising"""
+        agent = BaseAgent("TestAgent", self.config, self.logger)
+        
+        async def run_batch():
+            return agent.batch_call_llm(["x", "y"])
+        
+        responses = asyncio.run(run_batch())
+        
+        self.assertEqual(responses, [agent._mock_response()] * 2)
+    
+    def test_call_llm_stream_mock_mode(self):
+        """Without an OpenAI client the mock response is streamed as one chunk"""
+        agent = BaseAgent("TestAgent", self.config, self.logger)
+        
+        self.assertEqual(list(agent.call_llm_stream("prompt")), [agent._mock_response()])
+        self.assertEqual(agent.call_count, 1)
+    
+    def test_assemble_json_stream_returns_first_complete_object(self):
+        """The first object is returned once its closing brace arrives, without reading further"""
+        agent = BaseAgent("TestAgent", self.config, self.logger)
+        consumed = []
+        
+        def chunks():
+            for chunk in ['Here: ```json\n{"hook": "Stay', ' cool", "nested": {"a": 1}', '}', '\n```', ' trailing {']:
+                consumed.append(chunk)
+                yield chunk
+        
+        self.assertEqual(agent.assemble_json_stream(chunks()), {"hook": "Stay cool", "nested": {"a": 1}})
+        self.assertEqual(len(consumed), 3)
+        
+        # Same result as parsing the whole response
+        text = '```json\n[{"id": 1}]\n```'
+        self.assertEqual(agent.assemble_json_stream(iter([text[:5], text[5:]])), agent.parse_json_response(text))
+        self.assertIsNone(agent.assemble_json_stream(iter(["no json", " here"])))
+    
+    def test_log_entries_are_on_disk_immediately(self):
+        """Structured log lines are readable as soon as log_execution returns"""
+        agent = BaseAgent("TestLogDurability", {**self.config, 'logging': {'agent_jsonl': True}}, self.logger)
+        log_file = Path(__file__).parent.parent / "logs" / "testlogdurability.jsonl"
+        
+        def remove_log():
+            BaseAgent.close_log_handles()
+            log_file.unlink(missing_ok=True)
+        
+        remove_log()
+        self.addCleanup(remove_log)
+        
+        agent.log_execution("first_task", {"rows": 1}, {"source": "test"})
+        agent.log_execution("second_task", None)
+        
+        with open(log_file, 'r', encoding='utf-8') as f:
+            entries = [json.loads(line) for line in f]
+        
+        self.assertEqual([entry['task'] for entry in entries], ["first_task", "second_task"])
+    
+    
+    def test_log_encoders_agree(self):
+        """The orjson and stdlib log encoders accept the same entries and decode alike"""
+        entry = {
+            "timestamp": "2024-01-01T00:00:00",
+            "agent": "TestAgent",
+            "task": "task",
+            "result_summary": "ok",
+            "metadata": {1: "int key", 2.5: "float key", None: "none key", "nested": {"score": 0.5, "rows": [1, 2]}},
+            "call_count": 2
+        }
+        
+        fast = _serialize_log_entry(entry)
+        stdlib = _dump_log_entry(entry).encode('utf-8')
+        
+        self.assertTrue(fast.endswith(b"\n"))
+        self.assertEqual(json.loads(fast), json.loads(stdlib))
+        self.assertEqual(json.loads(fast)["metadata"]["1"], "int key")
+
+
+class TestLLMResponseCache(unittest.TestCase):
+    """Test cases for the LLM response cache"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures"""
+        cls.config = load_config()
+        cls.config.update({'use_llm_api': True, 'cache_enabled': True, 'api_keys': {'openai': 'test-key'}})
+        cls.logger = setup_logger("TestBaseAgent", cls.config)
+    
+    def setUp(self):
+        """Point the cache at an empty directory with an empty memory tier"""
+        self.cache_dir = tempfile.TemporaryDirectory()
+        patches = [
+            mock.patch.object(BaseAgent, '_LLM_CACHE_DIR', Path(self.cache_dir.name)),
+            mock.patch.object(BaseAgent, '_LLM_MEMORY_CACHE', OrderedDict())
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.addCleanup(self.cache_dir.cleanup)
+    
+    def _agent(self, config=None):
+        """Agent whose OpenAI client is a counting fake"""
+        agent = BaseAgent("TestAgent", config or self.config, self.logger)
+        agent.client = _FakeClient()
+        agent._llm_available = lambda: True
+        agent._get_openai_client = lambda: agent.client
+        return agent
+    
+    def test_miss_then_hit(self):
+        """A repeated prompt is served from the cache without another request"""
+        agent = self._agent()
+        
+        first = agent.call_llm("prompt")
+        second = agent.call_llm("prompt")
+        
+        self.assertEqual(first, second)
+        self.assertEqual(agent.client.requests, 1)
+        self.assertEqual((agent.call_count, agent.call_count_cached), (1, 1))
+        
+        # Model and temperature are part of the key
+        agent.call_llm("prompt", temperature=0.9)
+        self.assertEqual(agent.client.requests, 2)
+    
+    def test_disk_hit_survives_memory_eviction(self):
+        """Responses persist on disk for agents in later runs"""
+        self._agent().call_llm("prompt")
+        BaseAgent._LLM_MEMORY_CACHE.clear()
+        
+        agent = self._agent()
+        self.assertEqual(agent.call_llm("prompt"), "response 1")
+        self.assertEqual((agent.client.requests, agent.call_count_cached), (0, 1))
+    
+    def test_expired_entry_is_a_miss(self):
+        """Entries past their TTL are fetched again"""
+        with mock.patch.object(BaseAgent, '_LLM_CACHE_TTL', -1):
+            self._agent().call_llm("prompt")
+        BaseAgent._LLM_MEMORY_CACHE.clear()
+        
+        agent = self._agent()
+        agent.call_llm("prompt")
+        self.assertEqual((agent.client.requests, agent.call_count_cached), (1, 0))
+    
+    def test_stream_is_cached_when_fully_consumed(self):
+        """A fully read stream is stored whole and replayed as one chunk; a partial read is not stored"""
+        agent = self._agent()
+        agent.client.stream_chunks = ['{"a"', ': 1}']
+        
+        next(agent.call_llm_stream("partial"))
+        self.assertEqual(list(agent.call_llm_stream("prompt")), ['{"a"', ': 1}'])
+        
+        self.assertEqual(list(agent.call_llm_stream("prompt")), ['{"a": 1}'])
+        self.assertEqual(agent.client.requests, 2)
+        self.assertEqual(agent.call_llm("partial"), "response 3")
+    
+    def test_mock_responses_bypass_cache(self):
+        """Without real LLM calls nothing is hashed, looked up or stored"""
+        config = {**self.config, 'use_llm_api': False}
+        agent = BaseAgent("TestAgent", config, self.logger)
+        
+        self.assertIsNone(agent._llm_cache_key("prompt", 0.3, "gpt-4"))
+        self.assertEqual(agent.call_llm("prompt"), agent._mock_response())
+        self.assertEqual(agent.call_count, 1)
+        self.assertEqual(list(Path(self.cache_dir.name).iterdir()), [])
+        self.assertEqual(len(BaseAgent._LLM_MEMORY_CACHE), 0)
+
+
+def run_tests():
+    """Run all tests"""
+    unittest.main(argv=[''], verbosity=2, exit=False)
+
+
+if __name__ == "__main__":
+    run_tests()
@@ -0,0 +1,193 @@
+"""
+Tests for Data Agent
+"""
+
+import importlib.util
+import json
+import time
+import unittest
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.agents.data_agent import DataAgent, _topk
+from src.utils import load_config, setup_logger
+
+
+class TestDataAgent(unittest.TestCase):
+    """Test cases for Data Agent"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures"""
+        cls.config = load_config()
+        cls.logger = setup_logger("TestDataAgent", cls.config)
+        cls.sample_path = Path(__file__).parent.parent / "data" / "sample_fb_ads.csv"
+    
+    def _loaded_agent(self) -> DataAgent:
+        """Data agent with the sample dataset loaded"""
+        agent = DataAgent(self.config, self.logger)
+        self.assertTrue(agent.load_data(str(self.sample_path)))
+        return agent
+    
+    def test_analysis_results_are_independent_copies(self):
+        """Editing a returned summary does not leak into later analyses of the same period"""
+        agent = self._loaded_agent()
+        
+        first = agent.analyze_data("Test analysis")
+        expected = json.dumps(first, sort_keys=True, default=str)
+        
+        first['top_performers'].clear()
+        first['summary_statistics']['edited'] = True
+        for section in first['segment_analysis'].values():
+            if isinstance(section, dict):
+                section.clear()
+        
+        second = agent.analyze_data("Test analysis")
+        self.assertEqual(json.dumps(second, sort_keys=True, default=str), expected)
+    
+    def test_concurrent_analyses_compute_sections_once(self):
+        """Threads analyzing the same period share one computation per section"""
+        agent = self._loaded_agent()
+        calls = []
+        analyze_trends = agent._analyze_trends
+        
+        def counting_trends(df):
+            calls.append(df)
+            time.sleep(0.01)
+            return analyze_trends(df)
+        
+        agent._analyze_trends = counting_trends
+        
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(lambda _: agent.analyze_data("Test", "last 7 days"), range(8)))
+        
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(result['trends'] == results[0]['trends'] for result in results))
+    
+    def test_topk_matches_nlargest_and_nsmallest(self):
+        """Partition-based top-k selects the same rows, in the same order, as pandas"""
+        rng = np.random.default_rng(3)
+        values = rng.integers(0, 6, size=40).astype(np.float64)   # many ties
+        values[rng.choice(40, size=5, replace=False)] = np.nan
+        frame = pd.DataFrame({"roas": values, "row": np.arange(40)})
+        
+        for k in (1, 3, 10, 35, 40, 50):
+            for largest in (True, False):
+                if k < len(frame):
+                    expected = frame.nlargest(k, 'roas') if largest else frame.nsmallest(k, 'roas')
+                else:
+                    # pandas falls back to an unstable sort here, so compare against a stable one
+                    expected = frame.sort_values('roas', ascending=not largest, kind='stable', na_position='last')
+                actual = _topk(frame, 'roas', k, largest)
+                self.assertEqual(list(actual['row']), list(expected['row']), (k, largest))
+    
+    def test_period_filter_matches_date_mask(self):
+        """Period slices hold the rows of a date >= start mask, in file order, for sorted and shuffled data"""
+        df = pd.read_csv(self.sample_path)
+        frames = {"sorted": df.sort_values('date', kind='stable'), "shuffled": df.sample(frac=1, random_state=5)}
+        periods = {
+            "last 7 days": pd.Timedelta(days=7),
+            "Last 2 weeks": pd.Timedelta(weeks=2),
+            "last week": pd.Timedelta(weeks=1),
+            "last 1 day": pd.Timedelta(days=1)
+        }
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for name, frame in frames.items():
+                data_path = str(Path(tmp_dir) / f"{name}.csv")
+                frame.to_csv(data_path, index=False)
+                
+                agent = DataAgent(self.config, self.logger)
+                self.assertTrue(agent.load_data(data_path))
+                dates = agent.df['date']
+                
+                for period, delta in periods.items():
+                    expected = agent.df[dates >= dates.max() - delta]
+                    self.assertTrue(agent._filter_by_period(period).equals(expected), (name, period))
+                
+                self.assertIs(agent._filter_by_period("all time"), agent.df)
+    
+    def test_creative_metadata_skips_nulls(self):
+        """Creative type and campaign are the first non-null values per message, as a 'first' aggregation gives"""
+        df = pd.read_csv(self.sample_path)
+        first_rows = ~df.duplicated('creative_message')
+        df.loc[first_rows, 'creative_type'] = np.nan      # only later rows carry the type
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            data_path = str(Path(tmp_dir) / "sparse_types.csv")
+            df.to_csv(data_path, index=False)
+            agent = DataAgent(self.config, self.logger)
+            self.assertTrue(agent.load_data(data_path))
+        
+        expected = agent.df.groupby('creative_message', observed=True).agg({
+            'creative_type': 'first',
+            'campaign_name': 'first'
+        })
+        for creative in agent.get_creative_performance():
+            row = expected.loc[creative['creative_message']]
+            self.assertEqual(
+                (creative['creative_type'], creative['campaign_name']),
+                (row['creative_type'], row['campaign_name'])
+            )
+    
+    def test_polars_loader_matches_pandas(self):
+        """fast_io yields the same cleaned data, including zero-denominator ratios"""
+        if importlib.util.find_spec('polars') is None or importlib.util.find_spec('pyarrow') is None:
+            self.skipTest("polars/pyarrow not installed")
+        
+        df = pd.read_csv(self.sample_path).drop(columns=['ctr', 'roas'])
+        df.loc[0, 'impressions'] = 0          # clicks > 0 over zero impressions
+        df.loc[1, ['clicks', 'impressions']] = 0
+        df.loc[2, 'spend'] = 0                # revenue > 0 over zero spend
+        df.loc[3, 'spend'] = np.nan           # filled with 0 before the ratio
+        df.loc[4, 'clicks'] = np.nan
+        df.loc[5, 'campaign_name'] = " " + df.loc[5, 'campaign_name']   # leading whitespace is kept
+        df.loc[6, 'creative_type'] = np.nan
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            data_path = str(Path(tmp_dir) / "edge_cases.csv")
+            df.to_csv(data_path, index=False)
+            
+            frames = {}
+            for fast_io in (False, True):
+                agent = DataAgent({**self.config, 'fast_io': fast_io}, self.logger)
+                self.assertTrue(agent.load_data(data_path))
+                frames[fast_io] = agent.df
+        
+        pandas_df, polars_df = frames[False], frames[True]
+        self.assertEqual(len(polars_df), len(pandas_df))
+        for column in ('ctr', 'roas', 'spend'):
+            np.testing.assert_array_equal(
+                polars_df[column].to_numpy(dtype=np.float64),
+                pandas_df[column].to_numpy(dtype=np.float64),
+                err_msg=column
+            )
+        self.assertEqual(pandas_df['ctr'].iloc[0], 0.0)
+        self.assertEqual(pandas_df['roas'].iloc[2], 0.0)
+        self.assertTrue((polars_df['date'].to_numpy() == pandas_df['date'].to_numpy()).all())
+        
+        text_columns = pandas_df.select_dtypes(include=['object', 'category']).columns
+        self.assertEqual(list(polars_df.select_dtypes(include=['object', 'category']).columns), list(text_columns))
+        for column in text_columns:
+            self.assertEqual(
+                polars_df[column].astype(object).where(polars_df[column].notna(), None).tolist(),
+                pandas_df[column].astype(object).where(pandas_df[column].notna(), None).tolist(),
+                column
+            )
+
+
+def run_tests():
+    """Run all tests"""
+    unittest.main(argv=[''], verbosity=2, exit=False)
+
+
+if __name__ == "__main__":
+    run_tests()
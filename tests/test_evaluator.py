@@ -4,8 +4,11 @@ Tests for Evaluator Agent
 
 import unittest
 import sys
+import tempfile
 from pathlib import Path
 
+import pandas as pd
+
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
@@ -73,10 +76,12 @@ class TestEvaluatorAgent(unittest.TestCase):
         self.assertEqual(self.evaluator._determine_result(0.2), "UNLIKELY")
         self.assertEqual(self.evaluator._determine_result(0.05), "REFUTED")
     
-    @unittest.skipIf(not hasattr(setUpClass.__func__(None), 'has_data') or not setUpClass.__func__(None).has_data,
-                     "Data not available for testing")
     def test_evaluate_hypothesis_with_data(self):
         """Test hypothesis evaluation with real data"""
+        # Checked here, after setUpClass has run once, rather than at class definition
+        if not self.has_data:
+            self.skipTest("Data not available for testing")
+        
         # Create a test hypothesis
         hypothesis = {
             "hypothesis_id": "test_hyp",
@@ -95,6 +100,52 @@ class TestEvaluatorAgent(unittest.TestCase):
         self.assertIn("confidence_score", result)
         self.assertIn("evidence_analysis", result)
     
+    def test_group_tests_skip_missing_segment_values(self):
+        """Rows with a blank creative/audience type are left out of the group tests"""
+        sample_path = Path(__file__).parent.parent / "data" / "sample_fb_ads.csv"
+        if not sample_path.exists():
+            self.skipTest("Sample data not available for testing")
+        
+        df = pd.read_csv(sample_path)
+        df.loc[[0, 5, 9], 'creative_type'] = None
+        df.loc[[1, 5, 12], 'audience_type'] = None
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            data_path = Path(tmp_dir) / "missing_segments.csv"
+            df.to_csv(data_path, index=False)
+            
+            data_agent = DataAgent(self.config, self.logger)
+            self.assertTrue(data_agent.load_data(str(data_path)))
+        
+        evaluator = EvaluatorAgent(self.config, self.logger, data_agent)
+        
+        for category, column, summary_key in (
+            ("creative", "creative_type", "creative_groups"),
+            ("audience", "audience_type", "audience_groups")
+        ):
+            results = evaluator._perform_statistical_tests({"category": category})
+            groups = results["summary"][summary_key]
+            
+            expected = data_agent.df.dropna(subset=['roas']).groupby(column, observed=True)['roas']
+            expected_sizes = {name: size for name, size in expected.size().items() if size >= 3}
+            self.assertEqual({group['name']: group['n'] for group in groups}, expected_sizes)
+            for group in groups:
+                self.assertAlmostEqual(group['mean_roas'], round(expected.get_group(group['name']).mean(), 3))
+    
+    def test_test_kind_finds_overlapping_kinds_in_id(self):
+        """Every kind named in the id is found, including overlapping ones, and the highest-priority kind wins"""
+        cases = {
+            ("hyp_ctroas", "general"): "roas",
+            ("hyp_ctr_drop", "general"): "ctr",
+            ("hyp_roas_ctr", "general"): "roas",
+            ("hyp_ctr", "audience"): "audience",
+            ("hyp_1", "creative"): "creative",
+            ("hyp_1", "general"): None
+        }
+        for (hypothesis_id, category), expected in cases.items():
+            hypothesis = {"hypothesis_id": hypothesis_id, "category": category}
+            self.assertEqual(self.evaluator._test_kind(hypothesis), expected, hypothesis_id)
+    
     def test_generate_recommendation(self):
         """Test recommendation generation"""
         hypothesis = {
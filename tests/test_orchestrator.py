@@ -0,0 +1,94 @@
+"""
+Tests for the Agentic Orchestrator
+"""
+
+import threading
+import unittest
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.orchestrator.orchestrator import AgenticOrchestrator
+from src.utils import load_config
+
+
+def _task(task_id, *dependencies):
+    """Minimal plan task"""
+    return {"task_id": task_id, "task_name": f"Run {task_id}", "dependencies": list(dependencies)}
+
+
+class TestPlanExecution(unittest.TestCase):
+    """Test cases for executing a plan in dependency waves"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures"""
+        cls.config = load_config()
+        cls.config.pop('api_keys', None)
+        
+        # task_1 -> (task_2, task_3) -> task_4, with task_5 independent
+        cls.plan = {"execution_plan": [
+            _task("task_1"),
+            _task("task_2", "task_1"),
+            _task("task_3", "task_1"),
+            _task("task_4", "task_2", "task_3"),
+            _task("task_5")
+        ]}
+    
+    def _run_plan(self, failing=(), max_parallel_tasks=4):
+        """Execute the plan with stub tasks; returns (results, [(task_id, completed before it started)])"""
+        orchestrator = AgenticOrchestrator({**self.config, 'max_parallel_tasks': max_parallel_tasks})
+        started = []
+        lock = threading.Lock()
+        
+        def execute_task(task):
+            with lock:
+                started.append((task['task_id'], set(orchestrator.execution_state['completed_tasks'])))
+            return task['task_id'] not in failing
+        
+        orchestrator._execute_task = execute_task
+        return orchestrator._execute_plan(self.plan, "Test query"), started
+    
+    def test_tasks_start_after_their_dependencies(self):
+        """Every task starts only once all of its dependencies are marked complete"""
+        for max_parallel_tasks in (1, 4):
+            results, started = self._run_plan(max_parallel_tasks=max_parallel_tasks)
+            
+            dependencies = {task['task_id']: task['dependencies'] for task in self.plan['execution_plan']}
+            self.assertEqual(sorted(task_id for task_id, _ in started), sorted(dependencies))
+            for task_id, completed in started:
+                self.assertTrue(set(dependencies[task_id]) <= completed, task_id)
+            
+            # task_4 waits for the whole second wave
+            self.assertEqual(dict(started)["task_4"], {"task_1", "task_2", "task_3", "task_5"})
+    
+    def test_execution_log_is_in_plan_order_per_wave(self):
+        """Log entries are appended wave by wave, in plan order within a wave"""
+        results, _ = self._run_plan()
+        
+        self.assertEqual(
+            [entry['task'] for entry in results['execution_log']],
+            ["Run task_1", "Run task_5", "Run task_2", "Run task_3", "Run task_4"]
+        )
+        self.assertTrue(all(entry['status'] == "completed" for entry in results['execution_log']))
+    
+    def test_failed_task_is_logged_and_dependents_still_run(self):
+        """A failed task is logged as failed but still counts as done, so the plan runs to the end"""
+        results, started = self._run_plan(failing={"task_2"})
+        
+        statuses = {entry['task']: entry['status'] for entry in results['execution_log']}
+        self.assertEqual(statuses["Run task_2"], "failed")
+        self.assertEqual(statuses["Run task_4"], "completed")
+        self.assertEqual(len(results['execution_log']), 5)
+        self.assertIn("task_2", dict(started)["task_4"])
+
+
+def run_tests():
+    """Run all tests"""
+    unittest.main(argv=[''], verbosity=2, exit=False)
+
+
+if __name__ == "__main__":
+    run_tests()
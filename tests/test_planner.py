@@ -0,0 +1,107 @@
+"""
+Tests for Planner Agent
+"""
+
+import random
+import unittest
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.agents.planner import PlannerAgent
+from src.utils import load_config, setup_logger
+
+
+def _task(task_id, *dependencies):
+    """Minimal plan task"""
+    return {"task_id": task_id, "task_name": task_id, "dependencies": list(dependencies)}
+
+
+def _reference_next_task(tasks, completed_tasks):
+    """Full rescan: first task in plan order that is not completed and has all dependencies met"""
+    for task in tasks:
+        if task['task_id'] in completed_tasks:
+            continue
+        if all(dep in completed_tasks for dep in task.get('dependencies', [])):
+            return task
+    return None
+
+
+class TestPlannerScheduling(unittest.TestCase):
+    """Test cases for get_next_task and get_ready_tasks"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures"""
+        cls.config = load_config()
+        cls.config.pop('api_keys', None)
+        cls.logger = setup_logger("TestPlanner", cls.config)
+        
+        # task_1 -> (task_2, task_3) -> task_4, with task_5 independent
+        cls.plan = {"execution_plan": [
+            _task("task_1"),
+            _task("task_2", "task_1"),
+            _task("task_3", "task_1"),
+            _task("task_4", "task_2", "task_3"),
+            _task("task_5")
+        ]}
+    
+    def test_ready_tasks_follow_dependency_waves(self):
+        """Each wave holds exactly the tasks whose dependencies completed earlier, in plan order"""
+        planner = PlannerAgent(self.config, self.logger)
+        completed_tasks = []
+        waves = []
+        
+        while True:
+            ready = planner.get_ready_tasks(self.plan, completed_tasks)
+            if not ready:
+                break
+            waves.append([task['task_id'] for task in ready])
+            completed_tasks.extend(waves[-1])
+        
+        self.assertEqual(waves, [["task_1", "task_5"], ["task_2", "task_3"], ["task_4"]])
+    
+    def test_next_task_matches_full_rescan(self):
+        """The incremental schedule picks the same task as rescanning the plan every call"""
+        planner = PlannerAgent(self.config, self.logger)
+        rng = random.Random(7)
+        
+        for _ in range(20):
+            ids = [f"task_{index}" for index in range(8)]
+            tasks = [_task(ids[index], *rng.sample(ids[:index], rng.randint(0, index))) for index in range(8)]
+            plan = {"execution_plan": tasks}
+            completed_tasks = []
+            
+            while True:
+                task = planner.get_next_task(plan, completed_tasks)
+                self.assertIs(task, _reference_next_task(tasks, completed_tasks))
+                if task is None:
+                    break
+                completed_tasks.append(task['task_id'])
+            
+            self.assertEqual(len(completed_tasks), len(tasks))
+    
+    def test_new_completed_list_resets_schedule(self):
+        """Passing a different completed list (e.g. a new run) rebuilds the dependency counts"""
+        planner = PlannerAgent(self.config, self.logger)
+        
+        first_run = []
+        for _ in range(3):
+            first_run.append(planner.get_next_task(self.plan, first_run)['task_id'])
+        
+        self.assertEqual(planner.get_next_task(self.plan, [])['task_id'], "task_1")
+        self.assertEqual(
+            [task['task_id'] for task in planner.get_ready_tasks(self.plan, ["task_1"])],
+            ["task_2", "task_3", "task_5"]
+        )
+
+
+def run_tests():
+    """Run all tests"""
+    unittest.main(argv=[''], verbosity=2, exit=False)
+
+
+if __name__ == "__main__":
+    run_tests()
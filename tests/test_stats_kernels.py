@@ -0,0 +1,143 @@
+"""
+Tests for the numeric kernels shared by the analysis agents
+"""
+
+import unittest
+import sys
+import warnings
+from pathlib import Path
+
+import numpy as np
+from scipy import special, stats
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.agents import _stats_kernels as kernels
+
+
+def _cohens_d(group1: np.ndarray, group2: np.ndarray) -> float:
+    """Cohen's d with pooled standard deviation, as EvaluatorAgent computes it without Numba"""
+    n1, n2 = group1.size, group2.size
+    pooled_std = np.sqrt(((n1 - 1) * np.var(group1, ddof=1) + (n2 - 1) * np.var(group2, ddof=1)) / (n1 + n2 - 2))
+    return 0.0 if pooled_std == 0 else abs(group1.mean() - group2.mean()) / pooled_std
+
+
+class TestStatsKernels(unittest.TestCase):
+    """Compiled kernels (and their pure-Python loops) against the numpy/scipy paths"""
+    
+    def setUp(self):
+        """Degenerate inputs trigger numpy's division warnings in the reference paths"""
+        self._warnings = warnings.catch_warnings()
+        self._warnings.__enter__()
+        warnings.simplefilter("ignore", RuntimeWarning)
+        self.rng = np.random.default_rng(42)
+    
+    def tearDown(self):
+        self._warnings.__exit__(None, None, None)
+    
+    def _ttest_kernels(self):
+        """The loop itself plus the compiled kernel when Numba is installed"""
+        return [kernels._pooled_ttest_loop] + ([kernels.pooled_ttest] if kernels.pooled_ttest is not None else [])
+    
+    def test_pooled_ttest_matches_scipy(self):
+        """t, p and Cohen's d agree with scipy.stats.ttest_ind"""
+        samples = [
+            (self.rng.normal(2.0, 0.5, 12), self.rng.normal(2.4, 0.7, 9)),
+            (np.array([1.0]), np.array([2.0, 3.0])),
+            (np.full(4, 1.5), np.full(5, 1.5)),
+            (np.full(4, 1.0), np.full(5, 2.0))
+        ]
+        
+        for kernel in self._ttest_kernels():
+            for a, b in samples:
+                t_stat, dof, effect_size = kernel(a, b)
+                expected = stats.ttest_ind(a, b)
+                
+                self.assertEqual(dof, a.size + b.size - 2)
+                np.testing.assert_allclose(t_stat, expected.statistic, rtol=1e-10, equal_nan=True)
+                np.testing.assert_allclose(2.0 * special.stdtr(dof, -abs(t_stat)), expected.pvalue, rtol=1e-10, equal_nan=True)
+                np.testing.assert_allclose(effect_size, _cohens_d(a, b), rtol=1e-10, equal_nan=True)
+    
+    def test_pooled_ttest_one_row_groups(self):
+        """Two one-row groups have no degrees of freedom: NaN results instead of an exception"""
+        for kernel in self._ttest_kernels():
+            t_stat, dof, effect_size = kernel(np.array([1.0]), np.array([2.0]))
+            
+            self.assertEqual(dof, 0)
+            self.assertTrue(np.isnan(t_stat))
+            self.assertTrue(np.isnan(stats.ttest_ind([1.0], [2.0]).statistic))
+            self.assertTrue(np.isnan(effect_size))
+    
+    
+    def test_linregress_index_matches_scipy(self):
+        """Slope, r and trend p-value equal scipy.stats.linregress, including a flat series (r = 0, p = 1)"""
+        series = [
+            self.rng.normal(3.0, 0.4, 7),
+            self.rng.normal(3.0, 0.4, 30) - np.linspace(0.0, 1.0, 30),
+            np.full(8, 2.5),
+            np.array([1.0, 2.0, 4.0])
+        ]
+        
+        for y in series:
+            slope, r_value, trend_t, trend_dof = kernels.linregress_index(y)
+            expected = stats.linregress(np.arange(y.size), y)
+            
+            self.assertEqual(trend_dof, y.size - 2)
+            np.testing.assert_allclose(
+                [slope, r_value, 2.0 * special.stdtr(trend_dof, -abs(trend_t))],
+                [expected.slope, expected.rvalue, expected.pvalue],
+                rtol=1e-12, atol=1e-15, err_msg=f"n={y.size}"
+            )
+        
+        self.assertEqual(kernels.linregress_index(np.full(8, 2.5))[1], 0.0)
+    
+    def test_roas_trend_matches_numpy_path(self):
+        """The fused kernel agrees with the separate t-test and regression it replaces"""
+        series = [
+            self.rng.normal(3.0, 0.4, 7),
+            self.rng.normal(3.0, 0.4, 30) - np.linspace(0.0, 1.0, 30),
+            np.full(8, 2.5),
+            np.array([1.0, 1.0, 1.0, 2.0, 2.0, 2.0, 2.0]),
+            np.array([1.0, 2.0, 4.0]),
+            np.array([1.0, 3.0]),
+            np.array([2.0])
+        ]
+        kernel_variants = [kernels._roas_trend_loop] + ([kernels.roas_trend] if kernels.roas_trend is not None else [])
+        
+        for kernel in kernel_variants:
+            for y in series:
+                early_mean, late_mean, t_stat, dof, effect_size, slope, r_value, trend_t, trend_dof = kernel(y)
+                
+                mid_point = y.size // 2
+                early, late = y[:mid_point], y[mid_point:]
+                expected_t = stats.ttest_ind(early, late).statistic if early.size and late.size else np.nan
+                
+                np.testing.assert_allclose(
+                    [early_mean, late_mean, t_stat, effect_size],
+                    [early.mean(), late.mean(), expected_t, _cohens_d(early, late)],
+                    rtol=1e-9, atol=1e-12, equal_nan=True, err_msg=f"n={y.size}"
+                )
+                self.assertEqual(dof, y.size - 2)
+                self.assertEqual(trend_dof, y.size - 2)
+                
+                # linregress rejects a single point and special-cases the p-value of two
+                if y.size >= 2:
+                    expected = stats.linregress(np.arange(y.size), y)
+                    np.testing.assert_allclose([slope, r_value], [expected.slope, expected.rvalue],
+                                               rtol=1e-9, atol=1e-12, err_msg=f"n={y.size}")
+                if y.size > 2:
+                    np.testing.assert_allclose(2.0 * special.stdtr(trend_dof, -abs(trend_t)), expected.pvalue,
+                                               rtol=1e-9, atol=1e-12, err_msg=f"n={y.size}")
+            
+            # Empty input has no reference value on the numpy path; it must still not raise
+            self.assertTrue(np.isnan(kernel(np.array([], dtype=np.float64))[2]))
+
+
+def run_tests():
+    """Run all tests"""
+    unittest.main(argv=[''], verbosity=2, exit=False)
+
+
+if __name__ == "__main__":
+    run_tests()
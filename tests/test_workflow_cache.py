@@ -0,0 +1,153 @@
+"""
+Tests for the workflow result cache
+"""
+
+import json
+import os
+import unittest
+import sys
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.orchestrator.orchestrator import AgenticOrchestrator
+from src.orchestrator.workflow_cache import WorkflowCache
+from src.utils import load_config, setup_logger
+
+
+class TestWorkflowCache(unittest.TestCase):
+    """Test cases for WorkflowCache"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures"""
+        cls.config = load_config()
+        cls.config['workflow_cache'] = True
+        cls.logger = setup_logger("TestWorkflowCache", cls.config)
+    
+    def setUp(self):
+        """Empty cache directory and a data file of our own"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        patch = mock.patch.object(WorkflowCache, 'CACHE_DIR', Path(self.tmp_dir.name) / "workflow")
+        patch.start()
+        self.addCleanup(patch.stop)
+        
+        self.data_path = os.path.join(self.tmp_dir.name, "data.csv")
+        Path(self.data_path).write_text("date,spend\n2024-01-01,1\n", encoding='utf-8')
+    
+    def test_disabled_by_default(self):
+        """The cache is opt-in"""
+        self.assertFalse(WorkflowCache({}, self.logger).enabled)
+        self.assertFalse(WorkflowCache({'workflow_cache': True, 'cache_enabled': False}, self.logger).enabled)
+    
+    def test_miss_then_hit(self):
+        """Stored results are returned for the same key"""
+        cache = WorkflowCache(self.config, self.logger)
+        key = cache.key("query", self.data_path)
+        
+        self.assertIsNone(cache.get(key))
+        
+        cache.set(key, {"plan": {"tasks": ("a", "b")}, "score": np.float64(0.5), "n": np.int64(3)})
+        cached = cache.get(key)
+        
+        # JSON types only: tuples come back as lists, numpy scalars as Python numbers
+        self.assertEqual(cached, {"plan": {"tasks": ["a", "b"]}, "score": 0.5, "n": 3})
+        self.assertIs(type(cached["n"]), int)
+    
+    def test_non_json_results_are_not_stored(self):
+        """Values without a JSON type are not stringified into the cache"""
+        cache = WorkflowCache(self.config, self.logger)
+        key = cache.key("query", self.data_path)
+        
+        cache.set(key, {"date": pd.Timestamp("2024-01-01")})
+        cache.set(cache.key("other", self.data_path), {1: "non-string key"})
+        
+        self.assertIsNone(cache.get(key))
+        self.assertFalse(WorkflowCache.CACHE_DIR.exists() and any(WorkflowCache.CACHE_DIR.iterdir()))
+    
+    def test_expired_entry_is_a_miss(self):
+        """Entries past the TTL are ignored"""
+        cache = WorkflowCache(self.config, self.logger)
+        key = cache.key("query", self.data_path)
+        
+        cache.ttl = -1
+        cache.set(key, {"result": 1})
+        
+        self.assertIsNone(cache.get(key))
+    
+    def test_key_invalidation(self):
+        """Query, data, config, prompts and LLM availability all change the key"""
+        cache = WorkflowCache(self.config, self.logger)
+        key = cache.key("query", self.data_path)
+        
+        self.assertEqual(cache.key("query", self.data_path), key)
+        self.assertNotEqual(cache.key("other query", self.data_path), key)
+        self.assertIsNone(cache.key("query", os.path.join(self.tmp_dir.name, "missing.csv")))
+        
+        changed_config = WorkflowCache({**self.config, 'confidence_min': 0.9}, self.logger)
+        self.assertNotEqual(changed_config.key("query", self.data_path), key)
+        
+        # API keys are not key material; only whether they lead to real LLM calls is
+        with_api_key = WorkflowCache({**self.config, 'api_keys': {'openai': 'test-key'}}, self.logger)
+        self.assertEqual(with_api_key.key("query", self.data_path), key)
+        with mock.patch.object(WorkflowCache, '_llm_available', return_value=True):
+            self.assertNotEqual(cache.key("query", self.data_path), key)
+        
+        with mock.patch.object(WorkflowCache, '_prompts_version', return_value="edited"):
+            self.assertNotEqual(cache.key("query", self.data_path), key)
+        
+        stat = os.stat(self.data_path)
+        os.utime(self.data_path, (stat.st_atime, stat.st_mtime + 10))
+        self.assertNotEqual(cache.key("query", self.data_path), key)
+
+
+class TestOrchestratorWorkflowCache(unittest.TestCase):
+    """A cache hit in AgenticOrchestrator.run"""
+    
+    def setUp(self):
+        """Sample data, temporary reports and cache directories"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        patch = mock.patch.object(WorkflowCache, 'CACHE_DIR', Path(self.tmp_dir.name) / "workflow")
+        patch.start()
+        self.addCleanup(patch.stop)
+        
+        self.config = load_config()
+        self.config.update({
+            'workflow_cache': True,
+            'use_sample_data': True,
+            'output': {'reports_dir': os.path.join(self.tmp_dir.name, "reports")}
+        })
+    
+    def test_hit_replays_results_with_data_loaded(self):
+        """A hit skips planning, returns the stored results and leaves the data agent loaded"""
+        query = "Analyze ROAS drop in last 7 days"
+        fresh = AgenticOrchestrator(self.config).run(query)
+        self.assertNotIn('error', fresh)
+        
+        orchestrator = AgenticOrchestrator(self.config)
+        with mock.patch.object(orchestrator.planner, 'create_plan', side_effect=AssertionError("planned on a hit")):
+            cached = orchestrator.run(query)
+        
+        self.assertEqual(json.dumps(cached, sort_keys=True), json.dumps(fresh, sort_keys=True))
+        self.assertIsNotNone(orchestrator.data_agent.df)
+        self.assertEqual(
+            orchestrator.execution_state['completed_tasks'],
+            [task['task_id'] for task in fresh['plan']['execution_plan']]
+        )
+
+
+def run_tests():
+    """Run all tests"""
+    unittest.main(argv=[''], verbosity=2, exit=False)
+
+
+if __name__ == "__main__":
+    run_tests()